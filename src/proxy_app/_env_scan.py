@@ -0,0 +1,119 @@
+"""
+Environment loading and scanning for the proxy: .env discovery plus the
+API key, model filter and concurrency settings derived from it.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+
+def load_env_files(root_dir: Optional[Path] = None) -> List[Path]:
+    """
+    Load all .env files from the root folder into os.environ.
+
+    Every file is parsed once and merged: main .env first, then any additional
+    .env files (e.g., antigravity_all_combined.env, gemini_cli_all_combined.env)
+    in sorted order. Earlier files win, and nothing overrides variables already
+    set in the process env.
+
+    Returns:
+        The *.env files found in the root folder.
+    """
+    from dotenv import dotenv_values, find_dotenv
+
+    root_dir = root_dir or Path.cwd()
+    env_files_found = sorted(root_dir.glob("*.env"))
+    merged_env = {}
+    main_env_file = find_dotenv()
+    if main_env_file:
+        merged_env.update(dotenv_values(main_env_file))
+    for env_file in env_files_found:
+        if env_file.name != ".env":  # Skip main .env (already parsed)
+            for key, value in dotenv_values(env_file).items():
+                merged_env.setdefault(key, value)
+    os.environ.update(
+        {
+            key: value
+            for key, value in merged_env.items()
+            if value is not None and key not in os.environ
+        }
+    )
+    return env_files_found
+
+
+def _load_ignore_models(scan: Dict[str, Any], provider: str, value: str):
+    models_to_ignore = [model.strip() for model in value.split(",") if model.strip()]
+    scan["ignore_models"][provider] = models_to_ignore
+    logging.debug(f"Loaded ignore list for provider '{provider}': {models_to_ignore}")
+
+
+def _load_whitelist_models(scan: Dict[str, Any], provider: str, value: str):
+    models_to_whitelist = [
+        model.strip() for model in value.split(",") if model.strip()
+    ]
+    scan["whitelist_models"][provider] = models_to_whitelist
+    logging.debug(
+        f"Loaded whitelist for provider '{provider}': {models_to_whitelist}"
+    )
+
+
+def _load_max_concurrent(scan: Dict[str, Any], provider: str, value: str):
+    try:
+        max_concurrent = int(value)
+        if max_concurrent < 1:
+            logging.warning(
+                f"Invalid max_concurrent value for provider '{provider}': {value}. Must be >= 1. Using default (1)."
+            )
+            max_concurrent = 1
+        scan["max_concurrent_requests_per_key"][provider] = max_concurrent
+        logging.debug(
+            f"Loaded max concurrent requests for provider '{provider}': {max_concurrent}"
+        )
+    except ValueError:
+        logging.warning(
+            f"Invalid max_concurrent value for provider '{provider}': {value}. Using default (1)."
+        )
+
+
+# Keyed by the text before the first "_", so most variables cost a single dict lookup.
+# Values are (remainder of the prefix, handler(scan, provider, value)).
+_ENV_PREFIX_HANDLERS = {
+    "IGNORE": ("MODELS_", _load_ignore_models),
+    "WHITELIST": ("MODELS_", _load_whitelist_models),
+    "MAX": ("CONCURRENT_REQUESTS_PER_KEY_", _load_max_concurrent),
+}
+
+
+def scan_env(environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Discover API keys, model filters and concurrency limits in a single pass over the environment.
+
+    Returns:
+        Dict with "api_keys", "ignore_models", "whitelist_models" and
+        "max_concurrent_requests_per_key", each keyed by provider.
+    """
+    if environ is None:
+        environ = os.environ
+
+    scan = {
+        "api_keys": {},
+        "ignore_models": {},
+        "whitelist_models": {},
+        "max_concurrent_requests_per_key": {},
+    }
+    api_keys = scan["api_keys"]
+
+    for key, value in environ.items():
+        head, _, rest = key.partition("_")
+        prefix_handler = _ENV_PREFIX_HANDLERS.get(head)
+        if prefix_handler and rest.startswith(prefix_handler[0]):
+            prefix_rest, handler = prefix_handler
+            handler(scan, rest[len(prefix_rest) :].lower(), value)
+        elif "_API_KEY" in key and key != "PROXY_API_KEY":
+            # Numbered keys (e.g. OPENAI_API_KEY_2) share the provider of the base name
+            provider = key.partition("_API_KEY")[0].lower()
+            api_keys.setdefault(provider, []).append(value)
+
+    return scan
@@ -0,0 +1,125 @@
+"""
+Background queue for detailed request logging, so log file writes happen
+off the event loop instead of inside request handlers.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+# Records beyond this are dropped rather than stalling request handlers
+LOG_QUEUE_MAX_SIZE = 10_000
+# Maximum number of queued calls handed to a worker thread at once
+LOG_QUEUE_BATCH_SIZE = 256
+
+# Credential-bearing request headers, masked before they reach the log files
+REDACTED_HEADERS = frozenset({"authorization", "x-api-key"})
+
+_LogCall = Tuple[Callable[..., Any], tuple, dict]
+
+
+class RequestLogQueue:
+    """
+    Bounded queue of logger calls drained by a single background task.
+    Calls are replayed in submission order in a worker thread, batched so a
+    burst of stream chunks costs one thread hop instead of one per record.
+    """
+
+    def __init__(
+        self,
+        max_size: int = LOG_QUEUE_MAX_SIZE,
+        batch_size: int = LOG_QUEUE_BATCH_SIZE,
+    ):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._dropped = 0
+
+    def start(self):
+        """Start the background consumer."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs):
+        """Queue a logger call without blocking; drops it if the queue is full."""
+        try:
+            self._queue.put_nowait((func, args, kwargs))
+        except asyncio.QueueFull:
+            self._dropped += 1
+            if self._dropped == 1 or self._dropped % 1000 == 0:
+                logging.warning(
+                    f"Request log queue is full; dropped {self._dropped} log record(s)."
+                )
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            batch: List[_LogCall] = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+            if batch:
+                await asyncio.to_thread(self._write_batch, batch)
+            if stop:
+                return
+
+    @staticmethod
+    def _write_batch(batch: List[_LogCall]):
+        for func, args, kwargs in batch:
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logging.error(f"Failed to write request log record: {e}")
+
+    async def stop(self):
+        """Flush everything queued so far and stop the consumer."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+
+def _materialize_headers(headers) -> Optional[dict]:
+    """Copy a headers mapping into a plain dict with credential headers masked."""
+    if headers is None:
+        return None
+    return {
+        key: "[REDACTED]" if key.lower() in REDACTED_HEADERS else value
+        for key, value in headers.items()
+    }
+
+
+class QueuedDetailedLogger:
+    """
+    Forwards DetailedLogger calls to a RequestLogQueue. Request headers are
+    passed by reference and only copied (and redacted) by the queue consumer.
+    """
+
+    def __init__(self, logger, queue: RequestLogQueue):
+        self._logger = logger
+        self._queue = queue
+
+    def log_request(self, **kwargs):
+        self._queue.submit(self._write_request, kwargs)
+
+    def _write_request(self, kwargs: dict):
+        if "headers" in kwargs:
+            kwargs["headers"] = _materialize_headers(kwargs["headers"])
+        self._logger.log_request(**kwargs)
+
+    def log_stream_chunk(self, chunk: dict):
+        self._queue.submit(self._logger.log_stream_chunk, chunk)
+
+    def log_final_response(self, **kwargs):
+        self._queue.submit(self._logger.log_final_response, **kwargs)
@@ -0,0 +1,120 @@
+"""
+Logging configuration for the proxy: colored console output plus lazily-opened log files.
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
+
+
+class ColoredFormatter(logging.Formatter):
+    """Colors console records by level with plain ANSI codes (no-op when not a TTY)."""
+
+    LOG_COLORS = {
+        logging.DEBUG: "\033[36m",  # cyan
+        logging.INFO: "\033[32m",  # green
+        logging.WARNING: "\033[33m",  # yellow
+        logging.ERROR: "\033[31m",  # red
+        logging.CRITICAL: "\033[31;47m",  # red on white
+    }
+    RESET = "\033[0m"
+
+    def __init__(self, fmt=None, use_color: bool = True):
+        super().__init__(fmt)
+        self.use_color = use_color
+
+    def format(self, record):
+        message = super().format(record)
+        color = self.LOG_COLORS.get(record.levelno) if self.use_color else None
+        return f"{color}{message}{self.RESET}" if color else message
+
+
+class LazyFileHandler(logging.Handler):
+    """
+    File handler that defers creating the log directory and opening the file
+    until the first record actually reaches it.
+    """
+
+    def __init__(self, filename: Path, encoding: str = "utf-8"):
+        super().__init__()
+        self.filename = Path(filename)
+        self.encoding = encoding
+        self._file_handler: Optional[logging.FileHandler] = None
+
+    def emit(self, record):
+        try:
+            if self._file_handler is None:
+                self.filename.parent.mkdir(exist_ok=True)
+                self._file_handler = logging.FileHandler(
+                    self.filename, encoding=self.encoding
+                )
+                self._file_handler.setFormatter(self.formatter)
+            self._file_handler.emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        if self._file_handler is not None:
+            self._file_handler.close()
+        super().close()
+
+
+# Create a filter to ensure the debug handler ONLY gets DEBUG messages from the rotator_library
+class RotatorDebugFilter(logging.Filter):
+    def filter(self, record):
+        return record.levelno == logging.DEBUG and record.name.startswith(
+            "rotator_library"
+        )
+
+
+# Add a filter to prevent any LiteLLM logs from cluttering the console
+class NoLiteLLMLogFilter(logging.Filter):
+    def filter(self, record):
+        return not record.name.startswith("LiteLLM")
+
+
+def configure(log_dir: Path = LOG_DIR):
+    """Attach the console and file handlers to the root logger."""
+    # Configure a file handler for INFO-level logs and higher
+    info_file_handler = LazyFileHandler(log_dir / "proxy.log")
+    info_file_handler.setLevel(logging.INFO)
+    info_file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    # Configure a dedicated file handler for all DEBUG-level logs
+    debug_file_handler = LazyFileHandler(log_dir / "proxy_debug.log")
+    debug_file_handler.setLevel(logging.DEBUG)
+    debug_file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    debug_file_handler.addFilter(RotatorDebugFilter())
+
+    # Configure a console handler with color (INFO and above only, no DEBUG)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    formatter = ColoredFormatter("%(message)s", use_color=sys.stdout.isatty())
+    console_handler.setFormatter(formatter)
+    console_handler.addFilter(NoLiteLLMLogFilter())
+
+    # Get the root logger and set it to DEBUG to capture all messages
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+
+    # Add all handlers to the root logger
+    root_logger.addHandler(info_file_handler)
+    root_logger.addHandler(console_handler)
+    root_logger.addHandler(debug_file_handler)
+
+    # Silence other noisy loggers by setting their level higher than root
+    logging.getLogger("uvicorn").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # Isolate LiteLLM's logger to prevent it from reaching the console.
+    # We will capture its logs via the logger_fn callback in the client instead.
+    litellm_logger = logging.getLogger("LiteLLM")
+    litellm_logger.handlers = []
+    litellm_logger.propagate = False
@@ -0,0 +1,293 @@
+"""
+Startup OAuth credential initialization: pre-scan, deduplication by account
+email and metadata writeback, with an on-disk cache of unchanged files.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
+
+# Kept beside the credentials (dotfiles are skipped by discovery), not in logs/,
+# since it lists credential paths and account emails
+OAUTH_META_CACHE_FILE = Path.cwd() / "oauth_creds" / ".oauth_meta.cache.json"
+
+# Startup OAuth initialization limits. The timeout matches the interactive re-auth
+# window, so a credential that needs a browser login at startup isn't cut off.
+OAUTH_INIT_CONCURRENCY = 8
+OAUTH_INIT_TIMEOUT_SECONDS = 300.0
+
+
+def _load_meta_cache() -> dict:
+    """Load the credential pre-scan cache ({path: {mtime, size, email}})."""
+    try:
+        with open(OAUTH_META_CACHE_FILE, "rb") as f:
+            cache = orjson.loads(f.read())
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def _save_meta_cache(cache: dict):
+    """Persist the credential pre-scan cache. Failures only cost a re-read next start."""
+    try:
+        OAUTH_META_CACHE_FILE.parent.mkdir(exist_ok=True)
+        _write_json_atomic(OAUTH_META_CACHE_FILE, cache)
+    except OSError as e:
+        logging.debug(f"Failed to save credential metadata cache: {e}")
+
+
+def _write_json_atomic(path, data: dict):
+    """Write JSON to a 0600 temp file in the target directory, then os.replace it in."""
+    # mkstemp creates the temp file 0600 with a unique name, so token material is
+    # never world-readable and concurrent writers can't collide
+    tmp_fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp_", suffix=".json"
+    )
+    try:
+        with os.fdopen(tmp_fd, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        try:
+            os.chmod(tmp_path, 0o600)
+        except (OSError, AttributeError):
+            # Windows may not support chmod, ignore
+            pass
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_credential_metadata(path: str, email: str) -> dict:
+    """
+    Stamp email/last_check_timestamp into a credential file's _proxy_metadata.
+    Runs in a worker thread and replaces the file atomically; returns the new cache entry.
+    """
+    # Re-read rather than reuse the pre-scan: initialization may have refreshed tokens
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    metadata = data.get("_proxy_metadata", {})
+    metadata["email"] = email
+    metadata["last_check_timestamp"] = time.time()
+    data["_proxy_metadata"] = metadata
+    _write_json_atomic(path, data)
+
+    st = os.stat(path)
+    return {"mtime": st.st_mtime, "size": st.st_size, "email": email}
+
+
+def _read_credential_metadata(path: str, cached: Optional[dict] = None):
+    """
+    Read the proxy metadata email from a credential file.
+    Runs in a worker thread; returns (email, error, cache_entry) so the caller can
+    dedupe in order. The file is only parsed when its mtime/size differ from `cached`.
+    """
+    try:
+        st = os.stat(path)
+        if (
+            cached
+            and cached.get("mtime") == st.st_mtime
+            and cached.get("size") == st.st_size
+        ):
+            return cached.get("email"), None, cached
+
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        email = data.get("_proxy_metadata", {}).get("email")
+        return email, None, {"mtime": st.st_mtime, "size": st.st_size, "email": email}
+    except (FileNotFoundError, orjson.JSONDecodeError) as e:
+        return None, e, None
+
+
+async def prepare_credentials(
+    oauth_credentials: Dict[str, List[str]], provider_plugins: dict
+) -> Dict[str, List[str]]:
+    """
+    Initialize discovered OAuth credentials and drop duplicate accounts.
+
+    Args:
+        oauth_credentials: Provider name -> credential paths (file or env:// virtual paths)
+        provider_plugins: Provider name -> provider plugin class
+
+    Returns:
+        The credentials that initialized successfully, deduplicated per provider.
+    """
+    logging.info("Starting OAuth credential validation and deduplication...")
+    processed_emails = {}  # email -> {provider: path}
+    credentials_to_initialize = {}  # provider -> [paths]
+    final_oauth_credentials = {}
+
+    # --- Pass 1: Pre-initialization Scan & Deduplication ---
+    # logging.info("Pass 1: Scanning for existing metadata to find duplicates...")
+    # Read all credential files concurrently off the event loop, then dedupe in order
+    file_credentials = [
+        (provider, path)
+        for provider, paths in oauth_credentials.items()
+        for path in paths
+        if not path.startswith("env://")
+    ]
+    # Files unchanged since the last start are served from the on-disk cache
+    previous_meta_cache = _load_meta_cache()
+    metadata_results = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                _read_credential_metadata, path, previous_meta_cache.get(path)
+            )
+            for _, path in file_credentials
+        )
+    )
+    prescanned = dict(zip(file_credentials, metadata_results))
+    meta_cache = {
+        path: entry
+        for (_, path), (_, _, entry) in prescanned.items()
+        if entry is not None
+    }
+
+    for provider, paths in oauth_credentials.items():
+        if provider not in credentials_to_initialize:
+            credentials_to_initialize[provider] = []
+        for path in paths:
+            # Skip env-based credentials (virtual paths) - they don't have metadata files
+            if path.startswith("env://"):
+                credentials_to_initialize[provider].append(path)
+                continue
+
+            email, error, _ = prescanned[(provider, path)]
+            if error:
+                logging.warning(
+                    f"Could not pre-read metadata from '{path}': {error}. Will process during initialization."
+                )
+                credentials_to_initialize[provider].append(path)
+                continue
+
+            if email:
+                if email not in processed_emails:
+                    processed_emails[email] = {}
+
+                if provider in processed_emails[email]:
+                    original_path = processed_emails[email][provider]
+                    logging.warning(
+                        f"Duplicate for '{email}' on '{provider}' found in pre-scan: '{Path(path).name}'. Original: '{Path(original_path).name}'. Skipping."
+                    )
+                    continue
+                else:
+                    processed_emails[email][provider] = path
+
+            credentials_to_initialize[provider].append(path)
+
+    # --- Pass 2: Parallel Initialization of Filtered Credentials ---
+    # logging.info("Pass 2: Initializing unique credentials and performing final check...")
+    init_semaphore = asyncio.Semaphore(OAUTH_INIT_CONCURRENCY)
+
+    async def initialize_credential(provider_instance, path: str):
+        await provider_instance.initialize_token(path)
+
+        if not hasattr(provider_instance, "get_user_info"):
+            return None
+
+        user_info = await provider_instance.get_user_info(path)
+        return user_info.get("email")
+
+    async def process_credential(provider: str, path: str, provider_instance):
+        """Process a single credential: initialize and fetch user info."""
+        async with init_semaphore:
+            try:
+                email = await asyncio.wait_for(
+                    initialize_credential(provider_instance, path),
+                    timeout=OAUTH_INIT_TIMEOUT_SECONDS,
+                )
+                return (provider, path, email, None)
+
+            except asyncio.TimeoutError as e:
+                logging.error(
+                    f"Timed out after {OAUTH_INIT_TIMEOUT_SECONDS:.0f}s processing OAuth token for {provider} at '{path}'."
+                )
+                return (provider, path, None, e)
+            except Exception as e:
+                logging.error(
+                    f"Failed to process OAuth token for {provider} at '{path}': {e}"
+                )
+                return (provider, path, None, e)
+
+    # Collect all tasks for parallel execution
+    tasks = []
+    for provider, paths in credentials_to_initialize.items():
+        if not paths:
+            continue
+
+        provider_plugin_class = provider_plugins.get(provider)
+        if not provider_plugin_class:
+            continue
+
+        provider_instance = provider_plugin_class()
+
+        for path in paths:
+            tasks.append(process_credential(provider, path, provider_instance))
+
+    # --- Pass 3: Sequential Deduplication and Final Assembly ---
+    # Execute all credential processing tasks in parallel (bounded by the semaphore),
+    # then assemble in discovery order so the result and dedup winner are deterministic
+    results = await asyncio.gather(*tasks)
+    for provider, path, email, error in results:
+
+        # Skip if there was an error
+        if error:
+            continue
+
+        # If provider doesn't support get_user_info, add directly
+        if email is None:
+            if provider not in final_oauth_credentials:
+                final_oauth_credentials[provider] = []
+            final_oauth_credentials[provider].append(path)
+            continue
+
+        # Handle empty email
+        if not email:
+            logging.warning(
+                f"Could not retrieve email for '{path}'. Treating as unique."
+            )
+            if provider not in final_oauth_credentials:
+                final_oauth_credentials[provider] = []
+            final_oauth_credentials[provider].append(path)
+            continue
+
+        # Deduplication check
+        if email not in processed_emails:
+            processed_emails[email] = {}
+
+        if (
+            provider in processed_emails[email]
+            and processed_emails[email][provider] != path
+        ):
+            original_path = processed_emails[email][provider]
+            logging.warning(
+                f"Duplicate for '{email}' on '{provider}' found post-init: '{Path(path).name}'. Original: '{Path(original_path).name}'. Skipping."
+            )
+            continue
+        else:
+            processed_emails[email][provider] = path
+            if provider not in final_oauth_credentials:
+                final_oauth_credentials[provider] = []
+            final_oauth_credentials[provider].append(path)
+
+            # Update metadata (skip for env-based credentials - they don't have files)
+            if not path.startswith("env://"):
+                try:
+                    # Record the rewritten file so the next start can skip it
+                    meta_cache[path] = await asyncio.to_thread(
+                        _write_credential_metadata, path, email
+                    )
+                except Exception as e:
+                    logging.error(f"Failed to update metadata for '{path}': {e}")
+
+    _save_meta_cache(meta_cache)
+    logging.info("OAuth credential processing complete.")
+    return final_oauth_credentials
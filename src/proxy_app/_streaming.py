@@ -0,0 +1,220 @@
+"""
+Streaming response handling for the proxy: relays SSE chunks to the client
+and aggregates them into a single response for logging.
+"""
+
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncGenerator, Optional
+
+import orjson
+
+if TYPE_CHECKING:
+    from fastapi import Request
+
+    from proxy_app.detailed_logger import DetailedLogger
+
+DISCONNECT_CHECK_INTERVAL = 32
+
+# Fixed SSE lines, built once instead of per stream. The error template only
+# needs the JSON-encoded message substituted in.
+_DONE_LINE = "data: [DONE]\n\n"
+_ERROR_TEMPLATE = (
+    'data: {{"error":{{"message":{msg},"type":"proxy_internal_error","code":500}}}}\n\n'
+)
+
+
+async def streaming_response_wrapper(
+    request: "Request",
+    request_data: dict,
+    response_stream: AsyncGenerator[str, None],
+    logger: Optional["DetailedLogger"] = None,
+    enable_request_logging: bool = False,
+) -> AsyncGenerator[str, None]:
+    """
+    Wraps a streaming response to log the full response after completion
+    and ensures any errors during the stream are sent to the client.
+    """
+    response_chunks = []
+    full_response = {}
+    chunk_count = 0
+    # Chunks are only parsed to build the logged response; with no logging,
+    # upstream frames are relayed as-is
+    collect_chunks = logger is not None or enable_request_logging
+
+    try:
+        async for chunk_str in response_stream:
+            # Polling the ASGI receive channel costs an event-loop hop, so only check
+            # for a disconnected client every DISCONNECT_CHECK_INTERVAL chunks
+            chunk_count += 1
+            if (
+                chunk_count % DISCONNECT_CHECK_INTERVAL == 0
+                and await request.is_disconnected()
+            ):
+                logging.warning("Client disconnected, stopping stream.")
+                break
+            yield chunk_str
+            if collect_chunks and chunk_str.startswith("data:"):
+                content = chunk_str[5:].strip()  # len("data:") == 5
+                if content and content != "[DONE]":
+                    try:
+                        chunk_data = orjson.loads(content)
+                        response_chunks.append(chunk_data)
+                        if logger:
+                            logger.log_stream_chunk(chunk_data)
+                    except orjson.JSONDecodeError:
+                        pass
+    except Exception as e:
+        logging.error(f"An error occurred during the response stream: {e}")
+        # Yield a final error message to the client to ensure they are not left hanging.
+        error_message = f"An unexpected error occurred during the stream: {str(e)}"
+        yield _ERROR_TEMPLATE.format(msg=orjson.dumps(error_message).decode())
+        yield _DONE_LINE
+        # Also log this as a failed request
+        if logger:
+            logger.log_final_response(
+                status_code=500, headers=None, body={"error": str(e)}
+            )
+        return  # Stop further processing
+    finally:
+        if response_chunks:
+            # --- Aggregation Logic ---
+            # One pass over the chunks collects the message fields, finish_reason and
+            # usage; text fragments are buffered in lists and joined once at the end.
+            final_message = {"role": "assistant"}
+            content_parts = []
+            tool_call_parts = []  # Indexed by tool call index: {"id"?, "name": [...], "arguments": [...]}
+            function_call_parts = None  # {"name": [...], "arguments": [...]}
+            finish_reason = None
+            prompt_tokens = completion_tokens = total_tokens = 0
+
+            for chunk in response_chunks:
+                usage = chunk.get("usage")
+                if usage:
+                    prompt_tokens += usage.get("prompt_tokens", 0)
+                    completion_tokens += usage.get("completion_tokens", 0)
+                    total_tokens += usage.get("total_tokens", 0)
+
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                choice = choices[0]
+
+                # Track finish_reason from the last chunk that has it
+                if choice.get("finish_reason"):
+                    finish_reason = choice["finish_reason"]
+
+                delta = choice.get("delta")
+                if not delta:
+                    continue
+
+                # Dynamically aggregate all fields from the delta
+                for key, value in delta.items():
+                    if value is None:
+                        continue
+
+                    if key == "content":
+                        if "content" not in final_message:
+                            final_message["content"] = ""
+                        if value:
+                            content_parts.append(value)
+
+                    elif key == "tool_calls":
+                        for tc_chunk in value:
+                            index = tc_chunk["index"]
+                            if index >= len(tool_call_parts):
+                                tool_call_parts.extend(
+                                    [None] * (index + 1 - len(tool_call_parts))
+                                )
+                            entry = tool_call_parts[index]
+                            if entry is None:
+                                entry = tool_call_parts[index] = {
+                                    "name": [],
+                                    "arguments": [],
+                                }
+                            if "id" in tc_chunk:
+                                entry["id"] = tc_chunk["id"]
+                            function = tc_chunk.get("function")
+                            if function:
+                                if function.get("name"):
+                                    entry["name"].append(function["name"])
+                                if function.get("arguments"):
+                                    entry["arguments"].append(function["arguments"])
+
+                    elif key == "function_call":
+                        if function_call_parts is None:
+                            function_call_parts = {"name": [], "arguments": []}
+                        if value.get("name"):
+                            function_call_parts["name"].append(value["name"])
+                        if value.get("arguments"):
+                            function_call_parts["arguments"].append(value["arguments"])
+
+            if content_parts:
+                final_message["content"] = "".join(content_parts)
+
+            # Add aggregated tool calls to final message (fragments joined once here)
+            aggregated_tool_calls = []
+            for entry in tool_call_parts:
+                if entry is None:
+                    continue
+                tool_call = {
+                    "type": "function",
+                    "function": {
+                        "name": "".join(entry["name"]),
+                        "arguments": "".join(entry["arguments"]),
+                    },
+                }
+                if "id" in entry:
+                    tool_call["id"] = entry["id"]
+                aggregated_tool_calls.append(tool_call)
+            if aggregated_tool_calls:
+                final_message["tool_calls"] = aggregated_tool_calls
+
+            # Add function call to final message if any; the explicit None is only
+            # reported for requests that offered functions/tools
+            if function_call_parts is not None:
+                final_message["function_call"] = {
+                    "name": "".join(function_call_parts["name"]),
+                    "arguments": "".join(function_call_parts["arguments"]),
+                }
+            elif request_data.get("functions") or request_data.get("tools"):
+                final_message["function_call"] = None
+
+            # Create the aggregated response
+            full_response = {
+                "id": response_chunks[-1].get("id", ""),
+                "object": "chat.completion",
+                "created": response_chunks[0].get("created", int(time.time())),
+                "model": request_data.get("model", ""),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": final_message,
+                        "finish_reason": finish_reason,
+                    }
+                ],
+            }
+
+            # Aggregate usage if present
+            if prompt_tokens or completion_tokens or total_tokens:
+                full_response["usage"] = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": total_tokens,
+                }
+
+            # Log the final aggregated response if we have a logger
+            if logger:
+                logger.log_final_response(status_code=200, headers=None, body=full_response)
+
+            # Log to console
+            if enable_request_logging:
+                from proxy_app.request_logger import log_request_to_console
+
+                log_request_to_console(
+                    model=request_data.get("model", "unknown"),
+                    input_messages=request_data.get("messages", []),
+                    response=full_response,
+                    processing_time=None,  # Would need to track start time to calculate this
+                )
+
@@ -5,7 +5,6 @@ Provides a beautiful Rich-based interface for configuration and execution.
 
 import json
 import os
-import sys
 from pathlib import Path
 from rich.console import Console
 from rich.prompt import IntPrompt, Prompt
@@ -13,19 +12,9 @@ from rich.panel import Panel
 from rich.text import Text
 from dotenv import load_dotenv, set_key
 
-console = Console()
-
+from rotator_library.utils.terminal import clear_screen
 
-def clear_screen():
-    """
-    Cross-platform terminal clear that works robustly on both
-    classic Windows conhost and modern terminals (Windows Terminal, Linux, Mac).
-
-    Uses native OS commands instead of ANSI escape sequences:
-    - Windows (conhost & Windows Terminal): cls
-    - Unix-like systems (Linux, Mac): clear
-    """
-    os.system("cls" if os.name == "nt" else "clear")
+console = Console()
 
 
 class LauncherConfig:
@@ -260,6 +249,7 @@ class LauncherTUI:
         self.console = Console()
         self.config = LauncherConfig()
         self.running = True
+        self.launch_args = None  # Set by run_proxy(); returned to main.py
         self.env_file = Path.cwd() / ".env"
         # Load .env file to ensure environment variables are available
         load_dotenv(dotenv_path=self.env_file, override=True)
@@ -425,7 +415,6 @@ class LauncherTUI:
             self.show_about()
         elif choice == "7":
             self.running = False
-            sys.exit(0)
 
     def confirm_setting_change(self, setting_name: str, warning_lines: list) -> bool:
         """
@@ -936,7 +925,7 @@ class LauncherTUI:
                 )
                 return
 
-        # Clear console and modify sys.argv
+        # Clear console and hand launch settings back to main.py
         clear_screen()
         self.console.print(
             f"\n[bold green]🚀 Starting proxy on {self.config.config['host']}:{self.config.config['port']}...[/bold green]\n"
@@ -948,22 +937,25 @@ class LauncherTUI:
         time.sleep(0.5)  # Brief pause so user sees the message
         clear_screen()
 
-        # Reconstruct sys.argv for main.py
-        sys.argv = [
-            "main.py",
-            "--host",
-            self.config.config["host"],
-            "--port",
-            str(self.config.config["port"]),
-        ]
-        if self.config.config["enable_request_logging"]:
-            sys.argv.append("--enable-request-logging")
+        # Hand the settings back to main.py (merged into its parsed args)
+        self.launch_args = {
+            "host": self.config.config["host"],
+            "port": self.config.config["port"],
+            "enable_request_logging": self.config.config["enable_request_logging"],
+        }
 
         # Exit TUI - main.py will continue execution
         self.running = False
 
 
 def run_launcher_tui():
-    """Entry point for launcher TUI"""
+    """
+    Entry point for launcher TUI.
+
+    Returns:
+        Dict with host, port and enable_request_logging if the user chose to run
+        the proxy, or None if they exited.
+    """
     tui = LauncherTUI()
     tui.run()
+    return tui.launch_args
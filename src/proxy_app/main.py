@@ -6,6 +6,7 @@ import os
 from pathlib import Path
 import sys
 import argparse
+import hmac
 import logging
 
 # --- Argument Parsing (BEFORE heavy imports) ---
@@ -32,11 +33,13 @@ if len(sys.argv) == 1:
     # TUI MODE - Load ONLY what's needed for the launcher (fast path!)
     from proxy_app.launcher_tui import run_launcher_tui
 
-    run_launcher_tui()
-    # Launcher modifies sys.argv and returns, or exits if user chose Exit
-    # If we get here, user chose "Run Proxy" and sys.argv is modified
-    # Re-parse arguments with modified sys.argv
-    args = parser.parse_args()
+    launch_args = run_launcher_tui()
+    # Launcher returns the chosen settings, or None if user chose Exit
+    if launch_args is None:
+        sys.exit(0)
+    # Merge into the already-parsed args instead of re-parsing a rebuilt sys.argv
+    for _arg_name, _arg_value in launch_args.items():
+        setattr(args, _arg_name, _arg_value)
 
 # Check if credential tool mode (also doesn't need heavy proxy imports)
 if args.add_credential:
@@ -49,18 +52,9 @@ if args.add_credential:
 _start_time = time.time()
 
 # Load all .env files from root folder (main .env first, then any additional *.env files)
-from dotenv import load_dotenv
-from glob import glob
+from proxy_app._env_scan import load_env_files
 
-# Load main .env first
-load_dotenv()
-
-# Load any additional .env files (e.g., antigravity_all_combined.env, gemini_cli_all_combined.env)
-_root_dir = Path.cwd()
-_env_files_found = list(_root_dir.glob("*.env"))
-for _env_file in sorted(_root_dir.glob("*.env")):
-    if _env_file.name != ".env":  # Skip main .env (already loaded)
-        load_dotenv(_env_file, override=False)  # Don't override existing values
+_env_files_found = load_env_files()
 
 # Log discovered .env files for deployment verification
 if _env_files_found:
@@ -81,38 +75,45 @@ print(f"GitHub: https://github.com/Mirrowel/LLM-API-Key-Proxy")
 print("━" * 70)
 print("Loading server components...")
 
-# Phase 2: Load Rich for loading spinner (lightweight)
-from rich.console import Console
+# Phase 2: Loading spinners only add value on an interactive terminal, so Rich is
+# imported for TTYs only (containers/headless deployments skip it entirely)
+if sys.stdout.isatty():
+    from rich.console import Console
+
+    _console = Console()
+    _loading_status = _console.status
+else:
+    from contextlib import nullcontext
+
+    def _loading_status(*args, **kwargs):
+        return nullcontext()
 
-_console = Console()
 
 # Phase 3: Heavy dependencies with granular loading messages
+# (--add-credential and TUI exit paths above never reach this point; LiteLLM
+# itself is deferred to lifespan startup)
 print("  → Loading FastAPI framework...")
-with _console.status("[dim]Loading FastAPI framework...", spinner="dots"):
+with _loading_status("[dim]Loading FastAPI framework...", spinner="dots"):
     from contextlib import asynccontextmanager
     from fastapi import FastAPI, Request, HTTPException, Depends
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import StreamingResponse
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import ORJSONResponse, Response, StreamingResponse
     from fastapi.security import APIKeyHeader
 
 print("  → Loading core dependencies...")
-with _console.status("[dim]Loading core dependencies...", spinner="dots"):
-    from dotenv import load_dotenv
-    import colorlog
-    import json
-    from typing import AsyncGenerator, Any, List, Optional, Union
-    from pydantic import BaseModel, Field
+with _loading_status("[dim]Loading core dependencies...", spinner="dots"):
+    import orjson
+    from functools import lru_cache
+    from typing import Any, List, Optional, Tuple, Union
+    from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
     # --- Early Log Level Configuration ---
     logging.getLogger("LiteLLM").setLevel(logging.WARNING)
 
-print("  → Loading LiteLLM library...")
-with _console.status("[dim]Loading LiteLLM library...", spinner="dots"):
-    import litellm
-
 # Phase 4: Application imports with granular loading messages
 print("  → Initializing proxy core...")
-with _console.status("[dim]Initializing proxy core...", spinner="dots"):
+with _loading_status("[dim]Initializing proxy core...", spinner="dots"):
     from rotator_library import RotatingClient
     from rotator_library.credential_manager import CredentialManager
     from rotator_library.background_refresher import BackgroundRefresher
@@ -120,11 +121,12 @@ with _console.status("[dim]Initializing proxy core...", spinner="dots"):
     from proxy_app.request_logger import log_request_to_console
     from proxy_app.batch_manager import EmbeddingBatcher
     from proxy_app.detailed_logger import DetailedLogger
+    from proxy_app._streaming import streaming_response_wrapper
 
 print("  → Discovering provider plugins...")
 # Provider lazy loading happens during import, so time it here
 _provider_start = time.time()
-with _console.status("[dim]Discovering provider plugins...", spinner="dots"):
+with _loading_status("[dim]Discovering provider plugins...", spinner="dots"):
     from rotator_library import (
         PROVIDER_PLUGINS,
     )  # This triggers lazy load via __getattr__
@@ -188,8 +190,7 @@ class EnrichedModelCard(BaseModel):
     _sources: Optional[List[str]] = None
     _match_type: Optional[str] = None
 
-    class Config:
-        extra = "allow"  # Allow extra fields from the service
+    model_config = ConfigDict(extra="allow")  # Allow extra fields from the service
 
 
 class ModelList(BaseModel):
@@ -206,24 +207,18 @@ class EnrichedModelList(BaseModel):
     data: List[EnrichedModelCard]
 
 
-# Calculate total loading time
-_elapsed = time.time() - _start_time
-print(
-    f"✓ Server ready in {_elapsed:.2f}s ({_plugin_count} providers discovered in {_provider_time:.2f}s)"
-)
+# Serializers for the model list endpoints; building the list wrapper models per
+# request would re-validate every card that was just constructed.
+MODEL_CARD_LIST_ADAPTER = TypeAdapter(List[ModelCard])
 
-# Clear screen and reprint header for clean startup view
-# This pushes loading messages up (still in scroll history) but shows a clean final screen
-import os as _os_module
+# Serialized defaults of an EnrichedModelCard. Basic cards (no pricing data) only
+# differ in id/created/owned_by, so they are built from this template without
+# validating a pydantic model per entry.
+ENRICHED_MODEL_CARD_TEMPLATE = EnrichedModelCard(id="", created=0).model_dump()
 
-_os_module.system("cls" if _os_module.name == "nt" else "clear")
 
-# Reprint header
-print("━" * 70)
-print(f"Starting proxy on {args.host}:{args.port}")
-print(f"Proxy API Key: {key_display}")
-print(f"GitHub: https://github.com/Mirrowel/LLM-API-Key-Proxy")
-print("━" * 70)
+# Calculate total loading time
+_elapsed = time.time() - _start_time
 print(
     f"✓ Server ready in {_elapsed:.2f}s ({_plugin_count} providers discovered in {_provider_time:.2f}s)"
 )
@@ -232,161 +227,31 @@ print(
 # Note: Debug logging will be added after logging configuration below
 
 # --- Logging Configuration ---
-LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
-
-# Configure a console handler with color (INFO and above only, no DEBUG)
-console_handler = colorlog.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-formatter = colorlog.ColoredFormatter(
-    "%(log_color)s%(message)s",
-    log_colors={
-        "DEBUG": "cyan",
-        "INFO": "green",
-        "WARNING": "yellow",
-        "ERROR": "red",
-        "CRITICAL": "red,bg_white",
-    },
-)
-console_handler.setFormatter(formatter)
-
-# Configure a file handler for INFO-level logs and higher
-info_file_handler = logging.FileHandler(LOG_DIR / "proxy.log", encoding="utf-8")
-info_file_handler.setLevel(logging.INFO)
-info_file_handler.setFormatter(
-    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-)
-
-# Configure a dedicated file handler for all DEBUG-level logs
-debug_file_handler = logging.FileHandler(LOG_DIR / "proxy_debug.log", encoding="utf-8")
-debug_file_handler.setLevel(logging.DEBUG)
-debug_file_handler.setFormatter(
-    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-)
-
-
-# Create a filter to ensure the debug handler ONLY gets DEBUG messages from the rotator_library
-class RotatorDebugFilter(logging.Filter):
-    def filter(self, record):
-        return record.levelno == logging.DEBUG and record.name.startswith(
-            "rotator_library"
-        )
-
-
-debug_file_handler.addFilter(RotatorDebugFilter())
-
-# Configure a console handler with color
-console_handler = colorlog.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-formatter = colorlog.ColoredFormatter(
-    "%(log_color)s%(message)s",
-    log_colors={
-        "DEBUG": "cyan",
-        "INFO": "green",
-        "WARNING": "yellow",
-        "ERROR": "red",
-        "CRITICAL": "red,bg_white",
-    },
-)
-console_handler.setFormatter(formatter)
-
+from proxy_app._logging import configure as configure_logging
 
-# Add a filter to prevent any LiteLLM logs from cluttering the console
-class NoLiteLLMLogFilter(logging.Filter):
-    def filter(self, record):
-        return not record.name.startswith("LiteLLM")
-
-
-console_handler.addFilter(NoLiteLLMLogFilter())
-
-# Get the root logger and set it to DEBUG to capture all messages
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-
-# Add all handlers to the root logger
-root_logger.addHandler(info_file_handler)
-root_logger.addHandler(console_handler)
-root_logger.addHandler(debug_file_handler)
-
-# Silence other noisy loggers by setting their level higher than root
-logging.getLogger("uvicorn").setLevel(logging.WARNING)
-logging.getLogger("httpx").setLevel(logging.WARNING)
-
-# Isolate LiteLLM's logger to prevent it from reaching the console.
-# We will capture its logs via the logger_fn callback in the client instead.
-litellm_logger = logging.getLogger("LiteLLM")
-litellm_logger.handlers = []
-litellm_logger.propagate = False
+configure_logging()
 
 # Now that logging is configured, log the module load time to debug file only
 logging.debug(f"Modules loaded in {_elapsed:.2f}s")
 
-# Load environment variables from .env file
-load_dotenv()
-
 # --- Configuration ---
 USE_EMBEDDING_BATCHER = False
 ENABLE_REQUEST_LOGGING = args.enable_request_logging
 if ENABLE_REQUEST_LOGGING:
     logging.info("Request logging is enabled.")
 PROXY_API_KEY = os.getenv("PROXY_API_KEY")
+# Expected Authorization header, built once instead of per request
+EXPECTED_AUTH_HEADER = f"Bearer {PROXY_API_KEY}" if PROXY_API_KEY else None
 # Note: PROXY_API_KEY validation moved to server startup to allow credential tool to run first
 
-# Discover API keys from environment variables
-api_keys = {}
-for key, value in os.environ.items():
-    if "_API_KEY" in key and key != "PROXY_API_KEY":
-        provider = key.split("_API_KEY")[0].lower()
-        if provider not in api_keys:
-            api_keys[provider] = []
-        api_keys[provider].append(value)
-
-# Load model ignore lists from environment variables
-ignore_models = {}
-for key, value in os.environ.items():
-    if key.startswith("IGNORE_MODELS_"):
-        provider = key.replace("IGNORE_MODELS_", "").lower()
-        models_to_ignore = [
-            model.strip() for model in value.split(",") if model.strip()
-        ]
-        ignore_models[provider] = models_to_ignore
-        logging.debug(
-            f"Loaded ignore list for provider '{provider}': {models_to_ignore}"
-        )
+# Discover API keys, model filters and concurrency limits in a single pass over the environment
+from proxy_app._env_scan import scan_env
 
-# Load model whitelist from environment variables
-whitelist_models = {}
-for key, value in os.environ.items():
-    if key.startswith("WHITELIST_MODELS_"):
-        provider = key.replace("WHITELIST_MODELS_", "").lower()
-        models_to_whitelist = [
-            model.strip() for model in value.split(",") if model.strip()
-        ]
-        whitelist_models[provider] = models_to_whitelist
-        logging.debug(
-            f"Loaded whitelist for provider '{provider}': {models_to_whitelist}"
-        )
-
-# Load max concurrent requests per key from environment variables
-max_concurrent_requests_per_key = {}
-for key, value in os.environ.items():
-    if key.startswith("MAX_CONCURRENT_REQUESTS_PER_KEY_"):
-        provider = key.replace("MAX_CONCURRENT_REQUESTS_PER_KEY_", "").lower()
-        try:
-            max_concurrent = int(value)
-            if max_concurrent < 1:
-                logging.warning(
-                    f"Invalid max_concurrent value for provider '{provider}': {value}. Must be >= 1. Using default (1)."
-                )
-                max_concurrent = 1
-            max_concurrent_requests_per_key[provider] = max_concurrent
-            logging.debug(
-                f"Loaded max concurrent requests for provider '{provider}': {max_concurrent}"
-            )
-        except ValueError:
-            logging.warning(
-                f"Invalid max_concurrent value for provider '{provider}': {value}. Using default (1)."
-            )
+_env_scan = scan_env()
+api_keys = _env_scan["api_keys"]
+ignore_models = _env_scan["ignore_models"]
+whitelist_models = _env_scan["whitelist_models"]
+max_concurrent_requests_per_key = _env_scan["max_concurrent_requests_per_key"]
 
 
 # --- Lifespan Management ---
@@ -402,153 +267,11 @@ async def lifespan(app: FastAPI):
     oauth_credentials = cred_manager.discover_and_prepare()
 
     if not skip_oauth_init and oauth_credentials:
-        logging.info("Starting OAuth credential validation and deduplication...")
-        processed_emails = {}  # email -> {provider: path}
-        credentials_to_initialize = {}  # provider -> [paths]
-        final_oauth_credentials = {}
-
-        # --- Pass 1: Pre-initialization Scan & Deduplication ---
-        # logging.info("Pass 1: Scanning for existing metadata to find duplicates...")
-        for provider, paths in oauth_credentials.items():
-            if provider not in credentials_to_initialize:
-                credentials_to_initialize[provider] = []
-            for path in paths:
-                # Skip env-based credentials (virtual paths) - they don't have metadata files
-                if path.startswith("env://"):
-                    credentials_to_initialize[provider].append(path)
-                    continue
-
-                try:
-                    with open(path, "r") as f:
-                        data = json.load(f)
-                    metadata = data.get("_proxy_metadata", {})
-                    email = metadata.get("email")
-
-                    if email:
-                        if email not in processed_emails:
-                            processed_emails[email] = {}
-
-                        if provider in processed_emails[email]:
-                            original_path = processed_emails[email][provider]
-                            logging.warning(
-                                f"Duplicate for '{email}' on '{provider}' found in pre-scan: '{Path(path).name}'. Original: '{Path(original_path).name}'. Skipping."
-                            )
-                            continue
-                        else:
-                            processed_emails[email][provider] = path
-
-                    credentials_to_initialize[provider].append(path)
-
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    logging.warning(
-                        f"Could not pre-read metadata from '{path}': {e}. Will process during initialization."
-                    )
-                    credentials_to_initialize[provider].append(path)
-
-        # --- Pass 2: Parallel Initialization of Filtered Credentials ---
-        # logging.info("Pass 2: Initializing unique credentials and performing final check...")
-        async def process_credential(provider: str, path: str, provider_instance):
-            """Process a single credential: initialize and fetch user info."""
-            try:
-                await provider_instance.initialize_token(path)
-
-                if not hasattr(provider_instance, "get_user_info"):
-                    return (provider, path, None, None)
-
-                user_info = await provider_instance.get_user_info(path)
-                email = user_info.get("email")
-                return (provider, path, email, None)
-
-            except Exception as e:
-                logging.error(
-                    f"Failed to process OAuth token for {provider} at '{path}': {e}"
-                )
-                return (provider, path, None, e)
-
-        # Collect all tasks for parallel execution
-        tasks = []
-        for provider, paths in credentials_to_initialize.items():
-            if not paths:
-                continue
-
-            provider_plugin_class = PROVIDER_PLUGINS.get(provider)
-            if not provider_plugin_class:
-                continue
-
-            provider_instance = provider_plugin_class()
-
-            for path in paths:
-                tasks.append(process_credential(provider, path, provider_instance))
-
-        # Execute all credential processing tasks in parallel
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # --- Pass 3: Sequential Deduplication and Final Assembly ---
-        for result in results:
-            # Handle exceptions from gather
-            if isinstance(result, Exception):
-                logging.error(f"Credential processing raised exception: {result}")
-                continue
-
-            provider, path, email, error = result
-
-            # Skip if there was an error
-            if error:
-                continue
-
-            # If provider doesn't support get_user_info, add directly
-            if email is None:
-                if provider not in final_oauth_credentials:
-                    final_oauth_credentials[provider] = []
-                final_oauth_credentials[provider].append(path)
-                continue
-
-            # Handle empty email
-            if not email:
-                logging.warning(
-                    f"Could not retrieve email for '{path}'. Treating as unique."
-                )
-                if provider not in final_oauth_credentials:
-                    final_oauth_credentials[provider] = []
-                final_oauth_credentials[provider].append(path)
-                continue
-
-            # Deduplication check
-            if email not in processed_emails:
-                processed_emails[email] = {}
-
-            if (
-                provider in processed_emails[email]
-                and processed_emails[email][provider] != path
-            ):
-                original_path = processed_emails[email][provider]
-                logging.warning(
-                    f"Duplicate for '{email}' on '{provider}' found post-init: '{Path(path).name}'. Original: '{Path(original_path).name}'. Skipping."
-                )
-                continue
-            else:
-                processed_emails[email][provider] = path
-                if provider not in final_oauth_credentials:
-                    final_oauth_credentials[provider] = []
-                final_oauth_credentials[provider].append(path)
-
-                # Update metadata (skip for env-based credentials - they don't have files)
-                if not path.startswith("env://"):
-                    try:
-                        with open(path, "r+") as f:
-                            data = json.load(f)
-                            metadata = data.get("_proxy_metadata", {})
-                            metadata["email"] = email
-                            metadata["last_check_timestamp"] = time.time()
-                            data["_proxy_metadata"] = metadata
-                            f.seek(0)
-                            json.dump(data, f, indent=2)
-                            f.truncate()
-                    except Exception as e:
-                        logging.error(f"Failed to update metadata for '{path}': {e}")
-
-        logging.info("OAuth credential processing complete.")
-        oauth_credentials = final_oauth_credentials
+        from proxy_app._oauth_init import prepare_credentials
+
+        oauth_credentials = await prepare_credentials(
+            oauth_credentials, PROVIDER_PLUGINS
+        )
 
     # [NEW] Load provider-specific params
     litellm_provider_params = {
@@ -587,6 +310,9 @@ async def lifespan(app: FastAPI):
         logging.warning("  • Source: python src/proxy_app/main.py --add-credential")
         logging.warning("=" * 70)
 
+    # LiteLLM is a heavy import and only needed once the server is actually starting
+    import litellm
+
     os.environ["LITELLM_LOG"] = "ERROR"
     litellm.set_verbose = False
     litellm.drop_params = True
@@ -598,6 +324,15 @@ async def lifespan(app: FastAPI):
         app.state.embedding_batcher = None
         logging.info("RotatingClient initialized (EmbeddingBatcher disabled).")
 
+    # Detailed request logs are written by a background task, off the request path
+    if ENABLE_REQUEST_LOGGING:
+        from proxy_app._log_queue import RequestLogQueue
+
+        app.state.request_log_queue = RequestLogQueue()
+        app.state.request_log_queue.start()
+    else:
+        app.state.request_log_queue = None
+
     # Start model info service in background (fetches pricing/capabilities data)
     # This runs asynchronously and doesn't block proxy startup
     model_info_service = await init_model_info_service()
@@ -611,6 +346,15 @@ async def lifespan(app: FastAPI):
         await app.state.embedding_batcher.stop()
     await client.close()
 
+    # Shared keep-alive pool of the Qwen OAuth endpoints
+    from rotator_library.providers import qwen_auth_base
+
+    await qwen_auth_base.close_http_client()
+
+    # Flush any queued request logs
+    if app.state.request_log_queue:
+        await app.state.request_log_queue.stop()
+
     # Stop model info service
     if hasattr(app.state, "model_info_service") and app.state.model_info_service:
         await app.state.model_info_service.stop()
@@ -622,7 +366,8 @@ async def lifespan(app: FastAPI):
 
 
 # --- FastAPI App Setup ---
-app = FastAPI(lifespan=lifespan)
+# orjson renders every JSON response (dicts, litellm responses, model info)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Add CORS middleware to allow all origins, methods, and headers
 app.add_middleware(
@@ -648,169 +393,34 @@ def get_embedding_batcher(request: Request) -> EmbeddingBatcher:
 async def verify_api_key(auth: str = Depends(api_key_header)):
     """Dependency to verify the proxy API key."""
     # If PROXY_API_KEY is not set or empty, skip verification (open access)
-    if not PROXY_API_KEY:
+    if EXPECTED_AUTH_HEADER is None:
         return auth
-    if not auth or auth != f"Bearer {PROXY_API_KEY}":
+    # Constant-time comparison so the key can't be probed via response timing
+    if not auth or not hmac.compare_digest(
+        auth.encode("utf-8"), EXPECTED_AUTH_HEADER.encode("utf-8")
+    ):
         raise HTTPException(status_code=401, detail="Invalid or missing API Key")
     return auth
 
 
-async def streaming_response_wrapper(
-    request: Request,
-    request_data: dict,
-    response_stream: AsyncGenerator[str, None],
-    logger: Optional[DetailedLogger] = None,
-) -> AsyncGenerator[str, None]:
-    """
-    Wraps a streaming response to log the full response after completion
-    and ensures any errors during the stream are sent to the client.
-    """
-    response_chunks = []
-    full_response = {}
+async def read_json_body(request: Request) -> Any:
+    """Parse the request body with orjson (Starlette's request.json() uses stdlib json)."""
+    return orjson.loads(await request.body())
 
-    try:
-        async for chunk_str in response_stream:
-            if await request.is_disconnected():
-                logging.warning("Client disconnected, stopping stream.")
-                break
-            yield chunk_str
-            if chunk_str.strip() and chunk_str.startswith("data:"):
-                content = chunk_str[len("data:") :].strip()
-                if content != "[DONE]":
-                    try:
-                        chunk_data = json.loads(content)
-                        response_chunks.append(chunk_data)
-                        if logger:
-                            logger.log_stream_chunk(chunk_data)
-                    except json.JSONDecodeError:
-                        pass
-    except Exception as e:
-        logging.error(f"An error occurred during the response stream: {e}")
-        # Yield a final error message to the client to ensure they are not left hanging.
-        error_payload = {
-            "error": {
-                "message": f"An unexpected error occurred during the stream: {str(e)}",
-                "type": "proxy_internal_error",
-                "code": 500,
-            }
-        }
-        yield f"data: {json.dumps(error_payload)}\n\n"
-        yield "data: [DONE]\n\n"
-        # Also log this as a failed request
-        if logger:
-            logger.log_final_response(
-                status_code=500, headers=None, body={"error": str(e)}
-            )
-        return  # Stop further processing
-    finally:
-        if response_chunks:
-            # --- Aggregation Logic ---
-            final_message = {"role": "assistant"}
-            aggregated_tool_calls = {}
-            usage_data = None
-            finish_reason = None
-
-            for chunk in response_chunks:
-                if "choices" in chunk and chunk["choices"]:
-                    choice = chunk["choices"][0]
-                    delta = choice.get("delta", {})
-
-                    # Dynamically aggregate all fields from the delta
-                    for key, value in delta.items():
-                        if value is None:
-                            continue
-
-                        if key == "content":
-                            if "content" not in final_message:
-                                final_message["content"] = ""
-                            if value:
-                                final_message["content"] += value
-
-                        elif key == "tool_calls":
-                            for tc_chunk in value:
-                                index = tc_chunk["index"]
-                                if index not in aggregated_tool_calls:
-                                    aggregated_tool_calls[index] = {
-                                        "type": "function",
-                                        "function": {"name": "", "arguments": ""},
-                                    }
-                                # Ensure 'function' key exists for this index before accessing its sub-keys
-                                if "function" not in aggregated_tool_calls[index]:
-                                    aggregated_tool_calls[index]["function"] = {
-                                        "name": "",
-                                        "arguments": "",
-                                    }
-                                if "id" in tc_chunk:
-                                    aggregated_tool_calls[index]["id"] = tc_chunk["id"]
-                                if "function" in tc_chunk:
-                                    if "name" in tc_chunk["function"] and tc_chunk["function"]["name"]:
-                                        aggregated_tool_calls[index]["function"]["name"] += tc_chunk["function"]["name"]
-                                    if "arguments" in tc_chunk["function"] and tc_chunk["function"]["arguments"]:
-                                        aggregated_tool_calls[index]["function"]["arguments"] += tc_chunk["function"]["arguments"]
-
-                        elif key == "function_call":
-                            if "function_call" not in final_message:
-                                final_message["function_call"] = {"name": "", "arguments": ""}
-                            if "name" in tc_chunk["function_call"]:
-                                final_message["function_call"]["name"] += tc_chunk["function_call"]["name"]
-                            if "arguments" in tc_chunk["function_call"]:
-                                final_message["function_call"]["arguments"] += tc_chunk["function_call"]["arguments"]
-
-                        # Track finish_reason from the last chunk that has it
-                        if "finish_reason" in choice and choice["finish_reason"]:
-                            finish_reason = choice["finish_reason"]
-
-            # Add aggregated tool calls to final message
-            if aggregated_tool_calls:
-                final_message["tool_calls"] = list(aggregated_tool_calls.values())
-
-            # Add function call to final message if any
-            if "function_call" not in final_message:
-                final_message["function_call"] = None
-
-            # Add finish_reason to response
-            if finish_reason:
-                for chunk in response_chunks:
-                    if "choices" in chunk and chunk["choices"]:
-                        chunk["choices"][0]["finish_reason"] = finish_reason
-
-            # Create the aggregated response
-            full_response = {
-                "id": response_chunks[-1].get("id", ""),
-                "object": "chat.completion",
-                "created": response_chunks[0].get("created", int(time.time())),
-                "model": request_data.get("model", ""),
-                "choices": [
-                    {
-                        "index": 0,
-                        "message": final_message,
-                        "finish_reason": finish_reason,
-                    }
-                ],
-            }
 
-            # Aggregate usage if present
-            total_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-            for chunk in response_chunks:
-                if "usage" in chunk and chunk["usage"]:
-                    for key in total_usage:
-                        if key in chunk["usage"]:
-                            total_usage[key] += chunk["usage"][key]
-            if any(total_usage.values()):
-                full_response["usage"] = total_usage
-
-            # Log the final aggregated response if we have a logger
-            if logger:
-                logger.log_final_response(status_code=200, headers=None, body=full_response)
+def json_response(payload: Any) -> Response:
+    """
+    Serialize a handler result directly into a JSON response.
 
-            # Log to console
-            if ENABLE_REQUEST_LOGGING:
-                log_request_to_console(
-                    model=request_data.get("model", "unknown"),
-                    input_messages=request_data.get("messages", []),
-                    response=full_response,
-                    processing_time=None,  # Would need to track start time to calculate this
-                )
+    The payload (or its pydantic `model_dump()`) goes straight to orjson,
+    skipping FastAPI's recursive jsonable_encoder pass. Anything orjson
+    rejects falls back to the encoder.
+    """
+    data = payload.model_dump() if hasattr(payload, "model_dump") else payload
+    try:
+        return Response(content=orjson.dumps(data), media_type="application/json")
+    except TypeError:
+        return ORJSONResponse(content=jsonable_encoder(data))
 
 
 @app.post("/v1/chat/completions")
@@ -825,19 +435,25 @@ async def chat_completions(
     """
     try:
         # Parse request data
-        request_data = await request.json()
+        request_data = await read_json_body(request)
 
         # Check if streaming is requested
         stream = request_data.get("stream", False)
 
         # Prepare the request for the rotating client
         # Log the request before sending to provider
-        logger = DetailedLogger() if ENABLE_REQUEST_LOGGING else None
+        logger = None
+        if ENABLE_REQUEST_LOGGING:
+            from proxy_app._log_queue import QueuedDetailedLogger
+
+            logger = QueuedDetailedLogger(
+                DetailedLogger(), request.app.state.request_log_queue
+            )
         if logger:
             logger.log_request(
                 url=str(request.url),
                 method=request.method,
-                headers=dict(request.headers),
+                headers=request.headers,  # Copied off the request path by the log queue
                 body=request_data,
             )
 
@@ -847,7 +463,13 @@ async def chat_completions(
         if stream:
             # If streaming, wrap the response
             return StreamingResponse(
-                streaming_response_wrapper(request, request_data, response, logger),
+                streaming_response_wrapper(
+                    request,
+                    request_data,
+                    response,
+                    logger,
+                    enable_request_logging=ENABLE_REQUEST_LOGGING,
+                ),
                 media_type="text/event-stream",
             )
         else:
@@ -863,16 +485,18 @@ async def chat_completions(
                     processing_time=None,
                 )
 
-            return response
+            return json_response(response)
 
     except Exception as e:
-        logging.error(f"Chat completion failed: {e}")
-        if "litellm" in str(e).lower() or "provider" in str(e).lower():
+        error_message = str(e)
+        logging.error("Chat completion failed: %s", error_message)
+        error_lower = error_message.lower()
+        if "litellm" in error_lower or "provider" in error_lower:
             raise HTTPException(
-                status_code=502, detail=f"Provider error: {str(e)}"
+                status_code=502, detail=f"Provider error: {error_message}"
             )  # Bad Gateway
         else:
-            raise HTTPException(status_code=500, detail=str(e))
+            raise HTTPException(status_code=500, detail=error_message)
 
 
 @app.post("/v1/embeddings")
@@ -887,7 +511,7 @@ async def embeddings(
     the best available provider key/credential for the request.
     """
     try:
-        request_data = await request.json()
+        request_data = await read_json_body(request)
 
         if USE_EMBEDDING_BATCHER and "input" in request_data:
             # Use the batcher for embedding requests
@@ -905,15 +529,53 @@ async def embeddings(
                 processing_time=None,
             )
 
-        return response
+        return json_response(response)
     except Exception as e:
-        logging.error(f"Embedding request failed: {e}")
-        if "litellm" in str(e).lower() or "provider" in str(e).lower():
+        error_message = str(e)
+        logging.error("Embedding request failed: %s", error_message)
+        error_lower = error_message.lower()
+        if "litellm" in error_lower or "provider" in error_lower:
             raise HTTPException(
-                status_code=502, detail=f"Provider error: {str(e)}"
+                status_code=502, detail=f"Provider error: {error_message}"
             )  # Bad Gateway
         else:
-            raise HTTPException(status_code=500, detail=str(e))
+            raise HTTPException(status_code=500, detail=error_message)
+
+
+# The model set changes rarely, so list responses are serialized once and
+# reused for MODELS_CACHE_TTL_SECONDS.
+_models_cache_ttl_value = os.getenv("MODELS_CACHE_TTL_SECONDS", "60")
+try:
+    MODELS_CACHE_TTL_SECONDS = float(_models_cache_ttl_value)
+except ValueError:
+    logging.warning(
+        f"Invalid MODELS_CACHE_TTL_SECONDS value: {_models_cache_ttl_value}. Using default (60)."
+    )
+    MODELS_CACHE_TTL_SECONDS = 60.0
+_models_cache = {}  # cache key -> (time.monotonic() when built, JSON body bytes)
+_models_cache_locks = {}  # cache key -> asyncio.Lock, so one slow rebuild doesn't block the other list
+
+
+async def _cached_models_response(cache_key: str, build_payload) -> Response:
+    """
+    Serve a model list body from the TTL cache, rebuilding it once on a miss.
+    build_payload is an async callable returning (payload, cacheable).
+    """
+    entry = _models_cache.get(cache_key)
+    if entry and time.monotonic() - entry[0] < MODELS_CACHE_TTL_SECONDS:
+        return Response(content=entry[1], media_type="application/json")
+
+    async with _models_cache_locks.setdefault(cache_key, asyncio.Lock()):
+        # Another request may have rebuilt the entry while we waited
+        entry = _models_cache.get(cache_key)
+        if entry and time.monotonic() - entry[0] < MODELS_CACHE_TTL_SECONDS:
+            return Response(content=entry[1], media_type="application/json")
+
+        payload, cacheable = await build_payload()
+        body = orjson.dumps(payload)
+        if cacheable:
+            _models_cache[cache_key] = (time.monotonic(), body)
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/v1/models")
@@ -925,11 +587,20 @@ async def list_models(
     """
     Returns a list of all available models across all configured providers.
     """
-    try:
+
+    async def build_payload():
         models = await client.list_models()
-        return ModelList(data=[ModelCard(id=model) for model in models])
+        created = int(time.time())
+        cards = [ModelCard(id=model, created=created) for model in models]
+        return {
+            "object": "list",
+            "data": MODEL_CARD_LIST_ADAPTER.dump_python(cards),
+        }, True
+
+    try:
+        return await _cached_models_response("models", build_payload)
     except Exception as e:
-        logging.error(f"Listing models failed: {e}")
+        logging.error("Listing models failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -942,32 +613,47 @@ async def list_enriched_models(
     """
     Returns a list of all available models with pricing and capability information.
     """
-    try:
+
+    async def build_payload():
         models = await client.list_models()
         enriched_models = []
+        created = int(time.time())
 
         model_info_service = request.app.state.model_info_service
+        # Basic cards served before the pricing data arrives must not be cached
+        service_ready = model_info_service.is_ready
+        # Resolve every model's info in one batch before building the cards
+        model_infos = {}
+        if service_ready:
+            get_model_info = model_info_service.get_model_info
+            model_infos = {model_id: get_model_info(model_id) for model_id in models}
+
         for model_id in models:
-            model_info = None
-            if model_info_service.is_ready:
-                model_info = model_info_service.get_model_info(model_id)
+            model_info = model_infos.get(model_id)
 
             if model_info:
-                enriched_models.append(EnrichedModelCard(**model_info.to_dict()))
+                enriched_models.append(
+                    EnrichedModelCard(**model_info.to_dict()).model_dump()
+                )
             else:
                 # Return basic info if service not ready or model not found
                 enriched_models.append(
-                    EnrichedModelCard(
-                        id=model_id,
-                        object="model",
-                        created=int(time.time()),
-                        owned_by=model_id.split("/")[0] if "/" in model_id else "unknown",
-                    )
+                    {
+                        **ENRICHED_MODEL_CARD_TEMPLATE,
+                        "id": model_id,
+                        "created": created,
+                        "owned_by": model_id.split("/", 1)[0]
+                        if "/" in model_id
+                        else "unknown",
+                    }
                 )
 
-        return EnrichedModelList(data=enriched_models)
+        return {"object": "list", "data": enriched_models}, service_ready
+
+    try:
+        return await _cached_models_response("models-enriched", build_payload)
     except Exception as e:
-        logging.error(f"Listing enriched models failed: {e}")
+        logging.error("Listing enriched models failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -985,7 +671,9 @@ async def get_model_info(
         if model_info_service.is_ready:
             info = model_info_service.get_model_info(model_id)
             if info:
-                return info.to_dict()
+                return json_response(info.to_dict())
+    except Exception as e:
+        logging.debug("Model info lookup failed for '%s': %s", model_id, e)
 
     # Return basic info if service not ready or model not found
     return {
@@ -1027,7 +715,7 @@ async def token_count(
     Calculates the token count for a given list of messages and a model.
     """
     try:
-        data = await request.json()
+        data = await read_json_body(request)
         model = data.get("model")
         messages = data.get("messages")
 
@@ -1040,10 +728,29 @@ async def token_count(
         return {"token_count": count}
 
     except Exception as e:
-        logging.error(f"Token count failed: {e}")
+        logging.error("Token count failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=1024)
+def _litellm_token_prices(model: str) -> Optional[Tuple[float, float]]:
+    """
+    (input, output) cost per token from LiteLLM's pricing table, or None if unknown.
+    Cached per model so repeated estimates skip the table lookup.
+    """
+    try:
+        import litellm
+
+        model_info = litellm.get_model_info(model)
+    except Exception:
+        return None
+    input_cost = model_info.get("input_cost_per_token") or 0
+    output_cost = model_info.get("output_cost_per_token") or 0
+    if not (input_cost or output_cost):
+        return None
+    return input_cost, output_cost
+
+
 @app.post("/v1/cost-estimate")
 async def cost_estimate(request: Request, _=Depends(verify_api_key)):
     """
@@ -1071,7 +778,7 @@ async def cost_estimate(request: Request, _=Depends(verify_api_key)):
         }
     """
     try:
-        data = await request.json()
+        data = await read_json_body(request)
         model = data.get("model")
         prompt_tokens = data.get("prompt_tokens", 0)
         completion_tokens = data.get("completion_tokens", 0)
@@ -1108,25 +815,17 @@ async def cost_estimate(request: Request, _=Depends(verify_api_key)):
                     return result
 
         # Fallback to litellm
-        try:
-            import litellm
-
-            # Create a mock response for cost calculation
-            model_info = litellm.get_model_info(model)
-            input_cost = model_info.get("input_cost_per_token", 0)
-            output_cost = model_info.get("output_cost_per_token", 0)
-
-            if input_cost or output_cost:
-                cost = (prompt_tokens * input_cost) + (completion_tokens * output_cost)
-                result["cost"] = cost
-                result["pricing"] = {
-                    "input_cost_per_token": input_cost,
-                    "output_cost_per_token": output_cost,
-                }
-                result["source"] = "litellm_fallback"
-                return result
-        except Exception:
-            pass
+        prices = _litellm_token_prices(model)
+        if prices:
+            input_cost, output_cost = prices
+            cost = (prompt_tokens * input_cost) + (completion_tokens * output_cost)
+            result["cost"] = cost
+            result["pricing"] = {
+                "input_cost_per_token": input_cost,
+                "output_cost_per_token": output_cost,
+            }
+            result["source"] = "litellm_fallback"
+            return result
 
         result["source"] = "unknown"
         result["error"] = "Pricing data not available for this model"
@@ -1135,42 +834,26 @@ async def cost_estimate(request: Request, _=Depends(verify_api_key)):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Cost estimate failed: {e}")
+        logging.error("Cost estimate failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
     # Define ENV_FILE for onboarding checks
-    ENV_FILE = Path.cwd() / ".env"
-
-    # Check if launcher TUI should be shown (no arguments provided)
-    if len(sys.argv) == 1:
-        # No arguments - show launcher TUI (lazy import)
-        from proxy_app.launcher_tui import run_launcher_tui
-
-        run_launcher_tui()
-        # Launcher modifies sys.argv and returns, or exits if user chose Exit
-        # If we get here, user chose "Run Proxy" and sys.argv is modified
-        # Re-parse arguments with modified sys.argv
-        args = parser.parse_args()
+    ENV_FILE = os.path.join(os.getcwd(), ".env")
 
     def needs_onboarding() -> bool:
         """
         Check if the proxy needs onboarding (first-time setup).
         Returns True if onboarding is needed, False otherwise.
         """
-        # Only check if .env file exists
+        # Only check if .env file exists (a single stat)
         # PROXY_API_KEY is optional (will show warning if not set)
-        if not ENV_FILE.is_file():
-            return True
-
-        return False
+        return not os.path.isfile(ENV_FILE)
 
     def show_onboarding_message():
         """Display clear explanatory message for why onboarding is needed."""
-        os.system(
-            "cls" if os.name == "nt" else "clear"
-        )  # Clear terminal for clean presentation
+        console.clear()  # Clear terminal for clean presentation
         console.print(
             Panel.fit(
                 "[bold cyan]🚀 LLM API Key Proxy - First Time Setup[/bold cyan]",
@@ -1204,7 +887,11 @@ if __name__ == "__main__":
     # Check if user explicitly wants to add credentials
     if args.add_credential:
         # Import and call ensure_env_defaults to create .env and PROXY_API_KEY if needed
-        from rotator_library.credential_tool import ensure_env_defaults
+        from dotenv import load_dotenv
+        from rotator_library.credential_tool import (
+            ensure_env_defaults,
+            run_credential_tool,
+        )
 
         ensure_env_defaults()
         # Reload environment variables after ensure_env_defaults creates/updates .env
@@ -1223,7 +910,11 @@ if __name__ == "__main__":
             show_onboarding_message()
 
             # Launch credential tool automatically
-            from rotator_library.credential_tool import ensure_env_defaults
+            from dotenv import load_dotenv
+            from rotator_library.credential_tool import (
+                ensure_env_defaults,
+                run_credential_tool,
+            )
 
             ensure_env_defaults()
             load_dotenv(override=True)
@@ -1233,6 +924,9 @@ if __name__ == "__main__":
             load_dotenv(override=True)
             # Re-read PROXY_API_KEY from environment
             PROXY_API_KEY = os.getenv("PROXY_API_KEY")
+            EXPECTED_AUTH_HEADER = (
+                f"Bearer {PROXY_API_KEY}" if PROXY_API_KEY else None
+            )
 
             # Verify onboarding is complete
             if needs_onboarding():
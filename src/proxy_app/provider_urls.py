@@ -1,5 +1,8 @@
 """Provider URL mappings for the LLM API Key Proxy"""
 
+from functools import cache
+from typing import Dict
+
 # Standard provider URL mapping
 PROVIDER_URL_MAP = {
     # OpenAI
@@ -53,5 +56,15 @@ PROVIDER_URL_MAP = {
     # They are typically defined in environment variables
 }
 
-# Reverse mapping for easy lookup
-URL_PROVIDER_MAP = {v: k for k, v in PROVIDER_URL_MAP.items() if v is not None}
+
+@cache
+def url_to_provider() -> Dict[str, str]:
+    """Reverse mapping (URL -> provider), built on first use."""
+    return {v: k for k, v in PROVIDER_URL_MAP.items() if v is not None}
+
+
+def __getattr__(name):
+    # Keep `from proxy_app.provider_urls import URL_PROVIDER_MAP` working lazily
+    if name == "URL_PROVIDER_MAP":
+        return url_to_provider()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
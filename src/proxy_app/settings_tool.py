@@ -6,22 +6,19 @@ Provides interactive configuration for advanced settings.
 import json
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Callable
 from rich.console import Console
 from rich.prompt import Prompt, IntPrompt, Confirm
 from rich.panel import Panel
 from rich.text import Text
-from dotenv import load_dotenv, set_key
+from dotenv import dotenv_values, load_dotenv, set_key
 
-
-console = Console()
+from rotator_library.utils.terminal import clear_screen
 
 
-def clear_screen():
-    """Cross-platform terminal clear"""
-    import os
-    os.system("cls" if os.name == "nt" else "clear")
+console = Console()
 
 
 # Define provider-specific settings
@@ -61,26 +58,20 @@ PROVIDER_SETTINGS_MAP: Dict[str, Dict[str, Any]] = {
 }
 
 
+@lru_cache(maxsize=1)
+def _parse_env_file(path: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    """Parse a .env file; cached per (path, mtime, size) so unchanged files aren't re-read"""
+    return {k: v for k, v in dotenv_values(path).items() if v is not None}
+
+
 def load_env_file() -> Dict[str, str]:
     """Load environment variables from .env file"""
     env_file = Path.cwd() / ".env"
-    env_dict = {}
-    if env_file.exists():
-        try:
-            with open(env_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    if "=" in line:
-                        key, _, value = line.partition("=")
-                        key, value = key.strip(), value.strip()
-                        if value and value[0] in ('"', "'") and value[-1] == value[0]:
-                            value = value[1:-1]
-                        env_dict[key] = value
-        except (IOError, OSError):
-            pass
-    return env_dict
+    try:
+        st = env_file.stat()
+    except OSError:
+        return {}
+    return dict(_parse_env_file(str(env_file), st.st_mtime_ns, st.st_size))
 
 
 def save_to_env(key: str, value: str):
@@ -5,10 +5,16 @@ Handles discovery and preparation of API keys and OAuth credentials.
 """
 
 import os
+import re
 import json
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List
 
+# Provider API key variables: <PROVIDER>_API_KEY, optionally numbered (<PROVIDER>_API_KEY_2).
+# The provider is everything around "_API_KEY"; PROXY_API_KEY is the proxy's own key.
+_API_KEY_ENV_RE = re.compile(r"^(?!PROXY_API_KEY$)(.*?)_API_KEY(.*)$")
+
 
 class CredentialManager:
     """
@@ -27,23 +33,17 @@ class CredentialManager:
         Returns:
             Dictionary mapping provider names to lists of credential paths/files
         """
-        credentials = {}
-        
+        credentials = defaultdict(list)
+
         # Discover API keys from environment variables
-        api_credentials = self._discover_api_keys()
-        for provider, keys in api_credentials.items():
-            if provider not in credentials:
-                credentials[provider] = []
+        for provider, keys in self._discover_api_keys().items():
             credentials[provider].extend(keys)
-        
+
         # Discover OAuth credentials from files
-        oauth_credentials = self._discover_oauth_credentials()
-        for provider, files in oauth_credentials.items():
-            if provider not in credentials:
-                credentials[provider] = []
+        for provider, files in self._discover_oauth_credentials().items():
             credentials[provider].extend(files)
-            
-        return credentials
+
+        return dict(credentials)
         
     def _discover_api_keys(self) -> Dict[str, List[str]]:
         """
@@ -52,21 +52,20 @@ class CredentialManager:
         Returns:
             Dictionary mapping provider names to lists of credential identifiers
         """
-        credentials = {}
-        
-        for key, value in self.environment.items():
-            if "_API_KEY" in key and key != "PROXY_API_KEY":
-                # Extract provider name from env var (e.g., GEMINI_API_KEY -> gemini)
-                provider = key.replace("_API_KEY", "").lower()
-                
-                if provider not in credentials:
-                    credentials[provider] = []
-                
-                # For API keys, we store the env var key as the identifier
-                # The actual value will be retrieved from the environment when needed
-                credentials[provider].append(f"env://{key}")
-                
-        return credentials
+        credentials = defaultdict(list)
+
+        for key in self.environment:
+            match = _API_KEY_ENV_RE.match(key)
+            if not match:
+                continue
+            # Extract provider name from env var (e.g., GEMINI_API_KEY -> gemini)
+            provider = (match.group(1) + match.group(2)).lower()
+
+            # For API keys, we store the env var key as the identifier
+            # The actual value will be retrieved from the environment when needed
+            credentials[provider].append(f"env://{key}")
+
+        return dict(credentials)
     
     def _discover_oauth_credentials(self) -> Dict[str, List[str]]:
         """
@@ -75,19 +74,24 @@ class CredentialManager:
         Returns:
             Dictionary mapping provider names to lists of file paths
         """
-        credentials = {}
-        
-        if not self.oauth_base_dir.exists():
-            return credentials
-            
-        # Find all OAuth credential files
-        for file_path in self.oauth_base_dir.glob("*_oauth_*.json"):
-            # Extract provider name from filename (e.g., gemini_cli_oauth_1.json -> gemini_cli)
-            provider = file_path.name.split("_oauth_")[0]
-            
-            if provider not in credentials:
-                credentials[provider] = []
-                
-            credentials[provider].append(str(file_path))
-            
-        return credentials
+        credentials = defaultdict(list)
+
+        # Find all OAuth credential files (*_oauth_*.json). scandir yields plain
+        # names and paths, so no Path object is built per directory entry.
+        try:
+            with os.scandir(self.oauth_base_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if (
+                        name.startswith(".")
+                        or not name.endswith(".json")
+                        or "_oauth_" not in name
+                    ):
+                        continue
+                    # Extract provider name from filename (e.g., gemini_cli_oauth_1.json -> gemini_cli)
+                    provider = name.split("_oauth_", 1)[0]
+                    credentials[provider].append(entry.path)
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+        return dict(credentials)
@@ -1,224 +1,501 @@
 # src/rotator_library/credential_tool.py
 
 import asyncio
-import json
 import os
 import re
+import stat
 import time
+from functools import cache, lru_cache
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from dotenv import set_key, get_key
+from types import MappingProxyType
+import orjson
+
+from .utils.terminal import clear_screen
 
 # NOTE: Heavy imports (provider_factory, PROVIDER_PLUGINS) are deferred 
-# to avoid 6-7 second delay before showing loading screen
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt
-from rich.text import Text
+# to avoid 6-7 second delay before showing loading screen.
+# rich is deferred as well (see _ui), so the export helpers don't pay for it.
 
 OAUTH_BASE_DIR = Path.cwd() / "oauth_creds"
 OAUTH_BASE_DIR.mkdir(exist_ok=True)
+# Prefix for per-file paths built in loops, where plain str concatenation beats Path '/'
+_OAUTH_BASE_PREFIX = str(OAUTH_BASE_DIR) + os.sep
 # Use a direct path to the .env file in the project root
 ENV_FILE = Path.cwd() / ".env"
 
-console = Console()
+# Verified list of LiteLLM providers with their friendly names and API key variables
+_LITELLM_PROVIDERS = MappingProxyType({
+    "OpenAI": "OPENAI_API_KEY", "Anthropic": "ANTHROPIC_API_KEY",
+    "Google AI Studio (Gemini)": "GEMINI_API_KEY", "Azure OpenAI": "AZURE_API_KEY",
+    "Vertex AI": "GOOGLE_API_KEY", "AWS Bedrock": "AWS_ACCESS_KEY_ID",
+    "Cohere": "COHERE_API_KEY", "Chutes": "CHUTES_API_KEY",
+    "Mistral AI": "MISTRAL_API_KEY",
+    "Codestral (Mistral)": "CODESTRAL_API_KEY", "Groq": "GROQ_API_KEY",
+    "Perplexity": "PERPLEXITYAI_API_KEY", "xAI": "XAI_API_KEY",
+    "Together AI": "TOGETHERAI_API_KEY", "Fireworks AI": "FIREWORKS_AI_API_KEY",
+    "Replicate": "REPLICATE_API_KEY", "Hugging Face": "HUGGINGFACE_API_KEY",
+    "Anyscale": "ANYSCALE_API_KEY", "NVIDIA NIM": "NVIDIA_NIM_API_KEY",
+    "Deepseek": "DEEPSEEK_API_KEY", "AI21": "AI21_API_KEY",
+    "Cerebras": "CEREBRAS_API_KEY", "Moonshot": "MOONSHOT_API_KEY",
+    "Ollama": "OLLAMA_API_KEY", "Xinference": "XINFERENCE_API_KEY",
+    "Infinity": "INFINITY_API_KEY", "OpenRouter": "OPENROUTER_API_KEY",
+    "Deepinfra": "DEEPINFRA_API_KEY", "Cloudflare": "CLOUDFLARE_API_KEY",
+    "Baseten": "BASETEN_API_KEY", "Modal": "MODAL_API_KEY",
+    "Databricks": "DATABRICKS_API_KEY", "AWS SageMaker": "AWS_ACCESS_KEY_ID",
+    "IBM watsonx.ai": "WATSONX_APIKEY", "Predibase": "PREDIBASE_API_KEY",
+    "Clarifai": "CLARIFAI_API_KEY", "NLP Cloud": "NLP_CLOUD_API_KEY",
+    "Voyage AI": "VOYAGE_API_KEY", "Jina AI": "JINA_API_KEY",
+    "Hyperbolic": "HYPERBOLIC_API_KEY", "Morph": "MORPH_API_KEY",
+    "Lambda AI": "LAMBDA_API_KEY", "Novita AI": "NOVITA_API_KEY",
+    "Aleph Alpha": "ALEPH_ALPHA_API_KEY", "SambaNova": "SAMBANOVA_API_KEY",
+    "FriendliAI": "FRIENDLI_TOKEN", "Galadriel": "GALADRIEL_API_KEY",
+    "CompactifAI": "COMPACTIFAI_API_KEY", "Lemonade": "LEMONADE_API_KEY",
+    "GradientAI": "GRADIENTAI_API_KEY", "Featherless AI": "FEATHERLESS_AI_API_KEY",
+    "Nebius AI Studio": "NEBIUS_API_KEY", "Dashscope (Qwen)": "DASHSCOPE_API_KEY",
+    "Bytez": "BYTEZ_API_KEY", "Oracle OCI": "OCI_API_KEY",
+    "DataRobot": "DATAROBOT_API_KEY", "OVHCloud": "OVHCLOUD_API_KEY",
+    "Volcengine": "VOLCENGINE_API_KEY", "Snowflake": "SNOWFLAKE_API_KEY",
+    "Nscale": "NSCALE_API_KEY", "Recraft": "RECRAFT_API_KEY",
+    "v0": "V0_API_KEY", "Vercel": "VERCEL_AI_GATEWAY_API_KEY",
+    "Topaz": "TOPAZ_API_KEY", "ElevenLabs": "ELEVENLABS_API_KEY",
+    "Deepgram": "DEEPGRAM_API_KEY",
+    "GitHub Models": "GITHUB_TOKEN", "GitHub Copilot": "GITHUB_COPILOT_API_KEY",
+})
+# Env var names already covered above, so discovered plugins don't duplicate them
+_LITELLM_ENV_VARS = frozenset(_LITELLM_PROVIDERS.values())
+
+# Providers to exclude from API key list
+# Note: gemini_cli and antigravity are OAuth-only
+# qwen_code API key support is a fallback
+# iflow API key support is a feature
+_API_KEY_EXCLUDED_PROVIDERS = frozenset({
+    'gemini_cli',  # OAuth-only
+    'antigravity',  # OAuth-only
+    'qwen_code',  # API key is fallback, OAuth is primary - don't advertise
+    'openai_compatible',  # Base class, not a real provider
+})
+
+# Credential number in filenames like 'provider_oauth_1.json'
+_CRED_NUM_RE = re.compile(r'_oauth_(\d+)\.json$')
+_TRAIL_NUM_RE = re.compile(r'_(\d+)\.json$')
+# Single-pass filename-safe email: 'user@example.com' -> 'user_at_example_com'
+_EMAIL_TRANS = str.maketrans({"@": "_at_", ".": "_"})
+
+@cache
+def _ensure_providers_loaded():
+    """Lazy load provider modules only when needed (cached after the first call)"""
+    from . import provider_factory as pf
+    from .providers import PROVIDER_PLUGINS as pp
+    return pf, pp
 
-# Global variables for lazily loaded modules
-_provider_factory = None
-_provider_plugins = None
 
-def _ensure_providers_loaded():
-    """Lazy load provider modules only when needed"""
-    global _provider_factory, _provider_plugins
-    if _provider_factory is None:
-        from . import provider_factory as pf
-        from .providers import PROVIDER_PLUGINS as pp
-        _provider_factory = pf
-        _provider_plugins = pp
-    return _provider_factory, _provider_plugins
+@cache
+def _ui():
+    """Lazy load rich on first interactive use; returns (console, Panel, Prompt, Text)"""
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+    from rich.text import Text
+    return Console(), Panel, Prompt, Text
+
+
+@lru_cache(maxsize=None)
+def _choices(count: int) -> tuple:
+    """Prompt choices '1'..'count' plus 'b' (back), built once per menu size"""
+    return tuple(str(i) for i in range(1, count + 1)) + ("b",)
 
 
-def clear_screen():
+def _read_json_file(path) -> dict:
+    """Blocking JSON read; coroutines call it via asyncio.to_thread."""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+# Parsed credential files keyed by path, validated against (st_mtime_ns, st_size)
+_cred_cache = {}
+
+
+def _load_creds(path) -> dict:
     """
-    Cross-platform terminal clear that works robustly on both 
-    classic Windows conhost and modern terminals (Windows Terminal, Linux, Mac).
-    
-    Uses native OS commands instead of ANSI escape sequences:
-    - Windows (conhost & Windows Terminal): cls
-    - Unix-like systems (Linux, Mac): clear
+    Read a credential file, reusing the parsed dict while the file is unchanged.
+    The returned dict is shared with the cache and must not be modified.
+    """
+    key = os.fspath(path)
+    st = os.stat(key)
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _cred_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    creds = _read_json_file(key)
+    _cred_cache[key] = (signature, creds)
+    return creds
+
+
+# Shared stand-in for credentials without a _proxy_metadata block (never mutated)
+_EMPTY_METADATA = MappingProxyType({})
+
+
+def _cred_email(creds: dict, default=None):
+    """Account email recorded in a credential's _proxy_metadata."""
+    return (creds.get("_proxy_metadata") or _EMPTY_METADATA).get("email", default)
+
+
+def _write_json_file(path, data: dict):
+    """Blocking JSON write; coroutines call it via asyncio.to_thread."""
+    _cred_cache.pop(os.fspath(path), None)
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+def _open_private(path):
+    """Open an exported secrets file for binary writing, created owner-only (0600)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    return os.fdopen(fd, 'wb')
+
+
+def _write_text_file(path, content: str):
+    """Blocking text write; coroutines call it via asyncio.to_thread."""
+    with _open_private(path) as f:
+        f.write(content.encode("utf-8"))
+
+
+def _write_lines_file(path, lines: list):
+    """Blocking write of newline-terminated lines, streamed instead of joined first."""
+    with _open_private(path) as f:
+        f.writelines(f"{line}\n".encode("utf-8") for line in lines)
+
+
+def _list_oauth_files(provider_name: str = "") -> list:
+    """
+    List '<provider>_oauth_*.json' credential files as os.DirEntry objects, sorted by name.
+    With no provider, every '*_oauth_*.json' file is listed.
+    """
+    prefix = f"{provider_name}_oauth_"
+    try:
+        with os.scandir(OAUTH_BASE_DIR) as entries:
+            cred_files = [
+                entry for entry in entries
+                if not entry.name.startswith('.')
+                and entry.name.endswith('.json')
+                and (entry.name.startswith(prefix) if provider_name else '_oauth_' in entry.name)
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+    return sorted(cred_files, key=lambda entry: entry.name)
+
+
+def _read_env_lines() -> list:
+    """Return the lines of the .env file, or an empty list if it doesn't exist."""
+    if not ENV_FILE.is_file():
+        return []
+    return ENV_FILE.read_text(encoding="utf-8").splitlines()
+
+
+def _parse_env_pairs(lines: list) -> dict:
+    """
+    Map variable names to values for the assignment lines of a .env file.
+    A leading "export " is ignored, as _apply_env_updates does when matching.
+    Surrounding quotes are removed, so values written quoted by set_key or
+    _apply_env_updates compare equal to the raw value.
+    """
+    env_pairs = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        name, _, value = line.partition("=")
+        name = name.strip()
+        if name.startswith("export "):
+            name = name[len("export "):]
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ("'", '"'):
+            value = value[1:-1]
+        env_pairs[name.strip()] = value
+    return env_pairs
+
+
+def _read_env_pairs(name_prefix: str = "") -> dict:
+    """
+    Parse the .env assignments whose names start with name_prefix.
+    Lines are filtered as bytes, so only the matching ones get decoded;
+    "export NAME=..." lines match the same as plain ones.
+    """
+    try:
+        data = ENV_FILE.read_bytes()
+    except FileNotFoundError:
+        return {}
+    prefix = name_prefix.encode()
+    lines = []
+    for line in data.splitlines():
+        if b"=" not in line:
+            continue
+        stripped = line.lstrip()
+        if stripped.startswith(b"export "):
+            stripped = stripped[len(b"export "):].lstrip()
+        if stripped.startswith(prefix):
+            lines.append(line.decode("utf-8"))
+    return _parse_env_pairs(lines)
+
+
+def _apply_env_updates(updates: dict):
+    """
+    Set several .env variables with one read and one write, instead of a
+    full rewrite per key as dotenv.set_key does. Existing assignments are
+    replaced in place and new ones appended; values are single-quoted like
+    set_key writes them. The file is swapped in with os.replace so an
+    interrupted write never leaves a truncated .env behind; the temp file
+    takes the original's permissions first, so a restricted .env stays so.
     """
-    os.system('cls' if os.name == 'nt' else 'clear')
+    lines = _read_env_lines()
+    seen = set()
+    for i, line in enumerate(lines):
+        name, sep, _ = line.partition("=")
+        name = name.strip()
+        if name.startswith("export "):
+            name = name[len("export "):].strip()
+        if sep and name in updates:
+            lines[i] = _format_env_assignment(name, updates[name])
+            seen.add(name)
+    lines.extend(
+        _format_env_assignment(name, value)
+        for name, value in updates.items()
+        if name not in seen
+    )
+
+    tmp_path = ENV_FILE.with_name(ENV_FILE.name + ".tmp")
+    tmp_path.write_bytes(("\n".join(lines) + "\n").encode("utf-8"))
+    try:
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(ENV_FILE).st_mode))
+    except FileNotFoundError:
+        pass
+    os.replace(tmp_path, ENV_FILE)
+
+
+def _format_env_assignment(name: str, value: str) -> str:
+    escaped = value.replace("'", "\\'")
+    return f"{name}='{escaped}'"
 
+
+async def _read_json_files(paths, return_exceptions: bool = False) -> list:
+    """Read several credential files concurrently, in the order given."""
+    return await asyncio.gather(
+        *(asyncio.to_thread(_load_creds, path) for path in paths),
+        return_exceptions=return_exceptions
+    )
+
+
+def _generated_at() -> str:
+    """Timestamp for the '# Generated at:' header of exported .env files."""
+    return _format_timestamp(int(time.time()))
+
+
+@lru_cache(maxsize=1)
+def _format_timestamp(epoch_seconds: int) -> str:
+    # Bulk exports stamp many files within the same second; format each second once
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(epoch_seconds))
+
+
+@lru_cache(maxsize=4096)
 def _get_credential_number_from_filename(filename: str) -> int:
     """
     Extract credential number from filename like 'provider_oauth_1.json' -> 1
     """
-    match = re.search(r'_oauth_(\d+)\.json$', filename)
+    match = _CRED_NUM_RE.search(filename)
     if match:
         return int(match.group(1))
     return 1
 
 
+def _google_oauth_env_vars(numbered_prefix: str, creds: dict, email: str) -> str:
+    """Variables for Google OAuth providers (Gemini CLI, Antigravity): a 1-to-1 mirror of the JSON file."""
+    metadata = creds.get("_proxy_metadata") or _EMPTY_METADATA
+    env_vars = (
+        f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}\n"
+        f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}\n"
+        f"{numbered_prefix}_SCOPE={creds.get('scope', '')}\n"
+        f"{numbered_prefix}_TOKEN_TYPE={creds.get('token_type', 'Bearer')}\n"
+        f"{numbered_prefix}_ID_TOKEN={creds.get('id_token', '')}\n"
+        f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}\n"
+        f"{numbered_prefix}_CLIENT_ID={creds.get('client_id', '')}\n"
+        f"{numbered_prefix}_CLIENT_SECRET={creds.get('client_secret', '')}\n"
+        f"{numbered_prefix}_TOKEN_URI={creds.get('token_uri', 'https://oauth2.googleapis.com/token')}\n"
+        f"{numbered_prefix}_UNIVERSE_DOMAIN={creds.get('universe_domain', 'googleapis.com')}\n"
+        f"{numbered_prefix}_EMAIL={email}"
+    )
+    # Add provider-specific metadata fields (only non-empty values)
+    if project_id := metadata.get("project_id"):
+        env_vars += f"\n{numbered_prefix}_PROJECT_ID={project_id}"
+    if tier := metadata.get("tier"):
+        env_vars += f"\n{numbered_prefix}_TIER={tier}"
+    return env_vars
+
+
+def _qwen_code_env_vars(numbered_prefix: str, creds: dict, email: str) -> str:
+    """Variables for Qwen Code credentials."""
+    return (
+        f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}\n"
+        f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}\n"
+        f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}\n"
+        f"{numbered_prefix}_RESOURCE_URL={creds.get('resource_url', 'https://portal.qwen.ai/v1')}\n"
+        f"{numbered_prefix}_EMAIL={email}"
+    )
+
+
+def _iflow_env_vars(numbered_prefix: str, creds: dict, email: str) -> str:
+    """Variables for iFlow credentials (OAuth tokens plus the derived API key)."""
+    return (
+        f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}\n"
+        f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}\n"
+        f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}\n"
+        f"{numbered_prefix}_API_KEY={creds.get('api_key', '')}\n"
+        f"{numbered_prefix}_USER_ID={creds.get('user_id', '')}\n"
+        f"{numbered_prefix}_EMAIL={email}"
+    )
+
+
+# Per-provider export settings:
+#   display_name: name shown in menus and messages
+#   env_vars: builds the variable lines for one credential
+#   windows_hint: whether to show the Windows 'Get-Content' usage tip after exporting
+_EXPORT_SPECS = {
+    "gemini_cli": {"display_name": "Gemini CLI", "env_vars": _google_oauth_env_vars, "windows_hint": True},
+    "qwen_code": {"display_name": "Qwen Code", "env_vars": _qwen_code_env_vars, "windows_hint": False},
+    "iflow": {"display_name": "iFlow", "env_vars": _iflow_env_vars, "windows_hint": False},
+    "antigravity": {"display_name": "Antigravity", "env_vars": _google_oauth_env_vars, "windows_hint": True},
+}
+
+
+def _export_spec(provider_name: str) -> dict:
+    """Export settings for a provider; unknown providers use the Google OAuth layout."""
+    spec = _EXPORT_SPECS.get(provider_name)
+    if spec is None:
+        spec = {
+            "display_name": provider_name.replace('_', ' ').title(),
+            "env_vars": _google_oauth_env_vars,
+            "windows_hint": True,
+        }
+    return spec
+
+
 def _build_env_export_content(
-    provider_prefix: str,
+    provider_name: str,
     cred_number: int,
     creds: dict,
     email: str,
-    extra_fields: dict = None,
-    include_client_creds: bool = True
-) -> tuple[list[str], str]:
+    include_header: bool = True,
+    generated_at: str = None
+) -> tuple[str, str]:
     """
     Build .env content for OAuth credential export with numbered format.
-    Exports all fields from the JSON file as a 1-to-1 mirror.
     
     Args:
-        provider_prefix: Environment variable prefix (e.g., "ANTIGRAVITY", "GEMINI_CLI")
+        provider_name: Provider key (e.g., "antigravity", "gemini_cli")
         cred_number: Credential number for this export (1, 2, 3, etc.)
         creds: The credential dictionary loaded from JSON
         email: User email for comments
-        extra_fields: Optional dict of additional fields to include
-        include_client_creds: Whether to include client_id/secret (Google OAuth providers)
+        include_header: Whether to start with the comment header (off when combining files)
+        generated_at: Timestamp for the header; bulk exports pass one shared value
     
     Returns:
-        Tuple of (env_lines list, numbered_prefix string for display)
+        Tuple of (.env content string, numbered_prefix string for display)
     """
+    provider_prefix = provider_name.upper()
     # Use numbered format: PROVIDER_N_ACCESS_TOKEN
     numbered_prefix = f"{provider_prefix}_{cred_number}"
-    
-    env_lines = [
-        f"# {provider_prefix} Credential #{cred_number} for: {email}",
-        f"# Exported from: {provider_prefix.lower()}_oauth_{cred_number}.json",
-        f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
-        f"# ",
-        f"# To combine multiple credentials into one .env file, copy these lines",
-        f"# and ensure each credential has a unique number (1, 2, 3, etc.)",
-        "",
-        f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-        f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-        f"{numbered_prefix}_SCOPE={creds.get('scope', '')}",
-        f"{numbered_prefix}_TOKEN_TYPE={creds.get('token_type', 'Bearer')}",
-        f"{numbered_prefix}_ID_TOKEN={creds.get('id_token', '')}",
-        f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-    ]
-    
-    if include_client_creds:
-        env_lines.extend([
-            f"{numbered_prefix}_CLIENT_ID={creds.get('client_id', '')}",
-            f"{numbered_prefix}_CLIENT_SECRET={creds.get('client_secret', '')}",
-            f"{numbered_prefix}_TOKEN_URI={creds.get('token_uri', 'https://oauth2.googleapis.com/token')}",
-            f"{numbered_prefix}_UNIVERSE_DOMAIN={creds.get('universe_domain', 'googleapis.com')}",
-        ])
-    
-    env_lines.append(f"{numbered_prefix}_EMAIL={email}")
-    
-    # Add extra provider-specific fields
-    if extra_fields:
-        for key, value in extra_fields.items():
-            if value:  # Only add non-empty values
-                env_lines.append(f"{numbered_prefix}_{key}={value}")
-    
-    return env_lines, numbered_prefix
+    env_vars = _export_spec(provider_name)["env_vars"](numbered_prefix, creds, email)
+    if not include_header:
+        return env_vars, numbered_prefix
+
+    content = (
+        f"# {provider_prefix} Credential #{cred_number} for: {email}\n"
+        f"# Exported from: {provider_name}_oauth_{cred_number}.json\n"
+        f"# Generated at: {generated_at or _generated_at()}\n"
+        f"# \n"
+        f"# To combine multiple credentials into one .env file, copy these lines\n"
+        f"# and ensure each credential has a unique number (1, 2, 3, etc.)\n"
+        "\n"
+        f"{env_vars}"
+    )
+    return content, numbered_prefix
+
+
+def _export_env_path(provider_name: str, cred_number: int, email: str) -> str:
+    """Path of the per-credential .env export, e.g. gemini_cli_1_user_at_example_com.env"""
+    safe_email = email.translate(_EMAIL_TRANS)
+    return f"{_OAUTH_BASE_PREFIX}{provider_name}_{cred_number}_{safe_email}.env"
+
+
+def _combined_env_entry(provider_name: str, cred_file, creds: dict) -> str:
+    """Comment line plus variables for one credential inside a combined .env file."""
+    email = _cred_email(creds, "unknown")
+    cred_number = _get_credential_number_from_filename(cred_file.name)
+    env_vars, _ = _build_env_export_content(provider_name, cred_number, creds, email, include_header=False)
+    return f"\n# {provider_name.upper()} Credential #{cred_number} for: {email}\n{env_vars}"
+
 
 def ensure_env_defaults():
     """
     Ensures the .env file exists and contains essential default values like PROXY_API_KEY.
     """
+    console, _, _, _ = _ui()
+    # A missing .env is created by the write below (PROXY_API_KEY is always added then)
     if not ENV_FILE.is_file():
-        ENV_FILE.touch()
         console.print(f"Creating a new [bold yellow]{ENV_FILE.name}[/bold yellow] file...")
 
     # Check for PROXY_API_KEY, similar to setup_env.bat
-    if get_key(str(ENV_FILE), "PROXY_API_KEY") is None:
+    if "PROXY_API_KEY" not in _read_env_pairs("PROXY_API_KEY"):
         default_key = "VerysecretKey"
         console.print(f"Adding default [bold cyan]PROXY_API_KEY[/bold cyan] to [bold yellow]{ENV_FILE.name}[/bold yellow]...")
-        set_key(str(ENV_FILE), "PROXY_API_KEY", default_key)
+        _apply_env_updates({"PROXY_API_KEY": default_key})
 
-async def setup_api_key():
-    """
-    Interactively sets up a new API key for a provider.
-    """
-    console.print(Panel("[bold cyan]API Key Setup[/bold cyan]", expand=False))
 
-    # Debug toggle: Set to True to see env var names next to each provider
-    SHOW_ENV_VAR_NAMES = True
+@lru_cache(maxsize=1)
+def _api_key_providers(plugin_names: tuple) -> tuple:
+    """
+    Merge the LiteLLM providers with custom provider plugins.
 
-    # Verified list of LiteLLM providers with their friendly names and API key variables
-    LITELLM_PROVIDERS = {
-        "OpenAI": "OPENAI_API_KEY", "Anthropic": "ANTHROPIC_API_KEY",
-        "Google AI Studio (Gemini)": "GEMINI_API_KEY", "Azure OpenAI": "AZURE_API_KEY",
-        "Vertex AI": "GOOGLE_API_KEY", "AWS Bedrock": "AWS_ACCESS_KEY_ID",
-        "Cohere": "COHERE_API_KEY", "Chutes": "CHUTES_API_KEY",
-        "Mistral AI": "MISTRAL_API_KEY",
-        "Codestral (Mistral)": "CODESTRAL_API_KEY", "Groq": "GROQ_API_KEY",
-        "Perplexity": "PERPLEXITYAI_API_KEY", "xAI": "XAI_API_KEY",
-        "Together AI": "TOGETHERAI_API_KEY", "Fireworks AI": "FIREWORKS_AI_API_KEY",
-        "Replicate": "REPLICATE_API_KEY", "Hugging Face": "HUGGINGFACE_API_KEY",
-        "Anyscale": "ANYSCALE_API_KEY", "NVIDIA NIM": "NVIDIA_NIM_API_KEY",
-        "Deepseek": "DEEPSEEK_API_KEY", "AI21": "AI21_API_KEY",
-        "Cerebras": "CEREBRAS_API_KEY", "Moonshot": "MOONSHOT_API_KEY",
-        "Ollama": "OLLAMA_API_KEY", "Xinference": "XINFERENCE_API_KEY",
-        "Infinity": "INFINITY_API_KEY", "OpenRouter": "OPENROUTER_API_KEY",
-        "Deepinfra": "DEEPINFRA_API_KEY", "Cloudflare": "CLOUDFLARE_API_KEY",
-        "Baseten": "BASETEN_API_KEY", "Modal": "MODAL_API_KEY",
-        "Databricks": "DATABRICKS_API_KEY", "AWS SageMaker": "AWS_ACCESS_KEY_ID",
-        "IBM watsonx.ai": "WATSONX_APIKEY", "Predibase": "PREDIBASE_API_KEY",
-        "Clarifai": "CLARIFAI_API_KEY", "NLP Cloud": "NLP_CLOUD_API_KEY",
-        "Voyage AI": "VOYAGE_API_KEY", "Jina AI": "JINA_API_KEY",
-        "Hyperbolic": "HYPERBOLIC_API_KEY", "Morph": "MORPH_API_KEY",
-        "Lambda AI": "LAMBDA_API_KEY", "Novita AI": "NOVITA_API_KEY",
-        "Aleph Alpha": "ALEPH_ALPHA_API_KEY", "SambaNova": "SAMBANOVA_API_KEY",
-        "FriendliAI": "FRIENDLI_TOKEN", "Galadriel": "GALADRIEL_API_KEY",
-        "CompactifAI": "COMPACTIFAI_API_KEY", "Lemonade": "LEMONADE_API_KEY",
-        "GradientAI": "GRADIENTAI_API_KEY", "Featherless AI": "FEATHERLESS_AI_API_KEY",
-        "Nebius AI Studio": "NEBIUS_API_KEY", "Dashscope (Qwen)": "DASHSCOPE_API_KEY",
-        "Bytez": "BYTEZ_API_KEY", "Oracle OCI": "OCI_API_KEY",
-        "DataRobot": "DATAROBOT_API_KEY", "OVHCloud": "OVHCLOUD_API_KEY",
-        "Volcengine": "VOLCENGINE_API_KEY", "Snowflake": "SNOWFLAKE_API_KEY",
-        "Nscale": "NSCALE_API_KEY", "Recraft": "RECRAFT_API_KEY",
-        "v0": "V0_API_KEY", "Vercel": "VERCEL_AI_GATEWAY_API_KEY",
-        "Topaz": "TOPAZ_API_KEY", "ElevenLabs": "ELEVENLABS_API_KEY",
-        "Deepgram": "DEEPGRAM_API_KEY",
-        "GitHub Models": "GITHUB_TOKEN", "GitHub Copilot": "GITHUB_COPILOT_API_KEY",
-    }
-
-    # Discover custom providers and add them to the list
-    # Note: gemini_cli and antigravity are OAuth-only
-    # qwen_code API key support is a fallback
-    # iflow API key support is a feature
-    _, PROVIDER_PLUGINS = _ensure_providers_loaded()
-    
-    # Build a set of environment variables already in LITELLM_PROVIDERS
-    # to avoid duplicates based on the actual API key names
-    litellm_env_vars = set(LITELLM_PROVIDERS.values())
-    
-    # Providers to exclude from API key list
-    exclude_providers = {
-        'gemini_cli',  # OAuth-only
-        'antigravity',  # OAuth-only  
-        'qwen_code',  # API key is fallback, OAuth is primary - don't advertise
-        'openai_compatible',  # Base class, not a real provider
-    }
-    
+    Returns:
+        (display name -> API key env var mapping, sorted display names)
+    """
     discovered_providers = {}
-    for provider_key in PROVIDER_PLUGINS.keys():
-        if provider_key in exclude_providers:
+    for provider_key in plugin_names:
+        if provider_key in _API_KEY_EXCLUDED_PROVIDERS:
             continue
         
         # Create environment variable name
         env_var = provider_key.upper() + "_API_KEY"
         
-        # Check if this env var already exists in LITELLM_PROVIDERS
+        # Check if this env var already exists in _LITELLM_PROVIDERS
         # This catches duplicates like GEMINI_API_KEY, MISTRAL_API_KEY, etc.
-        if env_var in litellm_env_vars:
-            # Already in LITELLM_PROVIDERS with better name, skip this one
+        if env_var in _LITELLM_ENV_VARS:
+            # Already in _LITELLM_PROVIDERS with better name, skip this one
             continue
         
         # Create display name for this custom provider
         display_name = provider_key.replace('_', ' ').title()
         discovered_providers[display_name] = env_var
     
-    # LITELLM_PROVIDERS takes precedence (comes first in merge)
-    combined_providers = {**LITELLM_PROVIDERS, **discovered_providers}
-    provider_display_list = sorted(combined_providers.keys())
+    # _LITELLM_PROVIDERS takes precedence (comes first in merge)
+    combined_providers = MappingProxyType({**_LITELLM_PROVIDERS, **discovered_providers})
+    return combined_providers, tuple(sorted(combined_providers))
+
+
+async def setup_api_key():
+    """
+    Interactively sets up a new API key for a provider.
+    """
+    console, Panel, Prompt, Text = _ui()
+    console.print(Panel("[bold cyan]API Key Setup[/bold cyan]", expand=False))
+
+    # Debug toggle: Set to True to see env var names next to each provider
+    SHOW_ENV_VAR_NAMES = True
+
+    # Discover custom providers and merge them with the LiteLLM list
+    _, PROVIDER_PLUGINS = _ensure_providers_loaded()
+    combined_providers, provider_display_list = _api_key_providers(tuple(PROVIDER_PLUGINS.keys()))
 
     provider_text = Text()
     for i, provider_name in enumerate(provider_display_list):
@@ -234,7 +511,7 @@ async def setup_api_key():
 
     choice = Prompt.ask(
         Text.from_markup("[bold]Please select a provider or type [red]'b'[/red] to go back[/bold]"),
-        choices=[str(i + 1) for i in range(len(provider_display_list))] + ["b"],
+        choices=_choices(len(provider_display_list)),
         show_choices=False
     )
 
@@ -249,22 +526,25 @@ async def setup_api_key():
 
             api_key = Prompt.ask(f"Enter the API key for {display_name}")
 
+            # Parse .env once for both the duplicate check and the key index probe;
+            # only this provider's variables are decoded
+            env_pairs = await asyncio.to_thread(_read_env_pairs, api_var_base)
+
             # Check for duplicate API key value
-            if ENV_FILE.is_file():
-                with open(ENV_FILE, "r") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line.startswith(api_var_base) and "=" in line:
-                            existing_key_name, _, existing_key_value = line.partition("=")
-                            if existing_key_value == api_key:
-                                warning_text = Text.from_markup(f"This API key already exists as [bold yellow]'{existing_key_name}'[/bold yellow]. Overwriting...")
-                                console.print(Panel(warning_text, style="bold yellow", title="Updating API Key"))
-                                
-                                set_key(str(ENV_FILE), existing_key_name, api_key)
-
-                                success_text = Text.from_markup(f"Successfully updated existing key [bold yellow]'{existing_key_name}'[/bold yellow].")
-                                console.print(Panel(success_text, style="bold green", title="Success"))
-                                return
+            existing_key_name = next(
+                (name for name, value in env_pairs.items()
+                 if name.startswith(api_var_base) and value == api_key),
+                None
+            )
+            if existing_key_name:
+                warning_text = Text.from_markup(f"This API key already exists as [bold yellow]'{existing_key_name}'[/bold yellow]. Overwriting...")
+                console.print(Panel(warning_text, style="bold yellow", title="Updating API Key"))
+                
+                await asyncio.to_thread(_apply_env_updates, {existing_key_name: api_key})
+
+                success_text = Text.from_markup(f"Successfully updated existing key [bold yellow]'{existing_key_name}'[/bold yellow].")
+                console.print(Panel(success_text, style="bold green", title="Success"))
+                return
 
             # Special handling for AWS
             if display_name in ["AWS Bedrock", "AWS SageMaker"]:
@@ -279,18 +559,11 @@ async def setup_api_key():
                 ))
 
             key_index = 1
-            while True:
-                key_name = f"{api_var_base}_{key_index}"
-                if ENV_FILE.is_file():
-                    with open(ENV_FILE, "r") as f:
-                        if not any(line.startswith(f"{key_name}=") for line in f):
-                            break
-                else:
-                    break
+            while f"{api_var_base}_{key_index}" in env_pairs:
                 key_index += 1
             
             key_name = f"{api_var_base}_{key_index}"
-            set_key(str(ENV_FILE), key_name, api_key)
+            await asyncio.to_thread(_apply_env_updates, {key_name: api_key})
             
             success_text = Text.from_markup(f"Successfully added {display_name} API key as [bold yellow]'{key_name}'[/bold yellow].")
             console.print(Panel(success_text, style="bold green", title="Success"))
@@ -304,6 +577,7 @@ async def setup_new_credential(provider_name: str):
     """
     Interactively sets up a new OAuth credential for a given provider.
     """
+    console, Panel, _, Text = _ui()
     try:
         provider_factory, _ = _ensure_providers_loaded()
         auth_class = provider_factory.get_provider_auth_class(provider_name)
@@ -327,42 +601,48 @@ async def setup_new_credential(provider_name: str):
         }
         initialized_creds = await auth_instance.initialize_token(temp_creds)
         
-        user_info = await auth_instance.get_user_info(initialized_creds)
-        email = user_info.get("email")
+        # The OAuth flow normally records the identity in the credential metadata;
+        # only ask the auth class when it didn't
+        email = _cred_email(initialized_creds)
+        if not email:
+            user_info = await auth_instance.get_user_info(initialized_creds)
+            email = user_info.get("email")
 
         if not email:
             console.print(Panel(f"Could not retrieve a unique identifier for {provider_name}. Aborting.", style="bold red", title="Error"))
             return
 
-        for cred_file in OAUTH_BASE_DIR.glob(f"{provider_name}_oauth_*.json"):
-            with open(cred_file, 'r') as f:
-                existing_creds = json.load(f)
-
-            metadata = existing_creds.get("_proxy_metadata", {})
-            if metadata.get("email") == email:
-                warning_text = Text.from_markup(f"Found existing credential for [bold cyan]'{email}'[/bold cyan] at [bold yellow]'{cred_file.name}'[/bold yellow]. Overwriting...")
-                console.print(Panel(warning_text, style="bold yellow", title="Updating Credential"))
+        existing_cred_files = _list_oauth_files(provider_name)
+        # One concurrent read of every credential file, off the event loop
+        existing_cred_data = await _read_json_files(existing_cred_files)
+        existing_filename = next(
+            (cred_file.name
+             for cred_file, existing_creds in zip(existing_cred_files, existing_cred_data)
+             if _cred_email(existing_creds) == email),
+            None
+        )
+        if existing_filename:
+            cred_file = OAUTH_BASE_DIR / existing_filename
+            warning_text = Text.from_markup(f"Found existing credential for [bold cyan]'{email}'[/bold cyan] at [bold yellow]'{cred_file.name}'[/bold yellow]. Overwriting...")
+            console.print(Panel(warning_text, style="bold yellow", title="Updating Credential"))
 
-                # Overwrite the existing file in-place
-                with open(cred_file, 'w') as f:
-                    json.dump(initialized_creds, f, indent=2)
+            # Overwrite the existing file in-place
+            await asyncio.to_thread(_write_json_file, cred_file, initialized_creds)
 
-                success_text = Text.from_markup(f"Successfully updated credential at [bold yellow]'{cred_file.name}'[/bold yellow] for user [bold cyan]'{email}'[/bold cyan].")
-                console.print(Panel(success_text, style="bold green", title="Success"))
-                return
+            success_text = Text.from_markup(f"Successfully updated credential at [bold yellow]'{cred_file.name}'[/bold yellow] for user [bold cyan]'{email}'[/bold cyan].")
+            console.print(Panel(success_text, style="bold green", title="Success"))
+            return
 
-        existing_files = list(OAUTH_BASE_DIR.glob(f"{provider_name}_oauth_*.json"))
         next_num = 1
-        if existing_files:
-            nums = [int(re.search(r'_(\d+)\.json$', f.name).group(1)) for f in existing_files if re.search(r'_(\d+)\.json$', f.name)]
+        if existing_cred_files:
+            nums = [int(m.group(1)) for f in existing_cred_files if (m := _TRAIL_NUM_RE.search(f.name))]
             if nums:
                 next_num = max(nums) + 1
         
         new_filename = f"{provider_name}_oauth_{next_num}.json"
         new_filepath = OAUTH_BASE_DIR / new_filename
 
-        with open(new_filepath, 'w') as f:
-            json.dump(initialized_creds, f, indent=2)
+        await asyncio.to_thread(_write_json_file, new_filepath, initialized_creds)
 
         success_text = Text.from_markup(f"Successfully created new credential at [bold yellow]'{new_filepath.name}'[/bold yellow] for user [bold cyan]'{email}'[/bold cyan].")
         console.print(Panel(success_text, style="bold green", title="Success"))
@@ -371,137 +651,39 @@ async def setup_new_credential(provider_name: str):
         console.print(Panel(f"An error occurred during setup for {provider_name}: {e}", style="bold red", title="Error"))
 
 
-async def export_gemini_cli_to_env():
-    """
-    Export a Gemini CLI credential JSON file to .env format.
-    Uses numbered format (GEMINI_CLI_1_*, GEMINI_CLI_2_*) for multiple credential support.
-    """
-    console.print(Panel("[bold cyan]Export Gemini CLI Credential to .env[/bold cyan]", expand=False))
-
-    # Find all gemini_cli credentials
-    gemini_cli_files = sorted(list(OAUTH_BASE_DIR.glob("gemini_cli_oauth_*.json")))
-
-    if not gemini_cli_files:
-        console.print(Panel("No Gemini CLI credentials found. Please add one first using 'Add OAuth Credential'.",
-                          style="bold red", title="No Credentials"))
-        return
-
-    # Display available credentials
-    cred_text = Text()
-    for i, cred_file in enumerate(gemini_cli_files):
-        try:
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-            cred_text.append(f"  {i + 1}. {cred_file.name} ({email})\n")
-        except Exception as e:
-            cred_text.append(f"  {i + 1}. {cred_file.name} (error reading: {e})\n")
-
-    console.print(Panel(cred_text, title="Available Gemini CLI Credentials", style="bold blue"))
-
-    choice = Prompt.ask(
-        Text.from_markup("[bold]Please select a credential to export or type [red]'b'[/red] to go back[/bold]"),
-        choices=[str(i + 1) for i in range(len(gemini_cli_files))] + ["b"],
-        show_choices=False
-    )
-
-    if choice.lower() == 'b':
-        return
-
-    try:
-        choice_index = int(choice) - 1
-        if 0 <= choice_index < len(gemini_cli_files):
-            cred_file = gemini_cli_files[choice_index]
-
-            # Load the credential
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-
-            # Extract metadata
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-            project_id = creds.get("_proxy_metadata", {}).get("project_id", "")
-            tier = creds.get("_proxy_metadata", {}).get("tier", "")
-
-            # Get credential number from filename
-            cred_number = _get_credential_number_from_filename(cred_file.name)
-
-            # Generate .env file name with credential number
-            safe_email = email.replace("@", "_at_").replace(".", "_")
-            env_filename = f"gemini_cli_{cred_number}_{safe_email}.env"
-            env_filepath = OAUTH_BASE_DIR / env_filename
-
-            # Build extra fields
-            extra_fields = {}
-            if project_id:
-                extra_fields["PROJECT_ID"] = project_id
-            if tier:
-                extra_fields["TIER"] = tier
-
-            # Build .env content using helper
-            env_lines, numbered_prefix = _build_env_export_content(
-                provider_prefix="GEMINI_CLI",
-                cred_number=cred_number,
-                creds=creds,
-                email=email,
-                extra_fields=extra_fields,
-                include_client_creds=True
-            )
-
-            # Write to .env file
-            with open(env_filepath, 'w') as f:
-                f.write('\n'.join(env_lines))
-
-            success_text = Text.from_markup(
-                f"Successfully exported credential to [bold yellow]'{env_filepath}'[/bold yellow]\n\n"
-                f"[bold]Environment variable prefix:[/bold] [cyan]{numbered_prefix}_*[/cyan]\n\n"
-                f"[bold]To use this credential:[/bold]\n"
-                f"1. Copy the contents to your main .env file, OR\n"
-                f"2. Source it: [bold cyan]source {env_filepath.name}[/bold cyan] (Linux/Mac)\n"
-                f"3. Or on Windows: [bold cyan]Get-Content {env_filepath.name} | ForEach-Object {{ $_ -replace '^([^#].*)$', 'set $1' }} | cmd[/bold cyan]\n\n"
-                f"[bold]To combine multiple credentials:[/bold]\n"
-                f"Copy lines from multiple .env files into one file.\n"
-                f"Each credential uses a unique number ({numbered_prefix}_*)."
-            )
-            console.print(Panel(success_text, style="bold green", title="Success"))
-        else:
-            console.print("[bold red]Invalid choice. Please try again.[/bold red]")
-    except ValueError:
-        console.print("[bold red]Invalid input. Please enter a number or 'b'.[/bold red]")
-    except Exception as e:
-        console.print(Panel(f"An error occurred during export: {e}", style="bold red", title="Error"))
-
-
-async def export_qwen_code_to_env():
+async def export_to_env(provider_name: str):
     """
-    Export a Qwen Code credential JSON file to .env format.
-    Generates one .env file per credential.
+    Export one OAuth credential JSON file of a provider to .env format.
+    Uses numbered format (e.g. GEMINI_CLI_1_*, GEMINI_CLI_2_*) for multiple credential support.
     """
-    console.print(Panel("[bold cyan]Export Qwen Code Credential to .env[/bold cyan]", expand=False))
+    console, Panel, Prompt, Text = _ui()
+    spec = _export_spec(provider_name)
+    display_name = spec["display_name"]
+    console.print(Panel(f"[bold cyan]Export {display_name} Credential to .env[/bold cyan]", expand=False))
 
-    # Find all qwen_code credentials
-    qwen_code_files = list(OAUTH_BASE_DIR.glob("qwen_code_oauth_*.json"))
+    # Find all credentials for the provider
+    cred_files = _list_oauth_files(provider_name)
 
-    if not qwen_code_files:
-        console.print(Panel("No Qwen Code credentials found. Please add one first using 'Add OAuth Credential'.",
+    if not cred_files:
+        console.print(Panel(f"No {display_name} credentials found. Please add one first using 'Add OAuth Credential'.",
                           style="bold red", title="No Credentials"))
         return
 
     # Display available credentials
     cred_text = Text()
-    for i, cred_file in enumerate(qwen_code_files):
-        try:
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-            cred_text.append(f"  {i + 1}. {cred_file.name} ({email})\n")
-        except Exception as e:
-            cred_text.append(f"  {i + 1}. {cred_file.name} (error reading: {e})\n")
+    loaded_creds = await _read_json_files(cred_files, return_exceptions=True)
+    for i, (cred_file, creds) in enumerate(zip(cred_files, loaded_creds)):
+        if isinstance(creds, Exception):
+            cred_text.append(f"  {i + 1}. {cred_file.name} (error reading: {creds})\n")
+            continue
+        email = _cred_email(creds, "unknown")
+        cred_text.append(f"  {i + 1}. {cred_file.name} ({email})\n")
 
-    console.print(Panel(cred_text, title="Available Qwen Code Credentials", style="bold blue"))
+    console.print(Panel(cred_text, title=f"Available {display_name} Credentials", style="bold blue"))
 
     choice = Prompt.ask(
         Text.from_markup("[bold]Please select a credential to export or type [red]'b'[/red] to go back[/bold]"),
-        choices=[str(i + 1) for i in range(len(qwen_code_files))] + ["b"],
+        choices=_choices(len(cred_files)),
         show_choices=False
     )
 
@@ -510,151 +692,33 @@ async def export_qwen_code_to_env():
 
     try:
         choice_index = int(choice) - 1
-        if 0 <= choice_index < len(qwen_code_files):
-            cred_file = qwen_code_files[choice_index]
+        if 0 <= choice_index < len(cred_files):
+            cred_file = cred_files[choice_index]
 
             # Load the credential
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-
-            # Extract metadata
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
+            creds = await asyncio.to_thread(_load_creds, cred_file)
+            email = _cred_email(creds, "unknown")
 
             # Get credential number from filename
             cred_number = _get_credential_number_from_filename(cred_file.name)
+            env_filepath = Path(_export_env_path(provider_name, cred_number, email))
 
-            # Generate .env file name with credential number
-            safe_email = email.replace("@", "_at_").replace(".", "_")
-            env_filename = f"qwen_code_{cred_number}_{safe_email}.env"
-            env_filepath = OAUTH_BASE_DIR / env_filename
-
-            # Use numbered format: QWEN_CODE_N_*
-            numbered_prefix = f"QWEN_CODE_{cred_number}"
-
-            # Build .env content (Qwen has different structure)
-            env_lines = [
-                f"# QWEN_CODE Credential #{cred_number} for: {email}",
-                f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
-                f"# ",
-                f"# To combine multiple credentials into one .env file, copy these lines",
-                f"# and ensure each credential has a unique number (1, 2, 3, etc.)",
-                "",
-                f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                f"{numbered_prefix}_RESOURCE_URL={creds.get('resource_url', 'https://portal.qwen.ai/v1')}",
-                f"{numbered_prefix}_EMAIL={email}",
-            ]
+            env_content, numbered_prefix = _build_env_export_content(provider_name, cred_number, creds, email)
 
             # Write to .env file
-            with open(env_filepath, 'w') as f:
-                f.write('\n'.join(env_lines))
+            await asyncio.to_thread(_write_text_file, env_filepath, env_content)
 
-            success_text = Text.from_markup(
-                f"Successfully exported credential to [bold yellow]'{env_filepath}'[/bold yellow]\n\n"
-                f"[bold]Environment variable prefix:[/bold] [cyan]{numbered_prefix}_*[/cyan]\n\n"
-                f"[bold]To use this credential:[/bold]\n"
-                f"1. Copy the contents to your main .env file, OR\n"
-                f"2. Source it: [bold cyan]source {env_filepath.name}[/bold cyan] (Linux/Mac)\n\n"
-                f"[bold]To combine multiple credentials:[/bold]\n"
-                f"Copy lines from multiple .env files into one file.\n"
-                f"Each credential uses a unique number ({numbered_prefix}_*)."
+            windows_hint = (
+                f"3. Or on Windows: [bold cyan]Get-Content {env_filepath.name} | ForEach-Object {{ $_ -replace '^([^#].*)$', 'set $1' }} | cmd[/bold cyan]\n"
+                if spec["windows_hint"] else ""
             )
-            console.print(Panel(success_text, style="bold green", title="Success"))
-        else:
-            console.print("[bold red]Invalid choice. Please try again.[/bold red]")
-    except ValueError:
-        console.print("[bold red]Invalid input. Please enter a number or 'b'.[/bold red]")
-    except Exception as e:
-        console.print(Panel(f"An error occurred during export: {e}", style="bold red", title="Error"))
-
-
-async def export_iflow_to_env():
-    """
-    Export an iFlow credential JSON file to .env format.
-    Uses numbered format (IFLOW_1_*, IFLOW_2_*) for multiple credential support.
-    """
-    console.print(Panel("[bold cyan]Export iFlow Credential to .env[/bold cyan]", expand=False))
-
-    # Find all iflow credentials
-    iflow_files = sorted(list(OAUTH_BASE_DIR.glob("iflow_oauth_*.json")))
-
-    if not iflow_files:
-        console.print(Panel("No iFlow credentials found. Please add one first using 'Add OAuth Credential'.",
-                          style="bold red", title="No Credentials"))
-        return
-
-    # Display available credentials
-    cred_text = Text()
-    for i, cred_file in enumerate(iflow_files):
-        try:
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-            cred_text.append(f"  {i + 1}. {cred_file.name} ({email})\n")
-        except Exception as e:
-            cred_text.append(f"  {i + 1}. {cred_file.name} (error reading: {e})\n")
-
-    console.print(Panel(cred_text, title="Available iFlow Credentials", style="bold blue"))
-
-    choice = Prompt.ask(
-        Text.from_markup("[bold]Please select a credential to export or type [red]'b'[/red] to go back[/bold]"),
-        choices=[str(i + 1) for i in range(len(iflow_files))] + ["b"],
-        show_choices=False
-    )
-
-    if choice.lower() == 'b':
-        return
-
-    try:
-        choice_index = int(choice) - 1
-        if 0 <= choice_index < len(iflow_files):
-            cred_file = iflow_files[choice_index]
-
-            # Load the credential
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-
-            # Extract metadata
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-
-            # Get credential number from filename
-            cred_number = _get_credential_number_from_filename(cred_file.name)
-
-            # Generate .env file name with credential number
-            safe_email = email.replace("@", "_at_").replace(".", "_")
-            env_filename = f"iflow_{cred_number}_{safe_email}.env"
-            env_filepath = OAUTH_BASE_DIR / env_filename
-
-            # Use numbered format: IFLOW_N_*
-            numbered_prefix = f"IFLOW_{cred_number}"
-
-            # Build .env content (iFlow has different structure with API key)
-            env_lines = [
-                f"# IFLOW Credential #{cred_number} for: {email}",
-                f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
-                f"# ",
-                f"# To combine multiple credentials into one .env file, copy these lines",
-                f"# and ensure each credential has a unique number (1, 2, 3, etc.)",
-                "",
-                f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                f"{numbered_prefix}_API_KEY={creds.get('api_key', '')}",
-                f"{numbered_prefix}_USER_ID={creds.get('user_id', '')}",
-                f"{numbered_prefix}_EMAIL={email}",
-            ]
-
-            # Write to .env file
-            with open(env_filepath, 'w') as f:
-                f.write('\n'.join(env_lines))
-
             success_text = Text.from_markup(
                 f"Successfully exported credential to [bold yellow]'{env_filepath}'[/bold yellow]\n\n"
                 f"[bold]Environment variable prefix:[/bold] [cyan]{numbered_prefix}_*[/cyan]\n\n"
                 f"[bold]To use this credential:[/bold]\n"
                 f"1. Copy the contents to your main .env file, OR\n"
-                f"2. Source it: [bold cyan]source {env_filepath.name}[/bold cyan] (Linux/Mac)\n\n"
+                f"2. Source it: [bold cyan]source {env_filepath.name}[/bold cyan] (Linux/Mac)\n"
+                f"{windows_hint}\n"
                 f"[bold]To combine multiple credentials:[/bold]\n"
                 f"Copy lines from multiple .env files into one file.\n"
                 f"Each credential uses a unique number ({numbered_prefix}_*)."
@@ -668,192 +732,55 @@ async def export_iflow_to_env():
         console.print(Panel(f"An error occurred during export: {e}", style="bold red", title="Error"))
 
 
-async def export_antigravity_to_env():
-    """
-    Export an Antigravity credential JSON file to .env format.
-    Uses numbered format (ANTIGRAVITY_1_*, ANTIGRAVITY_2_*) for multiple credential support.
-    """
-    console.print(Panel("[bold cyan]Export Antigravity Credential to .env[/bold cyan]", expand=False))
-
-    # Find all antigravity credentials
-    antigravity_files = sorted(list(OAUTH_BASE_DIR.glob("antigravity_oauth_*.json")))
-
-    if not antigravity_files:
-        console.print(Panel("No Antigravity credentials found. Please add one first using 'Add OAuth Credential'.",
-                          style="bold red", title="No Credentials"))
+def _print_errors(errors: list, action: str):
+    """Report per-file failures from a bulk operation in one panel instead of one print each."""
+    if not errors:
         return
-
-    # Display available credentials
-    cred_text = Text()
-    for i, cred_file in enumerate(antigravity_files):
-        try:
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-            cred_text.append(f"  {i + 1}. {cred_file.name} ({email})\n")
-        except Exception as e:
-            cred_text.append(f"  {i + 1}. {cred_file.name} (error reading: {e})\n")
-
-    console.print(Panel(cred_text, title="Available Antigravity Credentials", style="bold blue"))
-
-    choice = Prompt.ask(
-        Text.from_markup("[bold]Please select a credential to export or type [red]'b'[/red] to go back[/bold]"),
-        choices=[str(i + 1) for i in range(len(antigravity_files))] + ["b"],
-        show_choices=False
+    console, Panel, _, _ = _ui()
+    console.print(Panel(
+        "\n".join(f"Error {action} {name}: {e}" for name, e in errors),
+        style="red",
+        title=f"{len(errors)} error(s)"
+    ))
+
+
+def _export_one(cred_file, provider_name: str, generated_at: str) -> str:
+    """Blocking export of one credential file to its own .env; returns the written path."""
+    creds = _load_creds(cred_file)
+    email = _cred_email(creds, "unknown")
+    cred_number = _get_credential_number_from_filename(cred_file.name)
+    env_filepath = _export_env_path(provider_name, cred_number, email)
+    env_content, _ = _build_env_export_content(
+        provider_name, cred_number, creds, email, generated_at=generated_at
     )
-
-    if choice.lower() == 'b':
-        return
-
-    try:
-        choice_index = int(choice) - 1
-        if 0 <= choice_index < len(antigravity_files):
-            cred_file = antigravity_files[choice_index]
-
-            # Load the credential
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-
-            # Extract metadata
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-            project_id = creds.get("_proxy_metadata", {}).get("project_id", "")
-            tier = creds.get("_proxy_metadata", {}).get("tier", "")
-
-            # Get credential number from filename
-            cred_number = _get_credential_number_from_filename(cred_file.name)
-
-            # Generate .env file name with credential number
-            safe_email = email.replace("@", "_at_").replace(".", "_")
-            env_filename = f"antigravity_{cred_number}_{safe_email}.env"
-            env_filepath = OAUTH_BASE_DIR / env_filename
-
-            # Build extra fields
-            extra_fields = {}
-            if project_id:
-                extra_fields["PROJECT_ID"] = project_id
-            if tier:
-                extra_fields["TIER"] = tier
-
-            # Build .env content using helper
-            env_lines, numbered_prefix = _build_env_export_content(
-                provider_prefix="ANTIGRAVITY",
-                cred_number=cred_number,
-                creds=creds,
-                email=email,
-                extra_fields=extra_fields,
-                include_client_creds=True
-            )
-
-            # Write to .env file
-            with open(env_filepath, 'w') as f:
-                f.write('\n'.join(env_lines))
-
-            success_text = Text.from_markup(
-                f"Successfully exported credential to [bold yellow]'{env_filepath}'[/bold yellow]\n\n"
-                f"[bold]Environment variable prefix:[/bold] [cyan]{numbered_prefix}_*[/cyan]\n\n"
-                f"[bold]To use this credential:[/bold]\n"
-                f"1. Copy the contents to your main .env file, OR\n"
-                f"2. Source it: [bold cyan]source {env_filepath.name}[/bold cyan] (Linux/Mac)\n"
-                f"3. Or on Windows: [bold cyan]Get-Content {env_filepath.name} | ForEach-Object {{ $_ -replace '^([^#].*)$', 'set $1' }} | cmd[/bold cyan]\n\n"
-                f"[bold]To combine multiple credentials:[/bold]\n"
-                f"Copy lines from multiple .env files into one file.\n"
-                f"Each credential uses a unique number ({numbered_prefix}_*)."
-            )
-            console.print(Panel(success_text, style="bold green", title="Success"))
-        else:
-            console.print("[bold red]Invalid choice. Please try again.[/bold red]")
-    except ValueError:
-        console.print("[bold red]Invalid input. Please enter a number or 'b'.[/bold red]")
-    except Exception as e:
-        console.print(Panel(f"An error occurred during export: {e}", style="bold red", title="Error"))
+    _write_text_file(env_filepath, env_content)
+    return env_filepath
 
 
 async def export_all_provider_credentials(provider_name: str):
     """
     Export ALL credentials for a given provider to individual .env files.
     """
+    console, Panel, _, _ = _ui()
     console.print(Panel(f"[bold cyan]Export ALL {provider_name.upper()} Credentials[/bold cyan]", expand=False))
 
     # Find all credentials for the provider
-    files = sorted(list(OAUTH_BASE_DIR.glob(f"{provider_name}_oauth_*.json")))
+    files = _list_oauth_files(provider_name)
 
     if not files:
         console.print(Panel(f"No {provider_name.upper()} credentials found. Please add one first using 'Add OAuth Credential'.",
                           style="bold red", title="No Credentials"))
         return
 
-    # Process all credentials
-    success_count = 0
-    for cred_file in files:
-        try:
-            # Load the credential
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-
-            # Extract metadata
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-
-            # Get credential number from filename
-            cred_number = _get_credential_number_from_filename(cred_file.name)
-
-            # Generate .env file name with credential number
-            safe_email = email.replace("@", "_at_").replace(".", "_")
-            env_filename = f"{provider_name}_{cred_number}_{safe_email}.env"
-            env_filepath = OAUTH_BASE_DIR / env_filename
-
-            # Build provider-specific .env content
-            if provider_name == "qwen_code":
-                # Qwen Code has different structure
-                numbered_prefix = f"QWEN_CODE_{cred_number}"
-                env_lines = [
-                    f"# QWEN_CODE Credential #{cred_number} for: {email}",
-                    f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
-                    "",
-                    f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                    f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                    f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                    f"{numbered_prefix}_RESOURCE_URL={creds.get('resource_url', 'https://portal.qwen.ai/v1')}",
-                    f"{numbered_prefix}_EMAIL={email}",
-                ]
-            elif provider_name == "iflow":
-                # iFlow has different structure
-                numbered_prefix = f"IFLOW_{cred_number}"
-                env_lines = [
-                    f"# IFLOW Credential #{cred_number} for: {email}",
-                    f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
-                    "",
-                    f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                    f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                    f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                    f"{numbered_prefix}_API_KEY={creds.get('api_key', '')}",
-                    f"{numbered_prefix}_USER_ID={creds.get('user_id', '')}",
-                    f"{numbered_prefix}_EMAIL={email}",
-                ]
-            else:
-                # Use helper for other providers
-                extra_fields = {}
-                if creds.get("_proxy_metadata", {}).get("project_id"):
-                    extra_fields["PROJECT_ID"] = creds.get("_proxy_metadata", {}).get("project_id")
-                if creds.get("_proxy_metadata", {}).get("tier"):
-                    extra_fields["TIER"] = creds.get("_proxy_metadata", {}).get("tier")
-
-                env_lines, numbered_prefix = _build_env_export_content(
-                    provider_prefix=provider_name.upper(),
-                    cred_number=cred_number,
-                    creds=creds,
-                    email=email,
-                    extra_fields=extra_fields,
-                    include_client_creds=True
-                )
-
-            # Write to .env file
-            with open(env_filepath, 'w') as f:
-                f.write('\n'.join(env_lines))
-
-            success_count += 1
-
-        except Exception as e:
-            console.print(f"[red]Error exporting {cred_file.name}: {e}[/red]")
+    # Each file is read, rendered and written independently, so export them concurrently
+    generated_at = _generated_at()
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_export_one, cred_file, provider_name, generated_at) for cred_file in files),
+        return_exceptions=True
+    )
+    errors = [(cred_file.name, result) for cred_file, result in zip(files, results) if isinstance(result, Exception)]
+    success_count = len(files) - len(errors)
+    _print_errors(errors, "exporting")
 
     if success_count > 0:
         console.print(Panel(f"Successfully exported [bold green]{success_count}[/bold green] {provider_name.upper()} credential(s).", style="bold green", title="Success"))
@@ -865,10 +792,11 @@ async def combine_provider_credentials(provider_name: str):
     """
     Combine ALL credentials for a provider into a single .env file.
     """
+    console, Panel, _, _ = _ui()
     console.print(Panel(f"[bold cyan]Combine ALL {provider_name.upper()} Credentials[/bold cyan]", expand=False))
 
     # Find all credentials for the provider
-    files = sorted(list(OAUTH_BASE_DIR.glob(f"{provider_name}_oauth_*.json")))
+    files = _list_oauth_files(provider_name)
 
     if not files:
         console.print(Panel(f"No {provider_name.upper()} credentials found. Please add one first using 'Add OAuth Credential'.",
@@ -878,75 +806,25 @@ async def combine_provider_credentials(provider_name: str):
     # Combine all into one file
     combined_env_lines = [
         f"# Combined {provider_name.upper()} credentials",
-        f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"# Generated at: {_generated_at()}",
         "# ",
         "# Each credential uses a unique number (1, 2, 3, etc.)",
         "#",
     ]
 
+    loaded_creds = await _read_json_files(files, return_exceptions=True)
     success_count = 0
-    for cred_file in files:
+    errors = []
+    for cred_file, creds in zip(files, loaded_creds):
         try:
-            # Load the credential
-            with open(cred_file, 'r') as f:
-                creds = json.load(f)
-
-            # Extract metadata
-            email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-
-            # Get credential number from filename
-            cred_number = _get_credential_number_from_filename(cred_file.name)
-
-            # Build provider-specific .env content
-            if provider_name == "qwen_code":
-                # Qwen Code has different structure
-                numbered_prefix = f"QWEN_CODE_{cred_number}"
-                cred_lines = [
-                    f"",
-                    f"# {provider_name.upper()} Credential #{cred_number} for: {email}",
-                    f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                    f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                    f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                    f"{numbered_prefix}_RESOURCE_URL={creds.get('resource_url', 'https://portal.qwen.ai/v1')}",
-                    f"{numbered_prefix}_EMAIL={email}",
-                ]
-            elif provider_name == "iflow":
-                # iFlow has different structure
-                numbered_prefix = f"IFLOW_{cred_number}"
-                cred_lines = [
-                    f"",
-                    f"# {provider_name.upper()} Credential #{cred_number} for: {email}",
-                    f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                    f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                    f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                    f"{numbered_prefix}_API_KEY={creds.get('api_key', '')}",
-                    f"{numbered_prefix}_USER_ID={creds.get('user_id', '')}",
-                    f"{numbered_prefix}_EMAIL={email}",
-                ]
-            else:
-                # Use helper for other providers
-                extra_fields = {}
-                if creds.get("_proxy_metadata", {}).get("project_id"):
-                    extra_fields["PROJECT_ID"] = creds.get("_proxy_metadata", {}).get("project_id")
-                if creds.get("_proxy_metadata", {}).get("tier"):
-                    extra_fields["TIER"] = creds.get("_proxy_metadata", {}).get("tier")
-
-                env_lines, numbered_prefix = _build_env_export_content(
-                    provider_prefix=provider_name.upper(),
-                    cred_number=cred_number,
-                    creds=creds,
-                    email=email,
-                    extra_fields=extra_fields,
-                    include_client_creds=True
-                )
-                # Take only the variable lines (skip the comment lines)
-                cred_lines = [line for line in env_lines if line and not line.startswith("#")]
-
-            combined_env_lines.extend(cred_lines)
+            if isinstance(creds, Exception):
+                raise creds
+            combined_env_lines.append(_combined_env_entry(provider_name, cred_file, creds))
             success_count += 1
 
         except Exception as e:
-            console.print(f"[red]Error processing {cred_file.name}: {e}[/red]")
+            errors.append((cred_file.name, e))
+    _print_errors(errors, "processing")
 
     if success_count > 0:
         # Generate combined file name
@@ -954,8 +832,7 @@ async def combine_provider_credentials(provider_name: str):
         combined_filepath = OAUTH_BASE_DIR / combined_filename
 
         # Write to combined .env file
-        with open(combined_filepath, 'w') as f:
-            f.write('\n'.join(combined_env_lines))
+        await asyncio.to_thread(_write_lines_file, combined_filepath, combined_env_lines)
 
         console.print(Panel(f"Successfully combined [bold green]{success_count}[/bold green] {provider_name.upper()} credential(s) into [bold yellow]'{combined_filename}'[/bold yellow].", style="bold green", title="Success"))
         console.print(f"\n[dim]To use these credentials, add the contents of '{combined_filename}' to your main .env file.[/dim]")
@@ -967,97 +844,52 @@ async def combine_all_credentials():
     """
     Combine ALL credentials from ALL providers into a single .env file.
     """
+    console, Panel, _, _ = _ui()
     console.print(Panel("[bold cyan]Combine ALL Provider Credentials[/bold cyan]", expand=False))
 
     # Find all credential files
-    all_files = list(OAUTH_BASE_DIR.glob("*_oauth_*.json"))
+    all_files = _list_oauth_files()
     
     if not all_files:
         console.print(Panel("No credentials found. Please add one first using 'Add OAuth Credential'.",
                           style="bold red", title="No Credentials"))
         return
 
-    # Group by provider
-    provider_files = {}
-    for cred_file in all_files:
-        provider_name = cred_file.name.split("_oauth_")[0]
-        if provider_name not in provider_files:
-            provider_files[provider_name] = []
-        provider_files[provider_name].append(cred_file)
+    # Load all credentials concurrently, then order by (provider, filename) so groupby
+    # walks each provider's files as one contiguous run
+    loaded_creds = await _read_json_files(all_files, return_exceptions=True)
+    entries = sorted(
+        (
+            (cred_file.name.partition("_oauth_")[0], cred_file, creds)
+            for cred_file, creds in zip(all_files, loaded_creds)
+        ),
+        key=lambda entry: (entry[0], entry[1].name)
+    )
 
     # Combine all into one file
     combined_env_lines = [
         f"# Combined ALL credentials from ALL providers",
-        f"# Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"# Generated at: {_generated_at()}",
         "# ",
         "# Each credential uses a unique number (1, 2, 3, etc.)",
         "#",
     ]
 
     total_success = 0
-    for provider_name, files in provider_files.items():
-        for cred_file in files:
+    provider_count = 0
+    errors = []
+    for provider_name, group in groupby(entries, key=itemgetter(0)):
+        provider_count += 1
+        for _, cred_file, creds in group:
             try:
-                # Load the credential
-                with open(cred_file, 'r') as f:
-                    creds = json.load(f)
-
-                # Extract metadata
-                email = creds.get("_proxy_metadata", {}).get("email", "unknown")
-
-                # Get credential number from filename
-                cred_number = _get_credential_number_from_filename(cred_file.name)
-
-                # Build provider-specific .env content
-                if provider_name == "qwen_code":
-                    # Qwen Code has different structure
-                    numbered_prefix = f"QWEN_CODE_{cred_number}"
-                    cred_lines = [
-                        f"",
-                        f"# {provider_name.upper()} Credential #{cred_number} for: {email}",
-                        f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                        f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                        f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                        f"{numbered_prefix}_RESOURCE_URL={creds.get('resource_url', 'https://portal.qwen.ai/v1')}",
-                        f"{numbered_prefix}_EMAIL={email}",
-                    ]
-                elif provider_name == "iflow":
-                    # iFlow has different structure
-                    numbered_prefix = f"IFLOW_{cred_number}"
-                    cred_lines = [
-                        f"",
-                        f"# {provider_name.upper()} Credential #{cred_number} for: {email}",
-                        f"{numbered_prefix}_ACCESS_TOKEN={creds.get('access_token', '')}",
-                        f"{numbered_prefix}_REFRESH_TOKEN={creds.get('refresh_token', '')}",
-                        f"{numbered_prefix}_EXPIRY_DATE={creds.get('expiry_date', 0)}",
-                        f"{numbered_prefix}_API_KEY={creds.get('api_key', '')}",
-                        f"{numbered_prefix}_USER_ID={creds.get('user_id', '')}",
-                        f"{numbered_prefix}_EMAIL={email}",
-                    ]
-                else:
-                    # Use helper for other providers
-                    extra_fields = {}
-                    if creds.get("_proxy_metadata", {}).get("project_id"):
-                        extra_fields["PROJECT_ID"] = creds.get("_proxy_metadata", {}).get("project_id")
-                    if creds.get("_proxy_metadata", {}).get("tier"):
-                        extra_fields["TIER"] = creds.get("_proxy_metadata", {}).get("tier")
-
-                    env_lines, numbered_prefix = _build_env_export_content(
-                        provider_prefix=provider_name.upper(),
-                        cred_number=cred_number,
-                        creds=creds,
-                        email=email,
-                        extra_fields=extra_fields,
-                        include_client_creds=True
-                    )
-                    # Take only the variable lines (skip the comment lines)
-                    cred_lines = [line for line in env_lines if line and not line.startswith("#")]
-
-                combined_env_lines.extend(cred_lines)
+                if isinstance(creds, Exception):
+                    raise creds
+                combined_env_lines.append(_combined_env_entry(provider_name, cred_file, creds))
                 total_success += 1
 
             except Exception as e:
-                console.print(f"[red]Error processing {cred_file.name}: {e}[/red]")
+                errors.append((cred_file.name, e))
+    _print_errors(errors, "processing")
 
     if total_success > 0:
         # Generate combined file name
@@ -1065,110 +897,112 @@ async def combine_all_credentials():
         combined_filepath = OAUTH_BASE_DIR / combined_filename
 
         # Write to combined .env file
-        with open(combined_filepath, 'w') as f:
-            f.write('\n'.join(combined_env_lines))
+        await asyncio.to_thread(_write_lines_file, combined_filepath, combined_env_lines)
 
-        console.print(Panel(f"Successfully combined [bold green]{total_success}[/bold green] credential(s) from [bold green]{len(provider_files)}[/bold green] provider(s) into [bold yellow]'{combined_filename}'[/bold yellow].", style="bold green", title="Success"))
+        console.print(Panel(f"Successfully combined [bold green]{total_success}[/bold green] credential(s) from [bold green]{provider_count}[/bold green] provider(s) into [bold yellow]'{combined_filename}'[/bold yellow].", style="bold green", title="Success"))
         console.print(f"\n[dim]To use these credentials, add the contents of '{combined_filename}' to your main .env file.[/dim]")
     else:
         console.print(Panel("Failed to process any credentials.", style="bold red", title="Failed"))
 
 
+# Export submenu choice -> (coroutine, args)
+_EXPORT_ACTIONS = {
+    # Individual exports
+    "1": (export_to_env, ("gemini_cli",)),
+    "2": (export_to_env, ("qwen_code",)),
+    "3": (export_to_env, ("iflow",)),
+    "4": (export_to_env, ("antigravity",)),
+    # Bulk exports (all credentials for a provider)
+    "5": (export_all_provider_credentials, ("gemini_cli",)),
+    "6": (export_all_provider_credentials, ("qwen_code",)),
+    "7": (export_all_provider_credentials, ("iflow",)),
+    "8": (export_all_provider_credentials, ("antigravity",)),
+    # Combine per provider
+    "9": (combine_provider_credentials, ("gemini_cli",)),
+    "10": (combine_provider_credentials, ("qwen_code",)),
+    "11": (combine_provider_credentials, ("iflow",)),
+    "12": (combine_provider_credentials, ("antigravity",)),
+    # Combine all providers
+    "13": (combine_all_credentials, ()),
+}
+
+
+@cache
+def _export_menu_panel():
+    """Export submenu panel; built once since its markup never changes."""
+    _, Panel, _, Text = _ui()
+    return Panel(
+        Text.from_markup(
+            "[bold]Individual Exports (one at a time):[/bold]\n"
+            "1. Export Gemini CLI credential\n"
+            "2. Export Qwen Code credential\n"
+            "3. Export iFlow credential\n"
+            "4. Export Antigravity credential\n"
+            "\n"
+            "[bold]Bulk Exports (per provider):[/bold]\n"
+            "5. Export ALL Gemini CLI credentials\n"
+            "6. Export ALL Qwen Code credentials\n"
+            "7. Export ALL iFlow credentials\n"
+            "8. Export ALL Antigravity credentials\n"
+            "\n"
+            "[bold]Combine Credentials:[/bold]\n"
+            "9. Combine all Gemini CLI into one file\n"
+            "10. Combine all Qwen Code into one file\n"
+            "11. Combine all iFlow into one file\n"
+            "12. Combine all Antigravity into one file\n"
+            "13. Combine ALL providers into one file"
+        ),
+        title="Choose export option",
+        style="bold blue"
+    )
+
+
+@cache
+def _export_menu_prompt():
+    """Prompt shown under the export submenu."""
+    _, _, _, Text = _ui()
+    return Text.from_markup("[bold]Please select an option or type [red]'b'[/red] to go back[/bold]")
+
+
 async def export_credentials_submenu():
     """
     Submenu for exporting credentials.
     """
+    console, _, Prompt, _ = _ui()
     while True:
-        console.print(Panel(
-            Text.from_markup(
-                "[bold]Individual Exports (one at a time):[/bold]\n"
-                "1. Export Gemini CLI credential\n"
-                "2. Export Qwen Code credential\n"
-                "3. Export iFlow credential\n"
-                "4. Export Antigravity credential\n"
-                "\n"
-                "[bold]Bulk Exports (per provider):[/bold]\n"
-                "5. Export ALL Gemini CLI credentials\n"
-                "6. Export ALL Qwen Code credentials\n"
-                "7. Export ALL iFlow credentials\n"
-                "8. Export ALL Antigravity credentials\n"
-                "\n"
-                "[bold]Combine Credentials:[/bold]\n"
-                "9. Combine all Gemini CLI into one file\n"
-                "10. Combine all Qwen Code into one file\n"
-                "11. Combine all iFlow into one file\n"
-                "12. Combine all Antigravity into one file\n"
-                "13. Combine ALL providers into one file"
-            ),
-            title="Choose export option",
-            style="bold blue"
-        ))
+        console.print(_export_menu_panel())
 
         export_choice = Prompt.ask(
-            Text.from_markup("[bold]Please select an option or type [red]'b'[/red] to go back[/bold]"),
-            choices=["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13", "b"],
+            _export_menu_prompt(),
+            choices=_choices(13),
             show_choices=False
         )
 
         if export_choice.lower() == 'b':
             break
 
-        # Individual exports
-        if export_choice == "1":
-            await export_gemini_cli_to_env()
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "2":
-            await export_qwen_code_to_env()
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "3":
-            await export_iflow_to_env()
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "4":
-            await export_antigravity_to_env()
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        # Bulk exports (all credentials for a provider)
-        elif export_choice == "5":
-            await export_all_provider_credentials("gemini_cli")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "6":
-            await export_all_provider_credentials("qwen_code")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "7":
-            await export_all_provider_credentials("iflow")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "8":
-            await export_all_provider_credentials("antigravity")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        # Combine per provider
-        elif export_choice == "9":
-            await combine_provider_credentials("gemini_cli")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "10":
-            await combine_provider_credentials("qwen_code")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "11":
-            await combine_provider_credentials("iflow")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        elif export_choice == "12":
-            await combine_provider_credentials("antigravity")
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
-        # Combine all providers
-        elif export_choice == "13":
-            await combine_all_credentials()
-            console.print("\n[dim]Press Enter to return to export menu...[/dim]")
-            input()
+        handler, args = _EXPORT_ACTIONS[export_choice]
+        await handler(*args)
+        console.print("\n[dim]Press Enter to return to export menu...[/dim]")
+        await asyncio.to_thread(input)
+
+
+@cache
+def _main_menu():
+    """Main menu renderables (header, options panel, prompt), built once."""
+    _, Panel, _, Text = _ui()
+    header_panel = Panel("[bold cyan]Interactive Credential Setup[/bold cyan]", title="--- API Key Proxy ---", expand=False)
+    menu_panel = Panel(
+        Text.from_markup(
+            "1. Add OAuth Credential\n"
+            "2. Add API Key\n"
+            "3. Export Credentials"
+        ),
+        title="Choose credential type",
+        style="bold blue"
+    )
+    menu_prompt = Text.from_markup("[bold]Please select an option or type [red]'q'[/red] to quit[/bold]")
+    return header_panel, menu_panel, menu_prompt
 
 
 async def main(clear_on_start=True):
@@ -1179,29 +1013,23 @@ async def main(clear_on_start=True):
         clear_on_start: If False, skip initial screen clear (used when called from launcher 
                        to preserve the loading screen)
     """
+    console, Panel, Prompt, Text = _ui()
     ensure_env_defaults()
     
+    header_panel, menu_panel, menu_prompt = _main_menu()
+
     # Only show header if we're clearing (standalone mode)
     if clear_on_start:
-        console.print(Panel("[bold cyan]Interactive Credential Setup[/bold cyan]", title="--- API Key Proxy ---", expand=False))
+        console.print(header_panel)
     
     while True:
         # Clear screen between menu selections for cleaner UX
         clear_screen()
-        console.print(Panel("[bold cyan]Interactive Credential Setup[/bold cyan]", title="--- API Key Proxy ---", expand=False))
-        
-        console.print(Panel(
-            Text.from_markup(
-                "1. Add OAuth Credential\n"
-                "2. Add API Key\n"
-                "3. Export Credentials"
-            ),
-            title="Choose credential type",
-            style="bold blue"
-        ))
+        console.print(header_panel)
+        console.print(menu_panel)
 
         setup_type = Prompt.ask(
-            Text.from_markup("[bold]Please select an option or type [red]'q'[/red] to quit[/bold]"),
+            menu_prompt,
             choices=["1", "2", "3", "q"],
             show_choices=False
         )
@@ -1228,7 +1056,7 @@ async def main(clear_on_start=True):
 
             choice = Prompt.ask(
                 Text.from_markup("[bold]Please select a provider or type [red]'b'[/red] to go back[/bold]"),
-                choices=[str(i + 1) for i in range(len(available_providers))] + ["b"],
+                choices=_choices(len(available_providers)),
                 show_choices=False
             )
 
@@ -1244,7 +1072,7 @@ async def main(clear_on_start=True):
                     await setup_new_credential(provider_name)
                     # Don't clear after OAuth - user needs to see full flow
                     console.print("\n[dim]Press Enter to return to main menu...[/dim]")
-                    input()
+                    await asyncio.to_thread(input)
                 else:
                     console.print("[bold red]Invalid choice. Please try again.[/bold red]")
                     await asyncio.sleep(1.5)
@@ -1267,10 +1095,11 @@ def run_credential_tool(from_launcher=False):
     Args:
         from_launcher: If True, skip loading screen (launcher already showed it)
     """
+    console, _, _, _ = _ui()
     # Check if we need to show loading screen
     if not from_launcher:
         # Standalone mode - show full loading UI
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
         
         _start_time = time.time()
         
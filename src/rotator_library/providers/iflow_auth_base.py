@@ -1,63 +1,163 @@
 # src/rotator_library/providers/iflow_auth_base.py
 
-import json
+import copy
 import time
 import asyncio
 import logging
+import mmap
 import os
+import stat
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Tuple, Union, Optional
+from typing import Dict, Any, NamedTuple, Tuple, Union, Optional
 import httpx
+import orjson
 
 
 lib_logger = logging.getLogger("rotator_library")
 
+# Read once at import; set IFLOW_BASE_URL before the library is loaded to point elsewhere
+IFLOW_API_BASE = os.getenv("IFLOW_BASE_URL", "https://api.kilocode.ai/v1")
+
+
+class IFlowCreds(NamedTuple):
+    """A parsed credential file with the fields the hot paths read extracted up front."""
+    access_token: str
+    email: Optional[str]
+    raw: Dict[str, Any]
+
+
+# Parsed credential files keyed by path: {path: (st_mtime_ns, IFlowCreds)}
+_CREDS_CACHE: Dict[str, Tuple[int, IFlowCreds]] = {}
+# get_api_details results for credential files: {path: (st_mtime_ns, (base_url, access_token))}
+_API_DETAILS_CACHE: Dict[str, Tuple[int, Tuple[str, str]]] = {}
+# Per-path locks so a cold cache is filled by one read, not one per waiting coroutine
+_LOAD_LOCKS: Dict[str, asyncio.Lock] = {}
+# Credential files at least this large are mmapped; below it, mapping costs more than a read copies
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _parse_creds_file(path: str, size: int) -> Dict[str, Any]:
+    """Blocking read + parse; large files are parsed straight from an mmap instead of a bytes copy."""
+    if size < _MMAP_THRESHOLD:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _creds_email(creds: Dict[str, Any]) -> Optional[str]:
+    metadata = creds.get("_proxy_metadata")
+    return (metadata.get("email") if metadata else None) or creds.get("email")
+
+
+@lru_cache(maxsize=1024)
+def _canonical_path(path: str) -> str:
+    """
+    Resolved absolute path used as the cache key, so one file is one entry however
+    callers spell it. Memoized since realpath lstat()s every component.
+    """
+    return os.path.realpath(path)
+
+
+async def _load_creds(path: str) -> IFlowCreds:
+    """
+    Load a credential file, reusing the parsed record while the file's mtime is unchanged.
+    On a miss the file is read in a worker thread so the event loop isn't blocked.
+    The returned record's raw dict is shared with the cache and must not be modified.
+    """
+    path = _canonical_path(path)
+    st = os.stat(path)
+    mtime_ns = st.st_mtime_ns
+    cached = _CREDS_CACHE.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    # Single-flight: concurrent misses for one path wait for the first reader
+    async with _LOAD_LOCKS.setdefault(path, asyncio.Lock()):
+        cached = _CREDS_CACHE.get(path)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        raw = await asyncio.to_thread(_parse_creds_file, path, st.st_size)
+        creds = IFlowCreds(raw.get("access_token", ""), _creds_email(raw), raw)
+        _CREDS_CACHE[path] = (mtime_ns, creds)
+        return creds
+
+
+def _token_details(token: str) -> Tuple[str, str]:
+    """(base_url, token) for raw API keys."""
+    return IFLOW_API_BASE, token
+
+
+def _looks_like_path(identifier: str) -> bool:
+    """Cheap pre-check before os.path.isfile: credential files always contain a separator or '.'."""
+    return len(identifier) < 4096 and ("/" in identifier or "\\" in identifier or "." in identifier)
+
 
 class IFlowAuthBase:
-    def __init__(self):
-        pass
+    # Stateless: everything cached lives at module level, so instances need no __dict__
+    __slots__ = ()
+
+    async def _resolve_creds(self, creds_or_path: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """Credential dict for either a file path (loaded via the cache) or an in-memory dict."""
+        if isinstance(creds_or_path, str):
+            return (await _load_creds(creds_or_path)).raw
+        return creds_or_path
 
     async def initialize_token(self, creds_or_path: Union[Dict[str, Any], str]) -> Dict[str, Any]:
         """
         Initialize OAuth token for iFlow provider.
         """
         lib_logger.info("Initializing iFlow OAuth token")
-        if isinstance(creds_or_path, str):
-            # Load from file if path provided
-            with open(creds_or_path, 'r') as f:
-                creds = json.load(f)
-        else:
-            creds = creds_or_path
-        
-        return creds
+        creds = await self._resolve_creds(creds_or_path)
+        # File-loaded creds are shared with the cache; callers may update and save theirs
+        return creds if creds is creds_or_path else copy.deepcopy(creds)
 
     async def get_api_details(self, credential_identifier: str) -> Tuple[str, str]:
         """
         Returns the API base URL and access token for iFlow.
+        Callers that already know whether they hold a path or a token can use
+        get_api_details_from_path / get_api_details_from_token directly.
         """
-        # Implementation would go here
-        if os.path.isfile(credential_identifier):
-            lib_logger.debug(f"Using OAuth credentials from file: {credential_identifier}")
-            base_url = "https://api.kilocode.ai/v1"
-            # Load and return access token from file
-            with open(credential_identifier, 'r') as f:
-                creds = json.load(f)
-            access_token = creds.get("access_token", "")
-        else:
-            base_url = "https://api.kilocode.ai/v1"
-            access_token = credential_identifier
-            
-        return base_url, access_token
+        # Only stat identifiers that could be a path; bare API keys skip the syscall
+        if _looks_like_path(credential_identifier):
+            try:
+                st = os.stat(credential_identifier)
+            except OSError:
+                st = None
+            if st is not None and stat.S_ISREG(st.st_mode):
+                return await self._api_details_for_file(credential_identifier, st)
+
+        return _token_details(credential_identifier)
+
+    async def get_api_details_from_path(self, path: str) -> Tuple[str, str]:
+        """API base URL and access token from an OAuth credential file."""
+        return await self._api_details_for_file(path, os.stat(path))
+
+    async def get_api_details_from_token(self, token: str) -> Tuple[str, str]:
+        """API base URL paired with a raw API key/token."""
+        return _token_details(token)
+
+    async def _api_details_for_file(self, path: str, st: os.stat_result) -> Tuple[str, str]:
+        path = _canonical_path(path)
+        cached = _API_DETAILS_CACHE.get(path)
+        if cached and cached[0] == st.st_mtime_ns:
+            return cached[1]
+        lib_logger.debug("Using OAuth credentials from file: %s", path)
+        # Load and return access token from file
+        creds = await _load_creds(path)
+        details = (IFLOW_API_BASE, creds.access_token)
+        _API_DETAILS_CACHE[path] = (st.st_mtime_ns, details)
+        return details
 
     async def get_user_info(self, creds_or_path: Union[Dict[str, Any], str]) -> Dict[str, Any]:
         """
         Retrieves user info for the iFlow provider.
         """
         if isinstance(creds_or_path, str):
-            with open(creds_or_path, 'r') as f:
-                creds = json.load(f)
-        else:
-            creds = creds_or_path
-            
-        email = creds.get("_proxy_metadata", {}).get("email") or creds.get("email")
-        return {"email": email}
+            return {"email": (await _load_creds(creds_or_path)).email}
+        return self.user_info_from_creds(creds_or_path)
+
+    @staticmethod
+    def user_info_from_creds(creds: Dict[str, Any]) -> Dict[str, Any]:
+        """Synchronous get_user_info for callers already holding the credential dict."""
+        return {"email": _creds_email(creds)}
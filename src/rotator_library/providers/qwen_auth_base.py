@@ -3,18 +3,21 @@
 import secrets
 import hashlib
 import base64
-import json
 import time
 import asyncio
 import logging
 import webbrowser
 import os
+from urllib.parse import urlencode
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Tuple, Union, Optional
+from typing import Dict, Any, Iterable, List, Tuple, Union, Optional
 import tempfile
-import shutil
 
 import httpx
+import orjson
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
@@ -31,40 +34,142 @@ CLIENT_ID = (
 )
 SCOPE = "openid profile email model.completion"
 TOKEN_ENDPOINT = "https://chat.qwen.ai/api/v1/oauth2/token"
+DEFAULT_API_BASE = "https://portal.qwen.ai/v1"
 REFRESH_EXPIRY_BUFFER_SECONDS = 3 * 60 * 60  # 3 hours buffer before expiry
+PROACTIVE_REFRESH_LEAD_SECONDS = 6 * 60  # Background refresh starts this long before the deadline
+CREDENTIALS_CACHE_MAX_ENTRIES = 256  # Least recently used credentials are evicted (and re-read) past this
+HARD_EXPIRY_MARGIN_SECONDS = 60  # Inside this margin of true expiry, requests wait for the refresh
+MIN_BACKGROUND_REFRESH_INTERVAL_SECONDS = 5 * 60  # Background refreshes of one credential are at least this far apart
+REFRESH_MANY_CONCURRENCY = 8  # Max simultaneous token requests issued by refresh_many()
+LAST_CHECK_SAVE_INTERVAL_SECONDS = 60  # get_user_info persists last_check_timestamp at most this often
+BACKOFF_RETENTION_SECONDS = 60 * 60  # Failure/backoff state is dropped this long after the backoff ends
+
+# Wait before each retry of a failed refresh (5xx / network errors); one entry per attempt
+_RETRY_BACKOFFS: Tuple[int, ...] = (1, 2, 4)
+
+# Device-code polling (RFC 8628): the first poll waits at least the initial delay, then the
+# interval stretches on authorization_pending and grows by 5s on slow_down, up to these caps
+DEVICE_POLL_MIN_INITIAL_DELAY = 3.0
+DEVICE_POLL_MAX_PENDING_INTERVAL = 10.0
+DEVICE_POLL_MAX_SLOW_DOWN_INTERVAL = 15.0
+DEVICE_CODE_REUSE_MARGIN_SECONDS = 30  # An unused device code is reused while it has this much life left
+
+# Headers for every request to the Qwen OAuth endpoints
+TOKEN_REQUEST_HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded",
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+}
+
+# Keep-alive pool for token refreshes and the device flow, so each call skips the DNS + TLS handshake
+_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0
+)
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+_http_client: Optional[httpx.AsyncClient] = None
 
 console = Console()
 
+# Instructions shown in the device-flow panel (constant, so built once)
+_AUTH_STEPS_MARKUP = (
+    "1. Visit the URL below to sign in.\n"
+    "2. [bold]Copy your email[/bold] or another unique identifier and authorize the application.\n"
+    "3. You will be prompted to enter your identifier after authorization."
+)
+_AUTH_PANEL_TEXT = Text.from_markup(_AUTH_STEPS_MARKUP)
+_HEADLESS_AUTH_PANEL_TEXT = Text.from_markup(
+    "Running in headless environment (no GUI detected).\n"
+    "Please open the URL below in a browser on another machine to authorize:\n"
+    + _AUTH_STEPS_MARKUP
+)
+
+# Credential directories already created/verified by _save_creds_sync
+_verified_dirs: set = set()
+
+
+def _refresh_deadline(creds: Dict[str, Any]) -> float:
+    """Unix time after which creds should be refreshed (expiry minus the safety buffer)."""
+    return creds.get("expiry_date", 0) / 1000 - REFRESH_EXPIRY_BUFFER_SECONDS
+
+
+@lru_cache(maxsize=1024)
+def _env_credential_index(path: str) -> Optional[str]:
+    """Credential index of an env:// path ("env://provider/<index>"), or None for other paths."""
+    if not path.startswith("env://"):
+        return None
+    # Index is the segment after the provider; find() avoids building a list per parse
+    start = path.find("/", 6)
+    if start == -1:
+        return "0"
+    end = path.find("/", start + 1)
+    return path[start + 1 :] if end == -1 else path[start + 1 : end]
+
+
+def _base_url(creds: Dict[str, Any]) -> str:
+    """API base URL for creds, defaulting to the portal and adding a missing scheme."""
+    base_url = creds.get("resource_url") or DEFAULT_API_BASE
+    if not base_url.startswith("http"):
+        base_url = f"https://{base_url}"
+    return base_url
+
+
+def _generate_pkce_pair() -> Tuple[str, str]:
+    """Fresh PKCE (code_verifier, S256 code_challenge) pair."""
+    code_verifier = (
+        base64.urlsafe_b64encode(secrets.token_bytes(32)).decode("ascii").rstrip("=")
+    )
+    code_challenge = (
+        base64.urlsafe_b64encode(hashlib.sha256(code_verifier.encode("ascii")).digest())
+        .decode("ascii")
+        .rstrip("=")
+    )
+    return code_verifier, code_challenge
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Process-wide AsyncClient for OAuth calls, created on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared OAuth client; call on shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class QwenAuthBase:
     def __init__(self):
-        self._credentials_cache: Dict[str, Dict[str, Any]] = {}
-        self._refresh_locks: Dict[str, asyncio.Lock] = {}
-        self._locks_lock = (
-            asyncio.Lock()
-        )  # Protects the locks dict from race conditions
+        # LRU-ordered; capped at CREDENTIALS_CACHE_MAX_ENTRIES so stray paths can't grow it forever
+        self._credentials_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Hot view per cached credential: (base_url, access_token, refresh deadline in Unix seconds),
+        # rebuilt whenever the cache entry is written so get_api_details does one lookup + compare
+        self._hot: Dict[str, Tuple[str, Optional[str], float]] = {}
+        # [PROACTIVE REFRESH] Timer per credential that queues a refresh shortly before its deadline
+        self._refresh_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._background_tasks: set = set()  # Strong refs so timer-spawned tasks aren't GC'd
+        # [COALESCED REFRESH] One in-flight refresh task per credential; concurrent callers await it.
+        # Tasks remove their own entry when they finish, so this only holds running refreshes
+        self._inflight_refresh: Dict[str, asyncio.Task] = {}
+        # Env credentials per index (None when the vars are absent), read once per process
+        self._env_creds_snapshot: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Per credential path: (dev_data, code_verifier, expires_at) of its last device code not
+        # yet used or rejected. Keyed by path so a late approval can't land in another account's file
+        self._device_codes: Dict[str, Tuple[Dict[str, Any], str, float]] = {}
         # [BACKOFF TRACKING] Track consecutive failures per credential
         self._refresh_failures: Dict[
             str, int
         ] = {}  # Track consecutive failures per credential
+        # Unix time of the last successful refresh, so background refreshes can't run back to back
+        self._last_refreshed: Dict[str, float] = {}
         self._next_refresh_after: Dict[
             str, float
         ] = {}  # Track backoff timers (Unix timestamp)
 
-        # [QUEUE SYSTEM] Sequential refresh processing
-        self._refresh_queue: asyncio.Queue = asyncio.Queue()
-        self._queued_credentials: set = set()  # Track credentials already in queue
-        # [FIX PR#34] Changed from set to dict mapping credential path to timestamp
-        # This enables TTL-based stale entry cleanup as defense in depth
-        self._unavailable_credentials: Dict[
-            str, float
-        ] = {}  # Maps credential path -> timestamp when marked unavailable
-        self._unavailable_ttl_seconds: int = 300  # 5 minutes TTL for stale entries
-        self._queue_tracking_lock = asyncio.Lock()  # Protects queue sets
-        self._queue_processor_task: Optional[asyncio.Task] = (
-            None  # Background worker task
-        )
-
     def _parse_env_credential_path(self, path: str) -> Optional[str]:
         """
         Parse a virtual env:// path and return the credential index.
@@ -76,19 +181,14 @@ class QwenAuthBase:
         Returns:
             The credential index as string, or None if path is not an env:// path
         """
-        if not path.startswith("env://"):
-            return None
-
-        parts = path[6:].split("/")
-        if len(parts) >= 2:
-            return parts[1]
-        return "0"
+        return _env_credential_index(path)
 
     def _load_from_env(
         self, credential_index: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Load OAuth credentials from environment variables for stateless deployments.
+        The variables are read on first use per index; changing them takes a restart.
 
         Supports two formats:
         1. Legacy (credential_index="0" or None): QWEN_CODE_ACCESS_TOKEN
@@ -104,6 +204,26 @@ class QwenAuthBase:
         Returns:
             Dict with credential structure if env vars present, None otherwise
         """
+        # Environment variables don't change while the process runs, so read them once per index.
+        # Callers mutate the returned creds on refresh, so hand out a fresh copy each time.
+        index_key = credential_index or "0"
+        if index_key not in self._env_creds_snapshot:
+            self._env_creds_snapshot[index_key] = self._read_env_creds(credential_index)
+        snapshot = self._env_creds_snapshot[index_key]
+        if snapshot is None:
+            return None
+        return {
+            **snapshot,
+            "_proxy_metadata": {
+                **snapshot["_proxy_metadata"],
+                "last_check_timestamp": time.time(),
+            },
+        }
+
+    def _read_env_creds(
+        self, credential_index: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Build env credentials for one index straight from os.environ (see _load_from_env)."""
         # Determine the env var prefix based on credential index
         if credential_index and credential_index != "0":
             prefix = f"QWEN_CODE_{credential_index}"
@@ -138,7 +258,7 @@ class QwenAuthBase:
             "refresh_token": refresh_token,
             "expiry_date": expiry_date,
             "resource_url": os.getenv(
-                f"{prefix}_RESOURCE_URL", "https://portal.qwen.ai/v1"
+                f"{prefix}_RESOURCE_URL", DEFAULT_API_BASE
             ),
             "_proxy_metadata": {
                 "email": os.getenv(f"{prefix}_EMAIL", default_email),
@@ -150,13 +270,22 @@ class QwenAuthBase:
 
         return creds
 
+    @staticmethod
+    def _read_creds_sync(path: str) -> Dict[str, Any]:
+        """Blocking read + parse; run via asyncio.to_thread."""
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
     async def _read_creds_from_file(self, path: str) -> Dict[str, Any]:
-        """Reads credentials from file and populates the cache. No locking."""
+        """Reads credentials from file (off the event loop) and populates the cache. No locking."""
         try:
             lib_logger.debug(f"Reading Qwen credentials from file: {path}")
-            with open(path, "r") as f:
-                creds = json.load(f)
-            self._credentials_cache[path] = creds
+            creds = await asyncio.to_thread(self._read_creds_sync, path)
+            # Another coroutine may have cached (or refreshed) this path while we read; keep theirs
+            cached = self._credentials_cache.get(path)
+            if cached is not None:
+                return cached
+            self._cache_credentials(path, creds)
             return creds
         except FileNotFoundError:
             raise IOError(f"Qwen OAuth credential file not found at '{path}'")
@@ -165,65 +294,83 @@ class QwenAuthBase:
 
     async def _load_credentials(self, path: str) -> Dict[str, Any]:
         """Loads credentials from cache, environment variables, or file."""
-        if path in self._credentials_cache:
-            return self._credentials_cache[path]
-
-        async with await self._get_lock(path):
-            # Re-check cache after acquiring lock
-            if path in self._credentials_cache:
-                return self._credentials_cache[path]
-
-            # Check if this is a virtual env:// path
-            credential_index = self._parse_env_credential_path(path)
-            if credential_index is not None:
-                env_creds = self._load_from_env(credential_index)
-                if env_creds:
-                    lib_logger.info(
-                        f"Using Qwen Code credentials from environment variables (index: {credential_index})"
-                    )
-                    self._credentials_cache[path] = env_creds
-                    return env_creds
-                else:
-                    raise IOError(
-                        f"Environment variables for Qwen Code credential index {credential_index} not found"
-                    )
-
-            # For file paths, try loading from legacy env vars first
-            env_creds = self._load_from_env()
+        cached = self._credentials_cache.get(path)
+        if cached is not None:
+            self._credentials_cache.move_to_end(path)
+            return cached
+
+        # Check if this is a virtual env:// path
+        credential_index = self._parse_env_credential_path(path)
+        if credential_index is not None:
+            env_creds = self._load_from_env(credential_index)
             if env_creds:
                 lib_logger.info(
-                    "Using Qwen Code credentials from environment variables"
+                    f"Using Qwen Code credentials from environment variables (index: {credential_index})"
                 )
-                self._credentials_cache[path] = env_creds
+                self._cache_credentials(path, env_creds)
                 return env_creds
+            else:
+                raise IOError(
+                    f"Environment variables for Qwen Code credential index {credential_index} not found"
+                )
+
+        # For file paths, try loading from legacy env vars first
+        env_creds = self._load_from_env()
+        if env_creds:
+            lib_logger.info(
+                "Using Qwen Code credentials from environment variables"
+            )
+            self._cache_credentials(path, env_creds)
+            return env_creds
 
-            # Fall back to file-based loading
-            return await self._read_creds_from_file(path)
+        # Fall back to file-based loading
+        return await self._read_creds_from_file(path)
 
     async def _save_credentials(self, path: str, creds: Dict[str, Any]):
         # Don't save to file if credentials were loaded from environment
         if creds.get("_proxy_metadata", {}).get("loaded_from_env"):
             lib_logger.debug("Credentials loaded from env, skipping file save")
             # Still update cache for in-memory consistency
-            self._credentials_cache[path] = creds
+            self._cache_credentials(path, creds)
             return
 
+        # Serialize on the loop thread so the dict can't change mid-dump; the disk work runs in a thread
+        data = orjson.dumps(creds, option=orjson.OPT_INDENT_2)
+        try:
+            await asyncio.to_thread(self._save_creds_sync, path, data)
+        except Exception as e:
+            lib_logger.error(
+                f"Failed to save updated Qwen OAuth credentials to '{path}': {e}"
+            )
+            raise
+
+        # Update cache AFTER successful file write
+        self._cache_credentials(path, creds)
+        lib_logger.debug(
+            f"Saved updated Qwen OAuth credentials to '{path}' (atomic write)."
+        )
+
+    @staticmethod
+    def _save_creds_sync(path: str, data: bytes):
+        """Blocking atomic write of serialized credentials; run via asyncio.to_thread."""
         # [ATOMIC WRITE] Use tempfile + move pattern to ensure atomic writes
         parent_dir = os.path.dirname(os.path.abspath(path))
-        os.makedirs(parent_dir, exist_ok=True)
+        if parent_dir not in _verified_dirs:
+            os.makedirs(parent_dir, exist_ok=True)
+            _verified_dirs.add(parent_dir)
 
         tmp_fd = None
         tmp_path = None
         try:
             # Create temp file in same directory as target (ensures same filesystem)
             tmp_fd, tmp_path = tempfile.mkstemp(
-                dir=parent_dir, prefix=".tmp_", suffix=".json", text=True
+                dir=parent_dir, prefix=".tmp_", suffix=".json"
             )
 
             # Write JSON to temp file
-            with os.fdopen(tmp_fd, "w") as f:
-                json.dump(creds, f, indent=2)
-                tmp_fd = None  # fdopen closes the fd
+            with os.fdopen(tmp_fd, "wb") as f:
+                tmp_fd = None  # fdopen owns (and closes) the fd from here
+                f.write(data)
 
             # Set secure permissions (0600 = owner read/write only)
             try:
@@ -232,20 +379,11 @@ class QwenAuthBase:
                 # Windows may not support chmod, ignore
                 pass
 
-            # Atomic move (overwrites target if it exists)
-            shutil.move(tmp_path, path)
+            # Atomic rename (overwrites target if it exists); mkstemp put tmp_path on the same filesystem
+            os.replace(tmp_path, path)
             tmp_path = None  # Successfully moved
 
-            # Update cache AFTER successful file write
-            self._credentials_cache[path] = creds
-            lib_logger.debug(
-                f"Saved updated Qwen OAuth credentials to '{path}' (atomic write)."
-            )
-
-        except Exception as e:
-            lib_logger.error(
-                f"Failed to save updated Qwen OAuth credentials to '{path}': {e}"
-            )
+        except Exception:
             # Clean up temp file if it still exists
             if tmp_fd is not None:
                 try:
@@ -259,21 +397,107 @@ class QwenAuthBase:
                     pass
             raise
 
+    def _cache_credentials(self, path: str, creds: Dict[str, Any]):
+        """Store creds in the cache along with their precomputed refresh deadline."""
+        self._credentials_cache[path] = creds
+        self._credentials_cache.move_to_end(path)
+        deadline = _refresh_deadline(creds)
+        self._hot[path] = (_base_url(creds), creds.get("access_token"), deadline)
+        self._schedule_proactive_refresh(path, deadline)
+        while len(self._credentials_cache) > CREDENTIALS_CACHE_MAX_ENTRIES:
+            self._evict_credentials(next(iter(self._credentials_cache)))
+
+    def _evict_credentials(self, path: str):
+        """Drop a credential from the cache along with its deadline and refresh timer."""
+        self._credentials_cache.pop(path, None)
+        self._hot.pop(path, None)
+        self._last_refreshed.pop(path, None)
+        timer = self._refresh_timers.pop(path, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _record_refresh_failure(self, path: str) -> int:
+        """[BACKOFF TRACKING] Count a failed refresh and start its backoff; returns the backoff in seconds."""
+        now = time.time()
+        # Forget credentials whose backoff ended long ago, so one-off paths don't accumulate
+        stale_before = now - BACKOFF_RETENTION_SECONDS
+        for stale_path in [
+            p for p, until in self._next_refresh_after.items() if until < stale_before
+        ]:
+            self._next_refresh_after.pop(stale_path, None)
+            self._refresh_failures.pop(stale_path, None)
+
+        self._refresh_failures[path] = self._refresh_failures.get(path, 0) + 1
+        backoff_seconds = min(
+            300, 30 * (2 ** self._refresh_failures[path])
+        )  # Max 5 min backoff
+        self._next_refresh_after[path] = now + backoff_seconds
+        lib_logger.debug(
+            f"Setting backoff for '{Path(path).name}': {backoff_seconds}s"
+        )
+        return backoff_seconds
+
+    def _schedule_proactive_refresh(self, path: str, deadline: float):
+        """(Re)arm the timer that queues a background refresh before the token hits its deadline."""
+        timer = self._refresh_timers.pop(path, None)
+        if timer is not None:
+            timer.cancel()
+        delay = deadline - time.time() - PROACTIVE_REFRESH_LEAD_SECONDS
+        if delay <= 0:
+            # Already inside the lead window (e.g. a token that lives shorter than the buffer,
+            # or env creds without an expiry): a timer would fire, refresh, land here again
+            # and loop. Leave it to the request path, which refreshes on demand.
+            return
+        self._refresh_timers[path] = asyncio.get_running_loop().call_later(
+            delay, self._on_refresh_timer, path
+        )
+
+    def _on_refresh_timer(self, path: str):
+        self._refresh_timers.pop(path, None)
+        # force: the token is still inside its deadline, so a plain refresh would be a no-op
+        self._spawn_background_refresh(path, force=True)
+
+    def _spawn_background_refresh(self, path: str, force: bool = False):
+        """Fire-and-forget _queue_refresh, holding a strong ref until it completes."""
+        task = asyncio.create_task(self._queue_refresh(path, force=force))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     def _is_token_expired(self, creds: Dict[str, Any]) -> bool:
-        expiry_timestamp = creds.get("expiry_date", 0) / 1000
-        return expiry_timestamp < time.time() + REFRESH_EXPIRY_BUFFER_SECONDS
+        return time.time() >= _refresh_deadline(creds)
+
+    def _is_path_expired(self, path: str) -> bool:
+        """_is_token_expired for a cached credential, using its precomputed deadline."""
+        hot = self._hot.get(path)
+        return hot is None or time.time() >= hot[2]
 
     async def _refresh_token(self, path: str, force: bool = False) -> Dict[str, Any]:
-        async with await self._get_lock(path):
-            cached_creds = self._credentials_cache.get(path)
-            if not force and cached_creds and not self._is_token_expired(cached_creds):
-                return cached_creds
+        cached_creds = self._credentials_cache.get(path)
+        if not force and cached_creds and not self._is_path_expired(path):
+            return cached_creds
 
-            # If cache is empty, read from file. This is safe because we hold the lock.
-            if path not in self._credentials_cache:
-                await self._read_creds_from_file(path)
+        # shield: a cancelled caller must not cancel the refresh other callers are waiting on
+        return await asyncio.shield(self._start_refresh(path))
 
-            creds_from_file = self._credentials_cache[path]
+    def _start_refresh(self, path: str) -> asyncio.Task:
+        """
+        [COALESCED REFRESH] Return the in-flight refresh task for path, starting one if needed.
+        Check-and-insert has no await in between, so no lock is needed; the task removes
+        its own entry when it finishes.
+        """
+        task = self._inflight_refresh.get(path)
+        if task is None:
+            task = asyncio.create_task(self._do_refresh_token(path))
+            self._inflight_refresh[path] = task
+        return task
+
+    async def _do_refresh_token(self, path: str) -> Dict[str, Any]:
+        """Performs the HTTP refresh for one credential. Run only via _refresh_token."""
+        try:
+            # If cache is empty, read from file. Only this task refreshes this path.
+            creds_from_file = self._credentials_cache.get(path)
+            if creds_from_file is None:
+                creds_from_file = await self._read_creds_from_file(path)
 
             lib_logger.debug(f"Refreshing Qwen OAuth token for '{Path(path).name}'...")
             refresh_token = creds_from_file.get("refresh_token")
@@ -282,93 +506,97 @@ class QwenAuthBase:
                 raise ValueError("No refresh_token found in Qwen credentials file.")
 
             # [RETRY LOGIC] Implement exponential backoff for transient errors
-            max_retries = 3
+            max_retries = len(_RETRY_BACKOFFS)
             new_token_data = None
             last_error = None
             needs_reauth = False
 
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Accept": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            }
+            client = _get_http_client()
+            for attempt in range(max_retries):
+                try:
+                    response = await client.post(
+                        TOKEN_ENDPOINT,
+                        headers=TOKEN_REQUEST_HEADERS,
+                        data={
+                            "grant_type": "refresh_token",
+                            "refresh_token": refresh_token,
+                            "client_id": CLIENT_ID,
+                        },
+                    )
+                    response.raise_for_status()
+                    new_token_data = orjson.loads(response.content)
+                    break  # Success
+
+                except httpx.HTTPStatusError as e:
+                    last_error = e
+                    status_code = e.response.status_code
+                    error_body = e.response.text
+                    lib_logger.error(
+                        f"HTTP {status_code} for '{Path(path).name}': {error_body}"
+                    )
 
-            async with httpx.AsyncClient() as client:
-                for attempt in range(max_retries):
-                    try:
-                        response = await client.post(
-                            TOKEN_ENDPOINT,
-                            headers=headers,
-                            data={
-                                "grant_type": "refresh_token",
-                                "refresh_token": refresh_token,
-                                "client_id": CLIENT_ID,
-                            },
-                            timeout=30.0,
-                        )
-                        response.raise_for_status()
-                        new_token_data = response.json()
-                        break  # Success
-
-                    except httpx.HTTPStatusError as e:
-                        last_error = e
-                        status_code = e.response.status_code
-                        error_body = e.response.text
-                        lib_logger.error(
-                            f"HTTP {status_code} for '{Path(path).name}': {error_body}"
+                    # [INVALID GRANT HANDLING] Handle 401/403 by triggering re-authentication
+                    if status_code in (401, 403):
+                        lib_logger.warning(
+                            f"Refresh token invalid for '{Path(path).name}' (HTTP {status_code}). "
+                            f"Token may have been revoked or expired. Starting re-authentication..."
                         )
+                        needs_reauth = True
+                        break  # Exit retry loop to trigger re-auth
 
-                        # [INVALID GRANT HANDLING] Handle 401/403 by triggering re-authentication
-                        if status_code in (401, 403):
-                            lib_logger.warning(
-                                f"Refresh token invalid for '{Path(path).name}' (HTTP {status_code}). "
-                                f"Token may have been revoked or expired. Starting re-authentication..."
-                            )
-                            needs_reauth = True
-                            break  # Exit retry loop to trigger re-auth
+                    elif status_code == 429:
+                        retry_after = int(e.response.headers.get("Retry-After", 60))
+                        lib_logger.warning(
+                            "Rate limited (HTTP 429), retry after %ss", retry_after
+                        )
+                        if attempt < max_retries - 1:
+                            await asyncio.sleep(retry_after)
+                            continue
+                        raise
 
-                        elif status_code == 429:
-                            retry_after = int(e.response.headers.get("Retry-After", 60))
-                            lib_logger.warning(
-                                f"Rate limited (HTTP 429), retry after {retry_after}s"
-                            )
-                            if attempt < max_retries - 1:
-                                await asyncio.sleep(retry_after)
-                                continue
-                            raise
-
-                        elif 500 <= status_code < 600:
-                            if attempt < max_retries - 1:
-                                wait_time = 2**attempt
-                                lib_logger.warning(
-                                    f"Server error (HTTP {status_code}), retry {attempt + 1}/{max_retries} in {wait_time}s"
-                                )
-                                await asyncio.sleep(wait_time)
-                                continue
-                            raise
-
-                        else:
-                            raise
-
-                    except (httpx.RequestError, httpx.TimeoutException) as e:
-                        last_error = e
+                    elif 500 <= status_code < 600:
                         if attempt < max_retries - 1:
-                            wait_time = 2**attempt
+                            wait_time = _RETRY_BACKOFFS[attempt]
                             lib_logger.warning(
-                                f"Network error during refresh: {e}, retry {attempt + 1}/{max_retries} in {wait_time}s"
+                                "Server error (HTTP %s), retry %s/%s in %ss",
+                                status_code,
+                                attempt + 1,
+                                max_retries,
+                                wait_time,
                             )
                             await asyncio.sleep(wait_time)
                             continue
                         raise
 
+                    else:
+                        raise
+
+                except (httpx.RequestError, httpx.TimeoutException) as e:
+                    last_error = e
+                    if attempt < max_retries - 1:
+                        wait_time = _RETRY_BACKOFFS[attempt]
+                        lib_logger.warning(
+                            "Network error during refresh: %s, retry %s/%s in %ss",
+                            e,
+                            attempt + 1,
+                            max_retries,
+                            wait_time,
+                        )
+                        await asyncio.sleep(wait_time)
+                        continue
+                    raise
+
             # [INVALID GRANT RE-AUTH] Trigger OAuth flow if refresh token is invalid
             if needs_reauth:
                 lib_logger.info(
                     f"Starting re-authentication for '{Path(path).name}'..."
                 )
                 try:
-                    # Call initialize_token to trigger OAuth flow
-                    new_creds = await self.initialize_token(path)
+                    # Go straight to the interactive flow: initialize_token would try
+                    # another refresh and end up awaiting this very task
+                    new_creds = await self._run_interactive_reauth(
+                        path, creds_from_file, Path(path).name
+                    )
                     # Clear backoff on successful re-auth
                     self._refresh_failures.pop(path, None)
                     self._next_refresh_after.pop(path, None)
@@ -377,31 +605,13 @@ class QwenAuthBase:
                     lib_logger.error(
                         f"Re-authentication failed for '{Path(path).name}': {reauth_error}"
                     )
-                    # [BACKOFF TRACKING] Increment failure count and set backoff timer
-                    self._refresh_failures[path] = (
-                        self._refresh_failures.get(path, 0) + 1
-                    )
-                    backoff_seconds = min(
-                        300, 30 * (2 ** self._refresh_failures[path])
-                    )  # Max 5 min backoff
-                    self._next_refresh_after[path] = time.time() + backoff_seconds
-                    lib_logger.debug(
-                        f"Setting backoff for '{Path(path).name}': {backoff_seconds}s"
-                    )
+                    self._record_refresh_failure(path)
                     raise ValueError(
                         f"Refresh token invalid and re-authentication failed: {reauth_error}"
                     )
 
             if new_token_data is None:
-                # [BACKOFF TRACKING] Increment failure count and set backoff timer
-                self._refresh_failures[path] = self._refresh_failures.get(path, 0) + 1
-                backoff_seconds = min(
-                    300, 30 * (2 ** self._refresh_failures[path])
-                )  # Max 5 min backoff
-                self._next_refresh_after[path] = time.time() + backoff_seconds
-                lib_logger.debug(
-                    f"Setting backoff for '{Path(path).name}': {backoff_seconds}s"
-                )
+                self._record_refresh_failure(path)
                 raise last_error or Exception("Token refresh failed after all retries")
 
             creds_from_file["access_token"] = new_token_data["access_token"]
@@ -435,10 +645,13 @@ class QwenAuthBase:
             self._next_refresh_after.pop(path, None)
 
             await self._save_credentials(path, creds_from_file)
+            self._last_refreshed[path] = time.time()
             lib_logger.debug(
                 f"Successfully refreshed Qwen OAuth token for '{Path(path).name}'."
             )
             return creds_from_file
+        finally:
+            self._inflight_refresh.pop(path, None)
 
     async def get_api_details(self, credential_identifier: str) -> Tuple[str, str]:
         """
@@ -448,25 +661,39 @@ class QwenAuthBase:
         - OAuth: credential_identifier is a file path to JSON credentials
         - API Key: credential_identifier is the API key string itself
         """
-        # Detect credential type
-        if os.path.isfile(credential_identifier):
+        # Fast path: a cached credential inside its deadline is one lookup and one compare
+        hot = self._hot.get(credential_identifier)
+        if hot is not None and hot[1] and time.time() < hot[2]:
+            self._credentials_cache.move_to_end(credential_identifier)
+            return hot[0], hot[1]
+
+        # Detect credential type: cached paths are known OAuth credentials; only probe
+        # the filesystem (off the event loop) for identifiers not seen before
+        if credential_identifier in self._credentials_cache or await asyncio.to_thread(
+            os.path.isfile, credential_identifier
+        ):
             # OAuth credential: file path to JSON
             lib_logger.debug(
                 f"Using OAuth credentials from file: {credential_identifier}"
             )
             creds = await self._load_credentials(credential_identifier)
 
-            if self._is_token_expired(creds):
-                creds = await self._refresh_token(credential_identifier)
+            now = time.time()
+            if self._is_path_expired(credential_identifier):
+                # Past the deadline the token is usually still valid for hours (the buffer is 3h):
+                # keep serving it and refresh in the background. Only wait near true expiry.
+                true_expiry = creds.get("expiry_date", 0) / 1000
+                if true_expiry - now > HARD_EXPIRY_MARGIN_SECONDS:
+                    self._spawn_background_refresh(credential_identifier)
+                else:
+                    creds = await self._refresh_token(credential_identifier)
 
-            base_url = creds.get("resource_url", "https://portal.qwen.ai/v1")
-            if not base_url.startswith("http"):
-                base_url = f"https://{base_url}"
+            base_url = _base_url(creds)
             access_token = creds["access_token"]
         else:
             # Direct API key: use as-is
             lib_logger.debug("Using direct API key for Qwen Code")
-            base_url = "https://portal.qwen.ai/v1"
+            base_url = DEFAULT_API_BASE
             access_token = credential_identifier
 
         return base_url, access_token
@@ -489,7 +716,7 @@ class QwenAuthBase:
             )
             return
 
-        is_expired = self._is_token_expired(creds)
+        is_expired = self._is_path_expired(credential_identifier)
         lib_logger.debug(
             f"Token expired check for '{Path(credential_identifier).name}': {is_expired}"
         )
@@ -503,50 +730,34 @@ class QwenAuthBase:
                 credential_identifier, force=False, needs_reauth=False
             )
 
-    async def _get_lock(self, path: str) -> asyncio.Lock:
-        # [FIX RACE CONDITION] Protect lock creation with a master lock
-        async with self._locks_lock:
-            if path not in self._refresh_locks:
-                self._refresh_locks[path] = asyncio.Lock()
-            return self._refresh_locks[path]
-
-    def is_credential_available(self, path: str) -> bool:
-        """Check if a credential is available for rotation (not queued/refreshing).
+    async def refresh_many(self, paths: Iterable[str]) -> List[Any]:
+        """
+        Refresh every expired credential in paths concurrently, at most
+        REFRESH_MANY_CONCURRENCY at a time. Fresh credentials are returned as-is.
 
-        [FIX PR#34] Now includes TTL-based stale entry cleanup as defense in depth.
-        If a credential has been unavailable for longer than _unavailable_ttl_seconds,
-        it is automatically cleaned up and considered available.
+        Returns one entry per path, in order: the credentials, or the exception raised for it
+        (e.g. IOError for identifiers that aren't OAuth credentials).
         """
-        if path not in self._unavailable_credentials:
-            return True
+        semaphore = asyncio.Semaphore(REFRESH_MANY_CONCURRENCY)
 
-        # [FIX PR#34] Check if the entry is stale (TTL expired)
-        marked_time = self._unavailable_credentials.get(path)
-        if marked_time is not None:
-            now = time.time()
-            if now - marked_time > self._unavailable_ttl_seconds:
-                # Entry is stale - clean it up and return available
-                lib_logger.warning(
-                    f"Credential '{Path(path).name}' was stuck in unavailable state for "
-                    f"{int(now - marked_time)}s (TTL: {self._unavailable_ttl_seconds}s). "
-                    f"Auto-cleaning stale entry."
-                )
-                self._unavailable_credentials.pop(path, None)
-                return True
+        async def _refresh_one(path: str) -> Dict[str, Any]:
+            async with semaphore:
+                await self._load_credentials(path)
+                # Coalesces with any refresh of the same path already in flight
+                return await self._refresh_token(path)
 
-        return False
+        return await asyncio.gather(
+            *(_refresh_one(path) for path in paths), return_exceptions=True
+        )
 
-    async def _ensure_queue_processor_running(self):
-        """Lazily starts the queue processor if not already running."""
-        if self._queue_processor_task is None or self._queue_processor_task.done():
-            self._queue_processor_task = asyncio.create_task(
-                self._process_refresh_queue()
-            )
+    def is_credential_available(self, path: str) -> bool:
+        """Check if a credential is available for rotation (not currently refreshing)."""
+        return path not in self._inflight_refresh
 
     async def _queue_refresh(
         self, path: str, force: bool = False, needs_reauth: bool = False
     ):
-        """Add a credential to the refresh queue if not already queued.
+        """Start a background refresh for a credential unless one is already running.
 
         Args:
             path: Credential file path
@@ -567,108 +778,34 @@ class QwenAuthBase:
                     )
                     return
 
-        async with self._queue_tracking_lock:
-            if path not in self._queued_credentials:
-                self._queued_credentials.add(path)
-                # [FIX PR#34] Store timestamp when marking unavailable (for TTL cleanup)
-                self._unavailable_credentials[path] = time.time()
-                lib_logger.debug(
-                    f"Marked '{Path(path).name}' as unavailable. "
-                    f"Total unavailable: {len(self._unavailable_credentials)}"
-                )
-                await self._refresh_queue.put((path, force, needs_reauth))
-                await self._ensure_queue_processor_running()
-
-    async def _process_refresh_queue(self):
-        """Background worker that processes refresh requests sequentially."""
-        while True:
-            path = None
-            try:
-                # Wait for an item with timeout to allow graceful shutdown
-                try:
-                    path, force, needs_reauth = await asyncio.wait_for(
-                        self._refresh_queue.get(), timeout=60.0
-                    )
-                except asyncio.TimeoutError:
-                    # [FIX PR#34] Clean up any stale unavailable entries before exiting
-                    # If we're idle for 60s, no refreshes are in progress
-                    async with self._queue_tracking_lock:
-                        if self._unavailable_credentials:
-                            stale_count = len(self._unavailable_credentials)
-                            lib_logger.warning(
-                                f"Queue processor idle timeout. Cleaning {stale_count} "
-                                f"stale unavailable credentials: {list(self._unavailable_credentials.keys())}"
-                            )
-                            self._unavailable_credentials.clear()
-                        # [FIX BUG#6] Also clear queued credentials to prevent stuck state
-                        if self._queued_credentials:
-                            lib_logger.debug(
-                                f"Clearing {len(self._queued_credentials)} queued credentials on timeout"
-                            )
-                            self._queued_credentials.clear()
-                    self._queue_processor_task = None
-                    return
+        if path in self._inflight_refresh:
+            return
 
-                try:
-                    # Perform the actual refresh (still using per-credential lock)
-                    async with await self._get_lock(path):
-                        # Re-check if still expired (may have changed since queueing)
-                        creds = self._credentials_cache.get(path)
-                        if creds and not self._is_token_expired(creds):
-                            # No longer expired, mark as available
-                            async with self._queue_tracking_lock:
-                                self._unavailable_credentials.pop(path, None)
-                                lib_logger.debug(
-                                    f"Credential '{Path(path).name}' no longer expired, marked available. "
-                                    f"Remaining unavailable: {len(self._unavailable_credentials)}"
-                                )
-                            continue
+        # Re-check if still expired (may have changed since the caller looked)
+        creds = self._credentials_cache.get(path)
+        if not force and creds and not self._is_path_expired(path):
+            return
+        # A token that lives shorter than the refresh buffer is "expired" again right after
+        # refreshing; don't let every request kick off another refresh
+        if (
+            not force
+            and time.time() - self._last_refreshed.get(path, 0.0)
+            < MIN_BACKGROUND_REFRESH_INTERVAL_SECONDS
+        ):
+            return
+        if not creds:
+            # Loads env:// and file credentials alike; a refresh only re-reads files
+            await self._load_credentials(path)
 
-                        # Perform refresh
-                        if not creds:
-                            creds = await self._load_credentials(path)
-                        await self._refresh_token(path, force=force)
-
-                        # SUCCESS: Mark as available again
-                        async with self._queue_tracking_lock:
-                            self._unavailable_credentials.pop(path, None)
-                            lib_logger.debug(
-                                f"Refresh SUCCESS for '{Path(path).name}', marked available. "
-                                f"Remaining unavailable: {len(self._unavailable_credentials)}"
-                            )
+        task = self._start_refresh(path)
+        task.add_done_callback(self._on_background_refresh_done)
+        lib_logger.debug(f"Started background refresh for '{Path(path).name}'")
 
-                finally:
-                    # [FIX PR#34] Remove from BOTH queued set AND unavailable credentials
-                    # This ensures cleanup happens in ALL exit paths (success, exception, etc.)
-                    async with self._queue_tracking_lock:
-                        self._queued_credentials.discard(path)
-                        # [FIX PR#34] Always clean up unavailable credentials in finally block
-                        self._unavailable_credentials.pop(path, None)
-                        lib_logger.debug(
-                            f"Finally cleanup for '{Path(path).name}'. "
-                            f"Remaining unavailable: {len(self._unavailable_credentials)}"
-                        )
-                    self._refresh_queue.task_done()
-            except asyncio.CancelledError:
-                # [FIX PR#34] Clean up the current credential before breaking
-                if path:
-                    async with self._queue_tracking_lock:
-                        self._unavailable_credentials.pop(path, None)
-                        lib_logger.debug(
-                            f"CancelledError cleanup for '{Path(path).name}'. "
-                            f"Remaining unavailable: {len(self._unavailable_credentials)}"
-                        )
-                break
-            except Exception as e:
-                lib_logger.error(f"Error in queue processor: {e}")
-                # Even on error, mark as available (backoff will prevent immediate retry)
-                if path:
-                    async with self._queue_tracking_lock:
-                        self._unavailable_credentials.pop(path, None)
-                        lib_logger.debug(
-                            f"Error cleanup for '{Path(path).name}': {e}. "
-                            f"Remaining unavailable: {len(self._unavailable_credentials)}"
-                        )
+    @staticmethod
+    def _on_background_refresh_done(task: asyncio.Task):
+        # Retrieve the outcome so a failed background refresh is logged, not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            lib_logger.error(f"Background Qwen token refresh failed: {task.exception()}")
 
     async def _perform_interactive_oauth(
         self, path: str, creds: Dict[str, Any], display_name: str
@@ -690,178 +827,235 @@ class QwenAuthBase:
         # [HEADLESS DETECTION] Check if running in headless environment
         is_headless = is_headless_environment()
 
-        code_verifier = (
-            base64.urlsafe_b64encode(secrets.token_bytes(32))
-            .decode("utf-8")
-            .rstrip("=")
+        # Device-code request and every poll reuse the shared keep-alive pool
+        client = _get_http_client()
+        dev_data, code_verifier, code_expires_at = await self._get_device_code(
+            client, path
         )
-        code_challenge = (
-            base64.urlsafe_b64encode(
-                hashlib.sha256(code_verifier.encode("utf-8")).digest()
+
+        # [ELECTRON SUPPORT] Check if running from Electron app
+        is_electron_mode = os.getenv("ELECTRON_OAUTH_MODE") == "1"
+
+        # [HEADLESS SUPPORT] Display appropriate instructions
+        console.print(
+            Panel(
+                _HEADLESS_AUTH_PANEL_TEXT if is_headless else _AUTH_PANEL_TEXT,
+                title=f"Qwen OAuth Setup for [bold yellow]{display_name}[/bold yellow]",
+                style="bold blue",
             )
-            .decode("utf-8")
-            .rstrip("=")
+        )
+        verification_url = dev_data["verification_uri_complete"]
+        escaped_url = rich_escape(verification_url)
+        console.print(
+            f"[bold]URL:[/bold] [link={verification_url}]{escaped_url}[/link]\n"
         )
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json",
-        }
-        async with httpx.AsyncClient() as client:
-            request_data = {
-                "client_id": CLIENT_ID,
-                "scope": SCOPE,
-                "code_challenge": code_challenge,
-                "code_challenge_method": "S256",
-            }
-            lib_logger.debug(f"Qwen device code request data: {request_data}")
+        # [HEADLESS SUPPORT] Only attempt browser open if NOT headless
+        if is_electron_mode:
+            # Running from Electron - output URL for Electron to capture.
+            # Plain print: rich would style and could wrap the URL across lines
+            print(f"OAUTH_URL:{verification_url}", flush=True)
+            lib_logger.info("Electron mode detected - URL sent to Electron for browser opening")
+        elif not is_headless:
+            # Normal mode - open browser directly
             try:
-                dev_response = await client.post(
-                    "https://chat.qwen.ai/api/v1/oauth2/device/code",
-                    headers=headers,
-                    data=request_data,
-                )
-                dev_response.raise_for_status()
-                dev_data = dev_response.json()
-                lib_logger.debug(f"Qwen device auth response: {dev_data}")
-            except httpx.HTTPStatusError as e:
-                lib_logger.error(
-                    f"Qwen device code request failed with status {e.response.status_code}: {e.response.text}"
-                )
-                raise e
-
-            # [HEADLESS SUPPORT] Display appropriate instructions
-            if is_headless:
-                auth_panel_text = Text.from_markup(
-                    "Running in headless environment (no GUI detected).\n"
-                    "Please open the URL below in a browser on another machine to authorize:\n"
-                    "1. Visit the URL below to sign in.\n"
-                    "2. [bold]Copy your email[/bold] or another unique identifier and authorize the application.\n"
-                    "3. You will be prompted to enter your identifier after authorization."
+                # Spawning the browser can take a while on some platforms; keep the loop free
+                await asyncio.to_thread(webbrowser.open, verification_url)
+                lib_logger.info("Browser opened successfully for Qwen OAuth flow")
+            except Exception as e:
+                lib_logger.warning(
+                    f"Failed to open browser automatically: {e}. Please open the URL manually."
                 )
-            else:
-                auth_panel_text = Text.from_markup(
-                    "1. Visit the URL below to sign in.\n"
-                    "2. [bold]Copy your email[/bold] or another unique identifier and authorize the application.\n"
-                    "3. You will be prompted to enter your identifier after authorization."
+
+        # The spinner repaints from a background thread for the whole wait; only run it
+        # where someone can actually see it
+        if console.is_terminal and not is_electron_mode:
+            status_ctx = console.status(
+                "[bold green]Polling for token, please complete authentication in the browser...[/bold green]",
+                spinner="dots",
+            )
+        else:
+            console.print("Polling for token, please complete authentication in the browser...")
+            status_ctx = nullcontext()
+        try:
+            with status_ctx:
+                token_data = await self._poll_for_token(
+                    client, dev_data, code_verifier, code_expires_at
                 )
+        except (ValueError, httpx.HTTPStatusError):
+            # Denied or rejected: this device code is done for
+            self._device_codes.pop(path, None)
+            raise
+        # Used up (or expired) either way. A flow cancelled mid-poll keeps it for the
+        # next attempt on the same credential
+        self._device_codes.pop(path, None)
+
+        if not token_data:
+            raise TimeoutError("Qwen device flow timed out.")
+
+        creds.update(
+            {
+                "access_token": token_data["access_token"],
+                "refresh_token": token_data.get("refresh_token"),
+                "expiry_date": (time.time() + token_data["expires_in"]) * 1000,
+                "resource_url": token_data.get("resource_url"),
+            }
+        )
 
-            console.print(
-                Panel(
-                    auth_panel_text,
-                    title=f"Qwen OAuth Setup for [bold yellow]{display_name}[/bold yellow]",
-                    style="bold blue",
+        # Prompt for user identifier and create metadata object if needed
+        if not creds.get("_proxy_metadata", {}).get("email"):
+            try:
+                prompt_text = Text.from_markup(
+                    f"\\n[bold]Please enter your email or a unique identifier for [yellow]'{display_name}'[/yellow][/bold]"
                 )
-            )
-            verification_url = dev_data["verification_uri_complete"]
-            escaped_url = rich_escape(verification_url)
-            console.print(
-                f"[bold]URL:[/bold] [link={verification_url}]{escaped_url}[/link]\n"
-            )
+                email = Prompt.ask(prompt_text)
+                creds["_proxy_metadata"] = {
+                    "email": email.strip(),
+                    "last_check_timestamp": time.time(),
+                }
+            except (EOFError, KeyboardInterrupt):
+                console.print(
+                    "\\n[bold yellow]No identifier provided. Deduplication will not be possible.[/bold yellow]"
+                )
+                creds["_proxy_metadata"] = {
+                    "email": None,
+                    "last_check_timestamp": time.time(),
+                }
 
-            # [HEADLESS SUPPORT] Only attempt browser open if NOT headless
-            # [ELECTRON SUPPORT] Check if running from Electron app
-            is_electron_mode = os.getenv('ELECTRON_OAUTH_MODE') == '1'
-            
-            if is_electron_mode:
-                # Running from Electron - output URL for Electron to capture
-                console.print(f"[bold]OAUTH_URL:{verification_url}[/bold]")
-                lib_logger.info("Electron mode detected - URL sent to Electron for browser opening")
-            elif not is_headless:
-                # Normal mode - open browser directly
-                try:
-                    webbrowser.open(dev_data["verification_uri_complete"])
-                    lib_logger.info("Browser opened successfully for Qwen OAuth flow")
-                except Exception as e:
-                    lib_logger.warning(
-                        f"Failed to open browser automatically: {e}. Please open the URL manually."
-                    )
+        if path:
+            await self._save_credentials(path, creds)
+        lib_logger.info(
+            f"Qwen OAuth initialized successfully for '{display_name}'."
+        )
+        return creds
 
-            token_data = None
-            start_time = time.time()
-            interval = dev_data.get("interval", 5)
+    async def _get_device_code(
+        self, client: httpx.AsyncClient, path: Optional[str]
+    ) -> Tuple[Dict[str, Any], str, float]:
+        """
+        Device code for the interactive flow, with its PKCE verifier and expiry (Unix seconds).
 
-            with console.status(
-                "[bold green]Polling for token, please complete authentication in the browser...[/bold green]",
-                spinner="dots",
-            ) as status:
-                while time.time() - start_time < dev_data["expires_in"]:
-                    poll_response = await client.post(
-                        TOKEN_ENDPOINT,
-                        headers=headers,
-                        data={
-                            "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
-                            "device_code": dev_data["device_code"],
-                            "client_id": CLIENT_ID,
-                            "code_verifier": code_verifier,
-                        },
-                    )
-                    if poll_response.status_code == 200:
-                        token_data = poll_response.json()
-                        lib_logger.info("Successfully received token.")
-                        break
-                    elif poll_response.status_code == 400:
-                        poll_data = poll_response.json()
-                        error_type = poll_data.get("error")
-                        if error_type == "authorization_pending":
-                            lib_logger.debug(
-                                f"Polling status: {error_type}, waiting {interval}s"
-                            )
-                        elif error_type == "slow_down":
-                            interval = int(interval * 1.5)
-                            if interval > 10:
-                                interval = 10
-                            lib_logger.debug(
-                                f"Polling status: {error_type}, waiting {interval}s"
-                            )
-                        else:
-                            raise ValueError(
-                                f"Token polling failed: {poll_data.get('error_description', error_type)}"
-                            )
-                    else:
-                        poll_response.raise_for_status()
+        An unused code from an interrupted flow for the same credential file is handed out
+        again while it has more than DEVICE_CODE_REUSE_MARGIN_SECONDS left, so a retry skips
+        the device-code request. In-memory credentials (no path) always get a fresh code.
+        """
+        now = time.time()
+        cached = self._device_codes.get(path) if path else None
+        if cached is not None and cached[2] - DEVICE_CODE_REUSE_MARGIN_SECONDS > now:
+            lib_logger.debug("Reusing unexpired Qwen device code from an earlier attempt")
+            return cached
+
+        code_verifier, code_challenge = await asyncio.to_thread(_generate_pkce_pair)
+        request_data = {
+            "client_id": CLIENT_ID,
+            "scope": SCOPE,
+            "code_challenge": code_challenge,
+            "code_challenge_method": "S256",
+        }
+        lib_logger.debug(f"Qwen device code request data: {request_data}")
+        issued_at = time.time()
+        try:
+            dev_response = await client.post(
+                "https://chat.qwen.ai/api/v1/oauth2/device/code",
+                headers=TOKEN_REQUEST_HEADERS,
+                data=request_data,
+            )
+            dev_response.raise_for_status()
+            dev_data = orjson.loads(dev_response.content)
+            lib_logger.debug(f"Qwen device auth response: {dev_data}")
+        except httpx.HTTPStatusError as e:
+            lib_logger.error(
+                f"Qwen device code request failed with status {e.response.status_code}: {e.response.text}"
+            )
+            raise e
+
+        device_code = (dev_data, code_verifier, issued_at + dev_data["expires_in"])
+        if path:
+            # Forget codes that expired without a retry
+            for stale_path in [p for p, c in self._device_codes.items() if c[2] <= now]:
+                del self._device_codes[stale_path]
+            self._device_codes[path] = device_code
+        return device_code
+
+    async def _poll_for_token(
+        self,
+        client: httpx.AsyncClient,
+        dev_data: Dict[str, Any],
+        code_verifier: str,
+        deadline: float,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Poll the token endpoint until the user approves the device code (RFC 8628).
 
-                    await asyncio.sleep(interval)
+        Waits before every poll, starting with at least DEVICE_POLL_MIN_INITIAL_DELAY since
+        nobody can approve instantly. authorization_pending stretches the interval gently;
+        slow_down adds 5s as the RFC requires.
 
-            if not token_data:
-                raise TimeoutError("Qwen device flow timed out.")
+        Returns:
+            Token response dict, or None if the device code expired first
+        """
+        base_interval = float(dev_data.get("interval", 5))
+        interval = max(base_interval, DEVICE_POLL_MIN_INITIAL_DELAY)
+        # Identical for every poll, so encode the form body once
+        poll_body = urlencode(
+            {
+                "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
+                "device_code": dev_data["device_code"],
+                "client_id": CLIENT_ID,
+                "code_verifier": code_verifier,
+            }
+        ).encode()
 
-            creds.update(
-                {
-                    "access_token": token_data["access_token"],
-                    "refresh_token": token_data.get("refresh_token"),
-                    "expiry_date": (time.time() + token_data["expires_in"]) * 1000,
-                    "resource_url": token_data.get("resource_url"),
-                }
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(interval, remaining))
+
+            # TOKEN_REQUEST_HEADERS already declares the form content type
+            poll_response = await client.post(
+                TOKEN_ENDPOINT, headers=TOKEN_REQUEST_HEADERS, content=poll_body
             )
-
-            # Prompt for user identifier and create metadata object if needed
-            if not creds.get("_proxy_metadata", {}).get("email"):
-                try:
-                    prompt_text = Text.from_markup(
-                        f"\\n[bold]Please enter your email or a unique identifier for [yellow]'{display_name}'[/yellow][/bold]"
+            if poll_response.status_code == 200:
+                lib_logger.info("Successfully received token.")
+                return orjson.loads(poll_response.content)
+            elif poll_response.status_code == 400:
+                poll_data = orjson.loads(poll_response.content)
+                error_type = poll_data.get("error")
+                if error_type == "authorization_pending":
+                    interval = min(
+                        interval * 1.2, max(base_interval, DEVICE_POLL_MAX_PENDING_INTERVAL)
                     )
-                    email = Prompt.ask(prompt_text)
-                    creds["_proxy_metadata"] = {
-                        "email": email.strip(),
-                        "last_check_timestamp": time.time(),
-                    }
-                except (EOFError, KeyboardInterrupt):
-                    console.print(
-                        "\\n[bold yellow]No identifier provided. Deduplication will not be possible.[/bold yellow]"
+                elif error_type == "slow_down":
+                    interval = min(interval + 5, DEVICE_POLL_MAX_SLOW_DOWN_INTERVAL)
+                else:
+                    raise ValueError(
+                        f"Token polling failed: {poll_data.get('error_description', error_type)}"
                     )
-                    creds["_proxy_metadata"] = {
-                        "email": None,
-                        "last_check_timestamp": time.time(),
-                    }
+                lib_logger.debug(
+                    "Polling status: %s, waiting %.1fs", error_type, interval
+                )
+            else:
+                poll_response.raise_for_status()
 
-            if path:
-                await self._save_credentials(path, creds)
-            lib_logger.info(
-                f"Qwen OAuth initialized successfully for '{display_name}'."
-            )
-        return creds
+    async def _run_interactive_reauth(
+        self, path: Optional[str], creds: Dict[str, Any], display_name: str
+    ) -> Dict[str, Any]:
+        # [GLOBAL REAUTH COORDINATION] Use the global coordinator to ensure
+        # only one interactive OAuth flow runs at a time across all providers
+        coordinator = get_reauth_coordinator()
+
+        # Define the interactive OAuth function to be executed by coordinator
+        async def _do_interactive_oauth():
+            return await self._perform_interactive_oauth(path, creds, display_name)
+
+        # Execute via global coordinator (ensures only one at a time)
+        return await coordinator.execute_reauth(
+            credential_path=path or display_name,
+            provider_name="QWEN_CODE",
+            reauth_func=_do_interactive_oauth,
+            timeout=300.0,  # 5 minute timeout for user to complete OAuth
+        )
 
     async def initialize_token(
         self, creds_or_path: Union[Dict[str, Any], str]
@@ -908,23 +1102,7 @@ class QwenAuthBase:
                     f"Qwen OAuth token for '{display_name}' needs setup: {reason}."
                 )
 
-                # [GLOBAL REAUTH COORDINATION] Use the global coordinator to ensure
-                # only one interactive OAuth flow runs at a time across all providers
-                coordinator = get_reauth_coordinator()
-
-                # Define the interactive OAuth function to be executed by coordinator
-                async def _do_interactive_oauth():
-                    return await self._perform_interactive_oauth(
-                        path, creds, display_name
-                    )
-
-                # Execute via global coordinator (ensures only one at a time)
-                return await coordinator.execute_reauth(
-                    credential_path=path or display_name,
-                    provider_name="QWEN_CODE",
-                    reauth_func=_do_interactive_oauth,
-                    timeout=300.0,  # 5 minute timeout for user to complete OAuth
-                )
+                return await self._run_interactive_reauth(path, creds, display_name)
 
             lib_logger.info(f"Qwen OAuth token at '{display_name}' is valid.")
             return creds
@@ -932,8 +1110,13 @@ class QwenAuthBase:
             raise ValueError(f"Failed to initialize Qwen OAuth for '{path}': {e}")
 
     async def get_auth_header(self, credential_path: str) -> Dict[str, str]:
+        # Same fast path as get_api_details: cached and inside its deadline
+        hot = self._hot.get(credential_path)
+        if hot is not None and hot[1] and time.time() < hot[2]:
+            return {"Authorization": f"Bearer {hot[1]}"}
+
         creds = await self._load_credentials(credential_path)
-        if self._is_token_expired(creds):
+        if self._is_path_expired(credential_path):
             creds = await self._refresh_token(credential_path)
         return {"Authorization": f"Bearer {creds['access_token']}"}
 
@@ -945,28 +1128,28 @@ class QwenAuthBase:
         """
         try:
             path = creds_or_path if isinstance(creds_or_path, str) else None
-            creds = (
-                await self._load_credentials(creds_or_path) if path else creds_or_path
-            )
-
-            # This will ensure the token is valid and metadata exists if the flow was just run
-            if path:
-                await self.initialize_token(path)
-                creds = await self._load_credentials(
-                    path
-                )  # Re-load after potential init
+            # initialize_token loads the creds, ensures the token is valid and metadata exists
+            # if the flow was just run, and returns the resulting creds
+            creds = await self.initialize_token(path) if path else creds_or_path
 
-            metadata = creds.get("_proxy_metadata", {"email": None})
-            email = metadata.get("email")
+            metadata = creds.get("_proxy_metadata")
+            email = metadata.get("email") if metadata else None
 
             if not email:
                 lib_logger.warning(
                     f"No email found in _proxy_metadata for '{path or 'in-memory object'}'."
                 )
 
-            # Update timestamp on check and save if it's a file-based credential
-            if path and "_proxy_metadata" in creds:
-                creds["_proxy_metadata"]["last_check_timestamp"] = time.time()
+            # Update timestamp on check and save if it's a file-based credential.
+            # The timestamp is advisory, so only rewrite the file once it is a bit stale
+            now = time.time()
+            if (
+                path
+                and metadata is not None
+                and now - metadata.get("last_check_timestamp", 0)
+                > LAST_CHECK_SAVE_INTERVAL_SECONDS
+            ):
+                metadata["last_check_timestamp"] = now
                 await self._save_credentials(path, creds)
 
             return {"email": email}
@@ -2,37 +2,39 @@
 
 import os
 import sys
+from functools import lru_cache
 
+# Any of these set to a non-empty value means there is no GUI
+_HEADLESS_ENV_VARS = ("CI", "CONTINUOUS_INTEGRATION", "HEADLESS", "PHANTOMJS", "NO_GUI")
 
+
+@lru_cache(maxsize=1)
 def is_headless_environment() -> bool:
     """
     Detects if running in a headless environment where GUI operations are not possible.
+    The answer can't change while the process runs, so it is computed once
+    (call is_headless_environment.cache_clear() after changing the environment).
     
     Returns:
         True if in headless environment, False otherwise
     """
-    # Check if running in CI/CD environment
-    if os.getenv("CI") or os.getenv("CONTINUOUS_INTEGRATION"):
-        return True
+    env = os.environ
     
-    # Check for common headless indicators
-    if os.getenv("HEADLESS") or os.getenv("PHANTOMJS") or os.getenv("NO_GUI"):
+    # CI/CD environments and common headless indicators
+    if any(env.get(name) for name in _HEADLESS_ENV_VARS):
         return True
     
-    # On Unix-like systems, check if DISPLAY is set
-    if hasattr(os, 'uname'):
-        if os.getenv("DISPLAY") is None and sys.platform != "win32":
+    if sys.platform == "win32":
+        # For Windows, we assume GUI is available unless specifically in headless mode
+        # This is a conservative check that can be extended based on specific needs
+        if env.get("PYTHONIOENCODING") == "utf-8" and env.get("TERM") == "dumb":
             return True
+        # Check if running in Windows service context (simplified)
+        return env.get("SESSIONNAME", "").startswith("Services")
     
-    # Check for specific Python environments
-    if os.getenv("PYTHONIOENCODING") == "utf-8" and os.getenv("TERM") == "dumb":
+    # On Unix-like systems, check if DISPLAY is set
+    if hasattr(os, 'uname') and env.get("DISPLAY") is None:
         return True
     
-    # For Windows, we assume GUI is available unless specifically in headless mode
-    # This is a conservative check that can be extended based on specific needs
-    if sys.platform == "win32":
-        # Check if running in Windows service context (simplified)
-        if os.getenv("SESSIONNAME", "").startswith("Services"):
-            return True
-    
-    return False
+    # Check for specific Python environments
+    return env.get("PYTHONIOENCODING") == "utf-8" and env.get("TERM") == "dumb"
@@ -2,7 +2,8 @@
 
 import asyncio
 import logging
-from typing import Callable, Any, Dict
+import threading
+from typing import Callable, Any, Dict, Optional
 from pathlib import Path
 
 lib_logger = logging.getLogger("rotator_library")
@@ -16,7 +17,9 @@ class ReauthCoordinator:
     """
     
     def __init__(self):
-        self._active_reauth_lock = asyncio.Lock()
+        # Held by the running flow only, so one interactive OAuth flow runs at a time.
+        # Created on first use, inside the event loop
+        self._active_reauth_lock: Optional[asyncio.Lock] = None
         self._active_reauth_tasks: Dict[str, asyncio.Task] = {}
         
     async def execute_reauth(
@@ -45,59 +48,53 @@ class ReauthCoordinator:
         
         lib_logger.info(f"Attempting to start re-authentication for {reauth_id}")
         
-        # Wait for any active re-auth to complete before starting this one
-        async with self._active_reauth_lock:
-            lib_logger.info(f"Re-auth lock acquired for {reauth_id}")
-            
-            # Check if there's already an active task for this credential
-            if reauth_id in self._active_reauth_tasks:
-                active_task = self._active_reauth_tasks[reauth_id]
-                if not active_task.done():
-                    lib_logger.info(f"Re-auth already in progress for {reauth_id}, waiting...")
-                    try:
-                        # Wait for the existing task to complete
-                        result = await asyncio.wait_for(active_task, timeout=timeout)
-                        return result
-                    except asyncio.TimeoutError:
-                        lib_logger.warning(f"Existing re-auth task timed out for {reauth_id}")
-                        # Cancel the existing task and continue with new one
-                        active_task.cancel()
-                        try:
-                            await active_task
-                        except asyncio.CancelledError:
-                            pass
-            
-            # Create a new task for this re-auth
-            task = asyncio.create_task(self._execute_single_reauth(reauth_func, timeout))
+        # Join the active re-auth for this credential, or start one. There is no await between
+        # the lookup and the insert, so the task table needs no lock.
+        task = self._active_reauth_tasks.get(reauth_id)
+        if task is not None and not task.done():
+            lib_logger.info(f"Re-auth already in progress for {reauth_id}, waiting...")
+        else:
+            task = asyncio.create_task(
+                self._execute_single_reauth(reauth_id, reauth_func, timeout)
+            )
             self._active_reauth_tasks[reauth_id] = task
-            
-            try:
-                result = await asyncio.wait_for(task, timeout=timeout)
-                lib_logger.info(f"Re-authentication completed successfully for {reauth_id}")
-                return result
-            except asyncio.TimeoutError:
-                lib_logger.error(f"Re-authentication timed out for {reauth_id}")
-                raise
-            except Exception as e:
-                lib_logger.error(f"Re-authentication failed for {reauth_id}: {e}")
-                raise
-            finally:
-                # Clean up the task reference
-                self._active_reauth_tasks.pop(reauth_id, None)
-    
-    async def _execute_single_reauth(self, reauth_func: Callable[[], Any], timeout: float):
-        """Execute a single re-authentication function with timeout."""
+
+            def _forget(done: asyncio.Task):
+                # Clean up the task reference (unless a newer flow already replaced it)
+                if self._active_reauth_tasks.get(reauth_id) is done:
+                    del self._active_reauth_tasks[reauth_id]
+
+            task.add_done_callback(_forget)
+        
         try:
-            result = await asyncio.wait_for(reauth_func(), timeout=timeout)
+            # shield: a caller giving up must not cancel the flow other callers are waiting on
+            result = await asyncio.shield(task)
+            lib_logger.info(f"Re-authentication completed successfully for {reauth_id}")
             return result
         except asyncio.TimeoutError:
+            lib_logger.error(f"Re-authentication timed out for {reauth_id}")
             raise
         except Exception as e:
-            raise e
+            lib_logger.error(f"Re-authentication failed for {reauth_id}: {e}")
+            raise
+    
+    async def _execute_single_reauth(
+        self, reauth_id: str, reauth_func: Callable[[], Any], timeout: float
+    ):
+        """
+        Execute a single re-authentication function with timeout. The global lock is held
+        only here, while the interactive flow runs; the timeout starts once it is acquired.
+        """
+        if self._active_reauth_lock is None:
+            self._active_reauth_lock = asyncio.Lock()
+        async with self._active_reauth_lock:
+            lib_logger.info(f"Re-auth lock acquired for {reauth_id}")
+            return await asyncio.wait_for(reauth_func(), timeout=timeout)
 
 
-# Global singleton instance
-_coordinator = ReauthCoordinator()
+# Global singleton instance, created on first use rather than at import
+_coordinator: Optional[ReauthCoordinator] = None
+_coordinator_init_lock = threading.Lock()
 
 
 def get_reauth_coordinator() -> ReauthCoordinator:
@@ -107,4 +104,9 @@ def get_reauth_coordinator() -> ReauthCoordinator:
     Returns:
         ReauthCoordinator instance
     """
+    global _coordinator
+    if _coordinator is None:
+        with _coordinator_init_lock:
+            if _coordinator is None:
+                _coordinator = ReauthCoordinator()
     return _coordinator
@@ -0,0 +1,47 @@
+# src/rotator_library/utils/terminal.py
+
+import os
+import sys
+from functools import lru_cache
+
+
+def _vt_enabled() -> bool:
+    """
+    Check (and try to switch on) ANSI escape processing for the Windows console.
+    Returns False on legacy conhost, where only 'cls' clears the screen.
+    """
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+        if mode.value & ENABLE_VIRTUAL_TERMINAL_PROCESSING:
+            return True
+        return bool(kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=1)
+def _ansi_clear() -> bool:
+    """Decided on first clear: everything except legacy Windows conhost understands ANSI clears"""
+    return os.name != 'nt' or bool(os.environ.get('WT_SESSION')) or _vt_enabled()
+
+
+def clear_screen():
+    """
+    Cross-platform terminal clear that works robustly on both 
+    classic Windows conhost and modern terminals (Windows Terminal, Linux, Mac).
+    
+    Writes ANSI escape sequences directly instead of spawning a shell;
+    only legacy Windows conhost without VT support falls back to 'cls'.
+    """
+    if _ansi_clear():
+        sys.stdout.write('\x1b[2J\x1b[3J\x1b[H')
+        sys.stdout.flush()
+    else:
+        os.system('cls')